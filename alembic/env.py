@@ -9,6 +9,10 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# 数据库 URL 与应用共用同一份配置（.env / 环境变量 DATABASE_URL）
+from config import settings
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -25,6 +29,16 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# 全文索引由 models/search.py 的 DDL 和触发器维护，不在 metadata 中，autogenerate 时跳过
+# （包括 FTS5 自动创建的 posts_fts_data / posts_fts_idx 等影子表）
+SEARCH_INDEX_TABLES = ("posts_fts", "comments_fts", "post_search", "comment_search")
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not name.startswith(SEARCH_INDEX_TABLES)
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -44,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -65,7 +80,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,45 @@
+"""add post search index
+
+Revision ID: a7e21c5d9f30
+Revises: f3a9c2d7b614
+Create Date: 2026-10-18 22:05:41.382910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.search import POSTGRES_DDL, SQLITE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e21c5d9f30'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c2d7b614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 只建索引结构和触发器，已有数据用 python -m scripts.rebuild_search_index 回填
+    dialect = op.get_bind().dialect.name
+    statements = POSTGRES_DDL if dialect == "postgresql" else SQLITE_DDL
+    for statement in statements:
+        op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS comments_search_aiud ON comments")
+        op.execute("DROP TRIGGER IF EXISTS posts_search_aiu ON posts")
+        op.execute("DROP FUNCTION IF EXISTS comments_search_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS posts_search_trigger()")
+        op.execute("DROP TABLE IF EXISTS post_search")
+        op.execute("DROP FUNCTION IF EXISTS post_search_refresh(INTEGER)")
+    else:
+        for trigger in ("comments_fts_ad", "comments_fts_au", "comments_fts_ai",
+                        "posts_fts_ad", "posts_fts_au", "posts_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
@@ -0,0 +1,33 @@
+"""add post_count to tags
+
+Revision ID: b4d8e1f6a2c9
+Revises: a7e21c5d9f30
+Create Date: 2026-10-18 22:41:17.509236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d8e1f6a2c9'
+down_revision: Union[str, Sequence[str], None] = 'a7e21c5d9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE tags SET post_count = (SELECT count(*) FROM post_tags WHERE post_tags.tag_id = tags.id)"
+    )
+    op.create_index('ix_tags_post_count_id', 'tags', ['post_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tags_post_count_id', table_name='tags')
+    op.drop_column('tags', 'post_count')
@@ -0,0 +1,179 @@
+"""index comments per row
+
+Revision ID: b9d4e2a7c1f5
+Revises: f2c7a4e9b3d6
+Create Date: 2026-10-19 09:12:36.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e2a7c1f5'
+down_revision: Union[str, Sequence[str], None] = 'f2c7a4e9b3d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_TRIGGERS = ("comments_fts_ad", "comments_fts_au", "comments_fts_ai", "posts_fts_ad", "posts_fts_au", "posts_fts_ai")
+
+# 这个版本的索引结构：评论按条索引，评论增删改只写这一条评论的索引行
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE posts_fts USING fts5("
+    "title, content, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE comments_fts USING fts5("
+    "content, post_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE posts_fts SET title = new.title, content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER comments_fts_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO comments_fts (rowid, content, post_id) VALUES (new.id, new.content, new.post_id);
+    END""",
+    """CREATE TRIGGER comments_fts_au AFTER UPDATE OF content ON comments BEGIN
+        UPDATE comments_fts SET content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER comments_fts_ad AFTER DELETE ON comments BEGIN
+        DELETE FROM comments_fts WHERE rowid = old.id;
+    END""",
+]
+
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(p.content, '')), 'B')
+"""
+POSTGRES_COMMENT_DOCUMENT = "setweight(to_tsvector('simple', coalesce(c.content, '')), 'C')"
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS comment_search (
+        comment_id INTEGER PRIMARY KEY REFERENCES comments (id) ON DELETE CASCADE,
+        post_id INTEGER NOT NULL,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_comment_search_document ON comment_search USING GIN (document)",
+    f"""CREATE OR REPLACE FUNCTION post_search_refresh(pid INTEGER) RETURNS void AS $$
+        INSERT INTO post_search (post_id, document)
+        SELECT p.id, {POSTGRES_DOCUMENT} FROM posts p WHERE p.id = pid
+        ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document;
+    $$ LANGUAGE sql""",
+    # 删除评论时索引行由外键 ON DELETE CASCADE 删除
+    """CREATE OR REPLACE FUNCTION comments_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO comment_search (comment_id, post_id, document)
+        VALUES (NEW.id, NEW.post_id, setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'C'))
+        ON CONFLICT (comment_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS comments_search_aiud ON comments",
+    "DROP TRIGGER IF EXISTS comments_search_aiu ON comments",
+    """CREATE TRIGGER comments_search_aiu AFTER INSERT OR UPDATE OF content ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_trigger()""",
+]
+
+# 上一个版本（a7e21c5d9f30）：评论合并成 posts_fts 的一列，每次评论写入都重新聚合整篇文章的评论
+OLD_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, content, comments, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content, comments) VALUES (new.id, new.title, new.content, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE posts_fts SET title = new.title, content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_ai AFTER INSERT ON comments BEGIN
+        UPDATE posts_fts SET comments = (SELECT group_concat(content, ' ') FROM comments WHERE post_id = new.post_id)
+        WHERE rowid = new.post_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_au AFTER UPDATE OF content ON comments BEGIN
+        UPDATE posts_fts SET comments = (SELECT group_concat(content, ' ') FROM comments WHERE post_id = new.post_id)
+        WHERE rowid = new.post_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_ad AFTER DELETE ON comments BEGIN
+        UPDATE posts_fts SET comments = coalesce((SELECT group_concat(content, ' ') FROM comments WHERE post_id = old.post_id), '')
+        WHERE rowid = old.post_id;
+    END""",
+]
+
+OLD_POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(p.content, '')), 'B')
+    || setweight(to_tsvector('simple', coalesce(
+        (SELECT string_agg(c.content, ' ') FROM comments c WHERE c.post_id = p.id), '')), 'C')
+"""
+
+OLD_POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION post_search_refresh(pid INTEGER) RETURNS void AS $$
+        INSERT INTO post_search (post_id, document)
+        SELECT p.id, {OLD_POSTGRES_DOCUMENT} FROM posts p WHERE p.id = pid
+        ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document;
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION comments_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM post_search_refresh(OLD.post_id);
+        ELSE
+            PERFORM post_search_refresh(NEW.post_id);
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER comments_search_aiud AFTER INSERT OR UPDATE OF content OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_trigger()""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 替换的是已经有数据的索引，直接在迁移里回填，不等 rebuild_search_index
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in POSTGRES_DDL:
+            op.execute(sa.text(statement))
+        op.execute(sa.text(
+            f"INSERT INTO comment_search (comment_id, post_id, document) "
+            f"SELECT c.id, c.post_id, {POSTGRES_COMMENT_DOCUMENT} FROM comments c "
+            f"ON CONFLICT (comment_id) DO NOTHING"
+        ))
+        # 文章的 document 去掉评论部分
+        op.execute(sa.text(f"UPDATE post_search s SET document = {POSTGRES_DOCUMENT} FROM posts p WHERE p.id = s.post_id"))
+    else:
+        # FTS5 表不能删除列，整个重建
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS comments_fts")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
+        for statement in SQLITE_DDL:
+            op.execute(sa.text(statement))
+        op.execute("INSERT INTO posts_fts (rowid, title, content) SELECT id, title, content FROM posts")
+        op.execute("INSERT INTO comments_fts (rowid, content, post_id) SELECT id, content, post_id FROM comments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS comments_search_aiu ON comments")
+        op.execute("DROP TRIGGER IF EXISTS comments_search_aiud ON comments")
+        op.execute("DROP TABLE IF EXISTS comment_search")
+        for statement in OLD_POSTGRES_DDL:
+            op.execute(sa.text(statement))
+        op.execute(sa.text(f"UPDATE post_search s SET document = {OLD_POSTGRES_DOCUMENT} FROM posts p WHERE p.id = s.post_id"))
+    else:
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS comments_fts")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
+        for statement in OLD_SQLITE_DDL:
+            op.execute(sa.text(statement))
+        op.execute(
+            "INSERT INTO posts_fts (rowid, title, content, comments) "
+            "SELECT p.id, p.title, p.content, "
+            "coalesce((SELECT group_concat(c.content, ' ') FROM comments c WHERE c.post_id = p.id), '') FROM posts p"
+        )
@@ -0,0 +1,45 @@
+"""add post scores for trending
+
+Revision ID: c6f2a9e4d8b1
+Revises: b4d8e1f6a2c9
+Create Date: 2026-10-18 23:32:08.671254
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a9e4d8b1'
+down_revision: Union[str, Sequence[str], None] = 'b4d8e1f6a2c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_scores',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    op.create_index('ix_post_scores_score_post_id', 'post_scores', ['score', 'post_id'], unique=False)
+    anchor = op.create_table('trending_anchor',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('anchor', sa.Float(), nullable=False),
+    sa.Column('rebased_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # 基准时间取迁移时刻；已有文章的分数用 python -m scripts.rebuild_trending 回填
+    op.bulk_insert(anchor, [{'id': 1, 'anchor': time.time()}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trending_anchor')
+    op.drop_index('ix_post_scores_score_post_id', table_name='post_scores')
+    op.drop_table('post_scores')
@@ -0,0 +1,56 @@
+"""add moderation scan tables
+
+Revision ID: cc418588950b
+Revises: d5eecc8a1216
+Create Date: 2026-10-18 21:02:36.804415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cc418588950b'
+down_revision: Union[str, Sequence[str], None] = 'd5eecc8a1216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('moderation_scans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('word_count', sa.Integer(), nullable=False),
+    sa.Column('last_post_id', sa.Integer(), nullable=False),
+    sa.Column('last_comment_id', sa.Integer(), nullable=False),
+    sa.Column('scanned', sa.Integer(), nullable=False),
+    sa.Column('flagged', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_moderation_scans_id'), 'moderation_scans', ['id'], unique=False)
+    op.create_table('moderation_flags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scan_id', sa.Integer(), nullable=False),
+    sa.Column('target_type', sa.String(), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('terms', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['scan_id'], ['moderation_scans.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scan_id', 'target_type', 'target_id', name='uix_scan_target')
+    )
+    op.create_index(op.f('ix_moderation_flags_id'), 'moderation_flags', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_moderation_flags_id'), table_name='moderation_flags')
+    op.drop_table('moderation_flags')
+    op.drop_index(op.f('ix_moderation_scans_id'), table_name='moderation_scans')
+    op.drop_table('moderation_scans')
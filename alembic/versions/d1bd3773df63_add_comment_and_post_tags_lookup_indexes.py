@@ -0,0 +1,30 @@
+"""add comment and post_tags lookup indexes
+
+Revision ID: d1bd3773df63
+Revises: e594f14ceaf8
+Create Date: 2026-10-18 19:32:08.114526
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1bd3773df63'
+down_revision: Union[str, Sequence[str], None] = 'e594f14ceaf8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_post_id_created_at_id', 'comments', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_tags_tag_id_post_id', table_name='post_tags')
+    op.drop_index('ix_comments_post_id_created_at_id', table_name='comments')
@@ -0,0 +1,37 @@
+"""add sensitive_words table
+
+Revision ID: d5eecc8a1216
+Revises: abe7e995e49f
+Create Date: 2026-10-18 20:41:13.582207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5eecc8a1216'
+down_revision: Union[str, Sequence[str], None] = 'abe7e995e49f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sensitive_words',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('word', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sensitive_words_id'), 'sensitive_words', ['id'], unique=False)
+    op.create_index(op.f('ix_sensitive_words_word'), 'sensitive_words', ['word'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sensitive_words_word'), table_name='sensitive_words')
+    op.drop_index(op.f('ix_sensitive_words_id'), table_name='sensitive_words')
+    op.drop_table('sensitive_words')
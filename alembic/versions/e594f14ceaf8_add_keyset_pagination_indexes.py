@@ -0,0 +1,38 @@
+"""add keyset pagination indexes
+
+Revision ID: e594f14ceaf8
+Revises: 26531b95e3f5
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e594f14ceaf8'
+down_revision: Union[str, Sequence[str], None] = '26531b95e3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_like_count_id', 'posts', ['like_count', 'id'], unique=False)
+    op.create_index('ix_posts_author_id_created_at_id', 'posts', ['author_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_likes_post_id_created_at_id', 'likes', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_likes_user_id_created_at_id', 'likes', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tags_created_at_id', 'tags', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tags_created_at_id', table_name='tags')
+    op.drop_index('ix_likes_user_id_created_at_id', table_name='likes')
+    op.drop_index('ix_likes_post_id_created_at_id', table_name='likes')
+    op.drop_index('ix_posts_author_id_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_like_count_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
@@ -0,0 +1,60 @@
+"""add comment threading
+
+Revision ID: e8b3d5a1c7f4
+Revises: c6f2a9e4d8b1
+Create Date: 2026-10-18 23:58:41.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.search import SQLITE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3d5a1c7f4'
+down_revision: Union[str, Sequence[str], None] = 'c6f2a9e4d8b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PATH_TYPE = sa.String().with_variant(sa.String(collation='C'), 'postgresql')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.add_column('comments', sa.Column('parent_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(None, 'comments', 'comments', ['parent_id'], ['id'])
+    else:
+        # SQLite 不支持单独加外键约束；直接 ADD COLUMN ... REFERENCES，
+        # 不用 batch 重建表（重建会丢掉 comments 上的全文索引触发器）
+        op.execute('ALTER TABLE comments ADD COLUMN parent_id INTEGER REFERENCES comments (id)')
+    op.add_column('comments', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('comments', sa.Column('path', PATH_TYPE, server_default='', nullable=False))
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    # 已有评论都是顶层评论，path 就是补零的 id（与 models.comment.comment_path 一致）
+    if dialect == 'postgresql':
+        op.execute("UPDATE comments SET path = lpad(id::text, 10, '0')")
+    else:
+        op.execute("UPDATE comments SET path = printf('%010d', id)")
+    op.create_index('ix_comments_post_id_parent_id_id', 'comments', ['post_id', 'parent_id', 'id'], unique=False)
+    op.create_index('ix_comments_path', 'comments', ['path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_path', table_name='comments')
+    op.drop_index('ix_comments_post_id_parent_id_id', table_name='comments')
+    # SQLite 不能直接删除带外键的列，用 batch 重建表，之后补回被一起删掉的全文索引触发器
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.drop_column('reply_count')
+        batch_op.drop_column('path')
+        batch_op.drop_column('depth')
+        batch_op.drop_column('parent_id')
+    if op.get_bind().dialect.name != 'postgresql':
+        for statement in SQLITE_DDL:
+            if 'ON comments' in statement:
+                op.execute(sa.text(statement))
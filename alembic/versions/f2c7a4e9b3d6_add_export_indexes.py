@@ -0,0 +1,32 @@
+"""add export indexes
+
+Revision ID: f2c7a4e9b3d6
+Revises: e8b3d5a1c7f4
+Create Date: 2026-10-19 00:41:17.830264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7a4e9b3d6'
+down_revision: Union[str, Sequence[str], None] = 'e8b3d5a1c7f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_updated_at_id', 'posts', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_comments_updated_at_id', 'comments', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_likes_created_at_id', 'likes', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_likes_created_at_id', table_name='likes')
+    op.drop_index('ix_comments_updated_at_id', table_name='comments')
+    op.drop_index('ix_posts_updated_at_id', table_name='posts')
@@ -5,6 +5,9 @@ from .auth import router as auth_router
 from .tags import router as tags_router
 from .comment import router as comment_router
 from .likes import router as likes_router
+from .metrics import router as metrics_router
+from .moderation import router as moderation_router
+from .export import router as export_router
 
-__all__ = ["users_router", "posts_router", "auth_router", "tags_router", "comment_router", "likes_router"]
+__all__ = ["users_router", "posts_router", "auth_router", "tags_router", "comment_router", "likes_router", "metrics_router", "moderation_router", "export_router"]
 
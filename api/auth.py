@@ -1,20 +1,42 @@
 # api/auth.py
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from database import get_db
+from database import get_async_db
 from auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 import crud
+import schemas
 
 router = APIRouter(tags=["authentication"])
 
-@router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.authenticate_user(db=db, username=form_data.username, password=form_data.password)
+def _access_token(subject: str) -> str:
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(data={"sub": subject}, expires_delta=access_token_expires)
+
+@router.post("/login", response_model=schemas.TokenResponse)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await crud.authenticate_user(db=db, username=form_data.username, password=form_data.password)
     if user is None:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={"sub": user.username}, expires_delta=access_token_expires)
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await crud.create_refresh_token(db, user.id, user.username)
+    return {"access_token": _access_token(user.username), "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=schemas.TokenResponse)
+async def refresh(body: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    用刷新令牌换新的 access token，不需要再次输入密码（不执行 bcrypt）
+
+    刷新令牌每次使用后作废，同时返回新的刷新令牌
+    """
+    rotated = await crud.rotate_refresh_token(db, body.refresh_token)
+    if rotated is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    subject, refresh_token = rotated
+    return {"access_token": _access_token(subject), "token_type": "bearer", "refresh_token": refresh_token}
 
+@router.post("/logout")
+async def logout(body: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """注销刷新令牌；access token 在过期前仍然有效"""
+    await crud.revoke_refresh_token(db, body.refresh_token)
+    return {"message": "Logged out"}
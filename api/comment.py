@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from api.users import get_current_user
-from database import get_db
-import models
+from database import get_async_db
 import schemas
 from services import CommentService
 
@@ -11,7 +11,7 @@ router = APIRouter(tags=["comments"])
 
 # ============= 依赖注入 =============
 
-def get_comment_service(db: Session = Depends(get_db)) -> CommentService:
+def get_comment_service(db: AsyncSession = Depends(get_async_db)) -> CommentService:
     """创建 CommentService 实例"""
     return CommentService(db)
 
@@ -19,41 +19,74 @@ def get_comment_service(db: Session = Depends(get_db)) -> CommentService:
 # ============= API 路由 =============
 
 @router.post("/posts/{post_id}/comments", response_model=schemas.CommentResponse)
-def create_comment(
+async def create_comment(
     post_id: int,
     comment: schemas.CommentCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     comment_service: CommentService = Depends(get_comment_service)
 ):
-    """创建评论（需要登录）"""
-    return comment_service.create_comment(post_id, comment, current_user.id)
+    """创建评论（需要登录），传 parent_id 表示回复某条评论"""
+    return await comment_service.create_comment(post_id, comment, current_user.id)
 
 
-@router.get("/posts/{post_id}/comments", response_model=list[schemas.CommentResponse])
-def get_comments(
+@router.get("/posts/{post_id}/comments", response_model=schemas.Page[schemas.CommentThread])
+async def get_comments(
     post_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    replies: int = Query(3, ge=0, le=10),
+    if_none_match: Optional[str] = Header(None),
     comment_service: CommentService = Depends(get_comment_service)
 ):
-    """获取文章的所有评论（公开）"""
-    return comment_service.get_post_comments(post_id)
+    """
+    获取文章的顶层评论（公开，游标分页，先发表的在前）
+
+    - cursor: 上一页返回的 next_cursor，为空表示第一页
+    - replies: 每条顶层评论附带的回复预览条数，还有更多时返回 replies_cursor
+
+    返回 ETag，带 If-None-Match 且没有变化时返回 304
+    """
+    return await comment_service.get_post_comments(post_id, cursor, limit, replies, if_none_match)
+
+
+@router.get("/comments/{comment_id}/replies", response_model=schemas.Page[schemas.CommentResponse])
+async def get_comment_replies(
+    comment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    comment_service: CommentService = Depends(get_comment_service)
+):
+    """获取评论的直接回复（公开，游标分页）；cursor 可以是评论列表里的 replies_cursor"""
+    return await comment_service.get_comment_replies(comment_id, cursor, limit)
+
+
+@router.get("/comments/{comment_id}/thread", response_model=schemas.Page[schemas.CommentResponse])
+async def get_comment_thread(
+    comment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    comment_service: CommentService = Depends(get_comment_service)
+):
+    """按先序遍历顺序分页加载评论下的整棵回复子树（公开），按 depth 缩进显示"""
+    return await comment_service.get_comment_thread(comment_id, cursor, limit)
 
 
 @router.put("/comments/{comment_id}", response_model=schemas.CommentResponse)
-def update_comment(
+async def update_comment(
     comment_id: int,
     comment: schemas.CommentUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     comment_service: CommentService = Depends(get_comment_service)
 ):
     """更新评论（只有评论作者或管理员可以）"""
-    return comment_service.update_comment(comment_id, comment, current_user)
+    return await comment_service.update_comment(comment_id, comment, current_user)
 
 
 @router.delete("/comments/{comment_id}", response_model=dict)
-def delete_comment(
+async def delete_comment(
     comment_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     comment_service: CommentService = Depends(get_comment_service)
 ):
     """删除评论（只有评论作者或管理员可以）"""
-    return comment_service.delete_comment(comment_id, current_user)
+    return await comment_service.delete_comment(comment_id, current_user)
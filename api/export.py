@@ -0,0 +1,28 @@
+# api/export.py
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends
+from api.users import get_current_user
+from core.permissions import require_role
+from services.export_service import ExportService
+import schemas
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+@router.get("/{kind}")
+async def export_data(
+    kind: Literal["posts", "comments", "likes"],
+    since: Optional[datetime] = None,
+    gzip: bool = False,
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    流式导出文章 / 评论 / 点赞（仅管理员），NDJSON 格式，每行一条记录
+
+    - since: 增量导出，只返回 updated_at（点赞为 created_at）>= since 的行；
+      结果按这个时间正序排列，下次用最后一行的时间作为 since（边界上的行会重复出现，按 id 去重）
+    - gzip: 返回 gzip 压缩的 .ndjson.gz
+    """
+    require_role(current_user, "admin")
+    return ExportService().export(kind, since, gzip)
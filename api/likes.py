@@ -1,17 +1,17 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
-from api.users import get_current_user
+from fastapi import APIRouter, Depends, Query
+from typing import List, Literal, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from api.users import get_current_user, get_current_user_optional
 from services import LikeService
 import schemas
-import models
 
 router = APIRouter(tags=["likes"])
 
 
 # ============= 依赖注入 =============
 
-def get_like_service(db: Session = Depends(get_db)) -> LikeService:
+def get_like_service(db: AsyncSession = Depends(get_async_db)) -> LikeService:
     """创建 LikeService 实例"""
     return LikeService(db)
 
@@ -19,9 +19,9 @@ def get_like_service(db: Session = Depends(get_db)) -> LikeService:
 # ============= API 路由 =============
 
 @router.post("/posts/{post_id}/like", response_model=schemas.LikeStats)
-def like_post(
+async def like_post(
     post_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     like_service: LikeService = Depends(get_like_service)
 ):
     """
@@ -29,13 +29,13 @@ def like_post(
     
     返回最新的点赞统计信息
     """
-    return like_service.like_post(post_id, current_user.id)
+    return await like_service.like_post(post_id, current_user.id)
 
 
 @router.delete("/posts/{post_id}/like", response_model=schemas.LikeStats)
-def unlike_post(
+async def unlike_post(
     post_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     like_service: LikeService = Depends(get_like_service)
 ):
     """
@@ -43,50 +43,77 @@ def unlike_post(
     
     返回最新的点赞统计信息
     """
-    return like_service.unlike_post(post_id, current_user.id)
+    return await like_service.unlike_post(post_id, current_user.id)
 
 
-@router.get("/posts/{post_id}/likes", response_model=list[schemas.LikeResponse])
-def get_post_likes(
+@router.get("/posts/{post_id}/likes", response_model=schemas.Page[schemas.LikeResponse])
+async def get_post_likes(
     post_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
     like_service: LikeService = Depends(get_like_service)
 ):
     """
     获取文章的点赞列表（公开）
     
-    返回点赞用户列表，按点赞时间倒序
+    返回点赞用户列表，按点赞时间倒序，游标分页
     """
-    return like_service.get_post_likes(post_id, skip, limit)
+    return await like_service.get_post_likes(post_id, cursor, limit)
 
 
 @router.get("/posts/{post_id}/likes/stats", response_model=schemas.LikeStats)
-def get_like_stats(
+async def get_like_stats(
     post_id: int,
+    current_user: Optional[schemas.Principal] = Depends(get_current_user_optional),
     like_service: LikeService = Depends(get_like_service)
 ):
     """
-    获取文章的点赞统计（公开，无需登录）
+    获取文章的点赞统计（公开，登录可选）
     
     返回：
     - count: 总点赞数
-    - is_liked: false（因为未登录）
-    
-    注意：如果需要获取当前用户是否点赞，请先登录后调用此接口
+    - is_liked: 当前用户是否点赞（未登录时为 false）
     """
-    return like_service.get_like_stats(post_id, user_id=None)
+    user_id = current_user.id if current_user else None
+    return await like_service.get_like_stats(post_id, user_id=user_id)
 
 
-@router.get("/users/me/likes", response_model=list[schemas.LikeResponse])
-def get_my_likes(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(get_current_user),
+@router.get("/likes/stats", response_model=List[schemas.PostLikeStats])
+async def get_like_stats_batch(
+    post_ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user: Optional[schemas.Principal] = Depends(get_current_user_optional),
+    like_service: LikeService = Depends(get_like_service)
+):
+    """
+    批量获取点赞统计（公开，登录可选）
+    
+    用法：GET /likes/stats?post_ids=1&post_ids=2&post_ids=3，最多 100 个
+    
+    返回每篇文章的 count 和 is_liked（未登录时为 false），按请求顺序排列，
+    不存在的文章不在结果中
+    """
+    user_id = current_user.id if current_user else None
+    return await like_service.get_like_stats_batch(post_ids, user_id=user_id)
+
+
+@router.get(
+    "/users/me/likes",
+    response_model=Union[schemas.Page[schemas.LikeResponse], schemas.Page[schemas.LikedPost]],
+)
+async def get_my_likes(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    expand: Optional[Literal["post"]] = None,
+    current_user: schemas.Principal = Depends(get_current_user),
     like_service: LikeService = Depends(get_like_service)
 ):
     """
-    获取我点赞的所有文章（需要登录）
+    获取我点赞的所有文章（需要登录，游标分页）
+    
+    默认返回点赞记录；expand=post 时每一项是 {like_id, liked_at, post}，post 含作者和标签
     """
-    return like_service.get_user_likes(current_user.id, skip, limit)
+    page = await like_service.get_user_likes(current_user.id, cursor, limit, expand=expand)
+    # 先按对应的模型转换：直接交给联合类型校验时，点赞记录也会按 LikedPost 尝试读取 like.post，触发懒加载
+    model = schemas.Page[schemas.LikedPost] if expand == "post" else schemas.Page[schemas.LikeResponse]
+    return model.model_validate(page)
 
@@ -0,0 +1,44 @@
+# api/metrics.py
+from fastapi import APIRouter, Depends
+from api.users import get_current_user
+from auth import jwt_cache, password_hasher
+from core.permissions import require_role
+from core.response_cache import response_cache
+from crud.like import like_count_buffer
+from crud.tag import tag_suggest_index
+from crud.trending import trending_rebase_task
+from crud.user import principal_cache
+from database import get_pool_stats
+import schemas
+
+# 运行时内部状态（连接池、缓存、写缓冲、鉴权线程池），只对管理员开放
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/db")
+async def read_db_metrics(current_user: schemas.Principal = Depends(get_current_user)):
+    """数据库连接池统计（借出次数、等待时间、峰值占用），用于调整连接池大小（仅管理员）"""
+    require_role(current_user, "admin")
+    return get_pool_stats()
+
+@router.get("/counters")
+async def read_counter_metrics(current_user: schemas.Principal = Depends(get_current_user)):
+    """点赞计数写缓冲统计（待写回的文章数、写回次数、失败次数），热门文章分数的 rebase 次数（仅管理员）"""
+    require_role(current_user, "admin")
+    return {"like_count": like_count_buffer.stats(), "trending_rebase": trending_rebase_task.stats()}
+
+@router.get("/caches")
+async def read_cache_metrics(current_user: schemas.Principal = Depends(get_current_user)):
+    """缓存统计（仅管理员）：命中 / 未命中 / 淘汰 / 失效次数"""
+    require_role(current_user, "admin")
+    return {
+        "jwt": jwt_cache.stats(),
+        "principal": principal_cache.stats(),
+        "response": await response_cache.stats(),
+        "tag_suggest": tag_suggest_index.stats(),
+    }
+
+@router.get("/auth")
+async def read_auth_metrics(current_user: schemas.Principal = Depends(get_current_user)):
+    """密码哈希线程池统计（仅管理员）：排队数、完成数、因排队过长被拒绝的次数"""
+    require_role(current_user, "admin")
+    return {"password_hasher": password_hasher.stats()}
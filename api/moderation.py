@@ -0,0 +1,26 @@
+# api/moderation.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from api.users import get_current_user
+from core.permissions import require_role
+from services.moderation_service import ModerationService
+from utils.content_moderation import matcher_status
+import schemas
+
+router = APIRouter(prefix="/moderation", tags=["moderation"])
+
+@router.get("/status")
+async def read_moderation_status(current_user: schemas.Principal = Depends(get_current_user)):
+    """当前敏感词表的词数和加载时间（仅管理员）"""
+    require_role(current_user, "admin")
+    return matcher_status()
+
+@router.post("/reload")
+async def reload_sensitive_words(
+    current_user: schemas.Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """从词表文件和 sensitive_words 表重新加载敏感词（仅管理员），不需要重启服务"""
+    require_role(current_user, "admin")
+    return await ModerationService(db).reload()
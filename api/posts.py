@@ -1,18 +1,18 @@
 # api/posts.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, Header, Query
+from typing import Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from api.users import get_current_user
 from services import PostService
 import schemas
-import models
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
 # ============= 依赖注入 =============
 
-def get_post_service(db: Session = Depends(get_db)) -> PostService:
+def get_post_service(db: AsyncSession = Depends(get_async_db)) -> PostService:
     """创建 PostService 实例"""
     return PostService(db)
 
@@ -22,48 +22,89 @@ def get_post_service(db: Session = Depends(get_db)) -> PostService:
 @router.post("", response_model=schemas.PostResponse)
 async def create_post(
     post: schemas.PostCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     post_service: PostService = Depends(get_post_service)
 ):
     """创建文章（需要登录，只有 author 和 admin 可以创建）"""
-    return post_service.create_post(post, current_user.id)
+    return await post_service.create_post(post, current_user.id)
 
 
-@router.get("", response_model=list[schemas.PostResponse])
+@router.get("", response_model=schemas.Page[schemas.PostResponse])
 async def read_posts(
-    skip: int = 0, 
-    limit: int = 10, 
+    cursor: Optional[str] = None, 
+    limit: int = Query(10, ge=1, le=100), 
+    sort: Literal["created_at", "like_count"] = "created_at",
+    if_none_match: Optional[str] = Header(None),
     post_service: PostService = Depends(get_post_service)
 ):
-    """获取所有文章（公开）"""
-    return post_service.get_posts(skip, limit)
+    """
+    获取所有文章（公开）
+    
+    游标分页：第一页不传 cursor，之后传上一页返回的 next_cursor；
+    返回 ETag，带 If-None-Match 且没有变化时返回 304
+    """
+    return await post_service.get_posts(cursor, limit, sort, if_none_match=if_none_match)
+
+
+@router.get("/search", response_model=schemas.Page[schemas.PostSearchHit])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    tag_id: Optional[int] = None,
+    author_id: Optional[int] = None,
+    post_service: PostService = Depends(get_post_service)
+):
+    """
+    全文搜索文章（公开），匹配标题、正文和评论，按相关度排序
+
+    q 中的每个词都必须出现在文章的标题 / 正文中，或者都出现在同一条评论中；
+    词末尾加 * 表示前缀匹配；可按标签、作者筛选。
+    snippet 中命中的词用 <mark></mark> 包围，原文没有做 HTML 转义
+    """
+    return await post_service.search_posts(q, cursor, limit, tag_id=tag_id, author_id=author_id)
+
+
+@router.get("/trending", response_model=schemas.Page[schemas.PostResponse])
+async def read_trending_posts(
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    post_service: PostService = Depends(get_post_service)
+):
+    """
+    热门文章（公开），按热度分数排序、游标分页
+
+    发文、点赞、评论各计一次权重，按半衰期指数衰减（TRENDING_* 配置），越新的互动权重越高
+    """
+    return await post_service.get_trending_posts(cursor, limit)
 
 
 @router.get("/{post_id}", response_model=schemas.PostResponse)
 async def read_post(
     post_id: int, 
+    if_none_match: Optional[str] = Header(None),
     post_service: PostService = Depends(get_post_service)
 ):
-    """获取单篇文章（公开）"""
-    return post_service.get_post(post_id)
+    """获取单篇文章（公开），返回 ETag，带 If-None-Match 且没有变化时返回 304"""
+    return await post_service.get_post(post_id, if_none_match)
 
 
 @router.put("/{post_id}", response_model=schemas.PostResponse)
 async def update_post(
     post_id: int,
     post_data: schemas.PostCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     post_service: PostService = Depends(get_post_service)
 ):
     """更新文章（只有作者或管理员可以）"""
-    return post_service.update_post(post_id, post_data, current_user)
+    return await post_service.update_post(post_id, post_data, current_user)
 
 
 @router.delete("/{post_id}", response_model=schemas.PostResponse)
 async def delete_post(
     post_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.Principal = Depends(get_current_user),
     post_service: PostService = Depends(get_post_service)
 ):
     """删除文章（只有作者或管理员可以）"""
-    return post_service.delete_post(post_id, current_user)
+    return await post_service.delete_post(post_id, current_user)
@@ -1,52 +1,120 @@
 # api/tags.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import List, Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from core.etag import post_page_etag
+from core.pagination import decode_cursor, make_page
+from core.response_cache import response_cache
+from config import settings
+from crud.tag import tag_suggest_index
 import schemas
 import crud
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
 @router.post("", response_model=schemas.TagResponse)
-async def create_tag(tag: schemas.TagCreate, db: Session = Depends(get_db)):
+async def create_tag(tag: schemas.TagCreate, db: AsyncSession = Depends(get_async_db)):
     """创建标签"""
-    return crud.create_tag(db=db, tag=tag)
+    db_tag = await crud.create_tag(db=db, tag=tag)
+    await response_cache.invalidate("tags")
+    return db_tag
 
-@router.get("", response_model=list[schemas.TagResponse])
-async def read_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取所有标签"""
-    tags = crud.get_tags(db=db, skip=skip, limit=limit)
-    return tags
+# 排序方式 -> 游标中的排序键
+TAG_SORT_ATTRS = {"created_at": "created_at", "popular": "post_count"}
+
+@router.get("", response_model=schemas.Page[schemas.TagResponse])
+async def read_tags(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    sort: Literal["created_at", "popular"] = "created_at",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取所有标签（游标分页），sort=popular 时按文章数从多到少排序
+
+    经过响应缓存：标签增删、文章增删标签时失效
+    """
+    kind = f"tags:{sort}"
+
+    async def load():
+        after = decode_cursor(cursor, kind, 2)
+        tags = await crud.get_tags(db=db, after=after, limit=limit, sort=sort)
+        return make_page(tags, limit, kind, lambda tag: (getattr(tag, TAG_SORT_ATTRS[sort]), tag.id))
+
+    # tags:counts 在 post_count 变化时失效，不影响只依赖 tags 的文章缓存
+    return await response_cache.fetch(f"{kind}:{limit}:{cursor}", ["tags", "tags:counts"], load, schemas.Page[schemas.TagResponse])
+
+@router.get("/suggest", response_model=List[schemas.TagSuggestion])
+async def suggest_tags(
+    prefix: str = Query("", max_length=100),
+    limit: int = Query(settings.TAG_SUGGEST_LIMIT, ge=1, le=settings.TAG_SUGGEST_LIMIT),
+):
+    """
+    标签自动补全：名字以 prefix 开头（忽略大小写）的标签，文章数多的在前
+
+    由内存中的前缀索引回答，不查询数据库；prefix 为空时返回最热门的标签
+    """
+    return tag_suggest_index.suggest(prefix, limit)
 
 @router.get("/{tag_id}", response_model=schemas.TagResponse)
-async def read_tag(tag_id: int, db: Session = Depends(get_db)):
+async def read_tag(tag_id: int, db: AsyncSession = Depends(get_async_db)):
     """获取单个标签"""
-    tag = crud.get_tag(db=db, tag_id=tag_id)
+    tag = await crud.get_tag(db=db, tag_id=tag_id)
     if tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
     return tag
 
+@router.get("/{tag_id}/posts", response_model=schemas.Page[schemas.PostResponse])
+async def read_tag_posts(
+    tag_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取带这个标签的文章（游标分页，最新的在前）
+
+    经过响应缓存：文章写入、增删标签时失效；返回 ETag，带 If-None-Match 且没有变化时返回 304
+    """
+    async def load():
+        after = decode_cursor(cursor, "tag_posts", 1)
+        if await crud.get_tag(db=db, tag_id=tag_id) is None:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        posts = await crud.get_tag_posts(db=db, tag_id=tag_id, after=after, limit=limit)
+        return make_page(posts, limit, "tag_posts", lambda post: (post.id,))
+
+    return await response_cache.fetch(
+        f"tag:{tag_id}:posts:{limit}:{cursor}", ["posts", "tags"], load, schemas.Page[schemas.PostResponse],
+        etag=lambda page: post_page_etag(page["items"], page["next_cursor"] is not None),
+        if_none_match=if_none_match, route="posts",
+    )
+
 @router.post("/posts/{post_id}/tags/{tag_id}", response_model=schemas.PostResponse)
-async def add_tag_to_post(post_id: int, tag_id: int, db: Session = Depends(get_db)):
+async def add_tag_to_post(post_id: int, tag_id: int, db: AsyncSession = Depends(get_async_db)):
     """给文章添加标签"""
-    post = crud.add_tag_to_post(db=db, post_id=post_id, tag_id=tag_id)
+    post = await crud.add_tag_to_post(db=db, post_id=post_id, tag_id=tag_id)
     if post is None:
         raise HTTPException(status_code=404, detail="Post or Tag not found")
+    await response_cache.invalidate(f"post:{post_id}", "posts", "tags:counts")
     return post
 
 @router.delete("/posts/{post_id}/tags/{tag_id}", response_model=schemas.PostResponse)
-async def remove_tag_from_post(post_id: int, tag_id: int, db: Session = Depends(get_db)):
+async def remove_tag_from_post(post_id: int, tag_id: int, db: AsyncSession = Depends(get_async_db)):
     """从文章移除标签"""
-    post = crud.remove_tag_from_post(db=db, post_id=post_id, tag_id=tag_id)
+    post = await crud.remove_tag_from_post(db=db, post_id=post_id, tag_id=tag_id)
     if post is None:
         raise HTTPException(status_code=404, detail="Post or Tag not found")
+    await response_cache.invalidate(f"post:{post_id}", "posts", "tags:counts")
     return post
 
 @router.delete("/{tag_id}")
-async def delete_tag(tag_id: int, db: Session = Depends(get_db)):
+async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_async_db)):
     """删除标签"""
-    tag = crud.delete_tag(db=db, tag_id=tag_id)
+    tag = await crud.delete_tag(db=db, tag_id=tag_id)
     if tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
+    await response_cache.invalidate("tags")
     return {"message": "Tag deleted successfully"}
 
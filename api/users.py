@@ -1,57 +1,109 @@
 # api/users.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from database import get_db
+from typing import Optional
+from database import get_async_db
 from auth import create_access_token, verify_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from core.etag import cache_headers, etag_matches, not_modified, user_etag, user_list_etag
 import schemas
 import crud
 import models
+from services import PostService
+from services.post_service import RECENT_POSTS_LIMIT
 
 router = APIRouter(prefix="/users", tags=["users"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# 可选登录：没有 Authorization 头时不报错，token 为 None
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     payload = verify_token(token)
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid token")
     username: str = payload.get("sub")
     if username is None:
         raise HTTPException(status_code=401, detail="Invalid token") 
-    user = crud.get_user_by_username(db=db, username=username)
-    if user is None:
+    # 用户快照有缓存，命中时这个依赖不查数据库
+    principal = await crud.get_principal(db=db, username=username)
+    if principal is None:
         raise HTTPException(status_code=401, detail="Invalid token")
-    return user
+    return principal
+
+async def get_current_user_optional(token: Optional[str] = Depends(optional_oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """公开接口使用：未登录返回 None；带了 token 但无效时仍然返回 401"""
+    if token is None:
+        return None
+    return await get_current_user(token=token, db=db)
+
+async def _user_response(db: AsyncSession, user: models.User, with_posts: bool = True) -> schemas.UserResponse:
+    """组装 UserResponse：用户本身 + 有上限的最近文章预览"""
+    recent_posts = await PostService(db).get_recent_posts(user.id) if with_posts else {"items": []}
+    return schemas.UserResponse(
+        **schemas.UserListItem.model_validate(user).model_dump(),
+        recent_posts=recent_posts,
+    )
+
+async def _user_version_etag(db: AsyncSession, user) -> str:
+    """用版本字段计算 UserResponse 的 ETag（只查最近文章的 id / updated_at，不加载文章）"""
+    rows = await crud.get_post_versions(db, limit=RECENT_POSTS_LIMIT, author_id=user.id, with_author=False)
+    return user_etag(user, rows[:RECENT_POSTS_LIMIT], len(rows) > RECENT_POSTS_LIMIT)
+
+def _user_response_etag(body: schemas.UserResponse) -> str:
+    return user_etag(body, body.recent_posts.items, body.recent_posts.next_cursor is not None)
 
 @router.post("", response_model=schemas.UserResponse)
-async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_username(db=db, username=user.username)
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await crud.get_user_by_username(db=db, username=user.username)
     if db_user is not None:
         raise HTTPException(status_code=400, detail="Username already exists")
-    db_user = crud.get_user_by_email(db=db, email=user.email)
+    db_user = await crud.get_user_by_email(db=db, email=user.email)
     if db_user is not None:
         raise HTTPException(status_code=400, detail="Email already exists")
-    return crud.create_user(db=db, user=user)
+    db_user = await crud.create_user(db=db, user=user)
+    # 新用户还没有文章，不需要查询预览
+    return await _user_response(db, db_user, with_posts=False)
 
-@router.get("", response_model=list[schemas.UserResponse])
-async def read_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    users = crud.get_users(db=db, skip=skip, limit=limit)
+@router.get("", response_model=list[schemas.UserListItem])
+async def read_users(response: Response, skip: int = 0, limit: int = 10, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """用户列表，返回 ETag，带 If-None-Match 且没有变化时返回 304"""
+    if if_none_match:
+        etag = user_list_etag(await crud.get_user_versions(db=db, skip=skip, limit=limit))
+        if etag_matches(if_none_match, etag):
+            return not_modified("users", etag)
+    users = await crud.get_users(db=db, skip=skip, limit=limit)
+    response.headers.update(cache_headers("users", user_list_etag(users)))
     return users
 
 @router.get("/me", response_model=schemas.UserResponse)
-async def read_current_user(current_user: models.User = Depends(get_current_user)):
-    return current_user
+async def read_current_user(response: Response, if_none_match: Optional[str] = Header(None), current_user: schemas.Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    if if_none_match:
+        etag = await _user_version_etag(db, current_user)
+        if etag_matches(if_none_match, etag):
+            return not_modified("me", etag)
+    body = await _user_response(db, current_user)
+    response.headers.update(cache_headers("me", _user_response_etag(body)))
+    return body
 
 @router.get("/{user_id}", response_model=schemas.UserResponse)
-async def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = crud.get_user(db=db, user_id=user_id)
+async def read_user(user_id: int, response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """用户详情，返回 ETag，带 If-None-Match 且没有变化时返回 304（不加载用户和文章）"""
+    if if_none_match:
+        version = await crud.get_user_version(db=db, user_id=user_id)
+        if version is not None:
+            etag = await _user_version_etag(db, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified("user", etag)
+    user = await crud.get_user(db=db, user_id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    body = await _user_response(db, user)
+    response.headers.update(cache_headers("user", _user_response_etag(body)))
+    return body
 
-@router.get("/{user_id}/posts", response_model=list[schemas.PostResponse])
-async def read_user_posts(user_id: int, skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    posts = crud.get_user_posts(db=db, user_id=user_id, skip=skip, limit=limit)
-    return posts
+@router.get("/{user_id}/posts", response_model=schemas.Page[schemas.PostResponse])
+async def read_user_posts(user_id: int, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=100), if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """获取用户的文章（游标分页，最新的在前），返回 ETag，带 If-None-Match 且没有变化时返回 304"""
+    return await PostService(db).get_user_posts(user_id, cursor, limit, if_none_match)
 
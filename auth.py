@@ -1,13 +1,25 @@
+import asyncio
+import hashlib
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from fastapi import HTTPException
 from jose import JWTError, jwt
 from typing import Optional
+from config import settings
+from utils import TTLCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 已有哈希里记录了各自的 cost，修改 BCRYPT_ROUNDS 只影响新生成的哈希
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 # JWT 配置
-SECRET_KEY = "your-secret-key-here-change-in-production"  # 密钥（生产环境要改成随机的）
+SECRET_KEY = settings.SECRET_KEY  # 密钥（生产环境要改成随机的，通过 .env 配置）
 ALGORITHM = "HS256"  # 加密算法
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Token 过期时间（30分钟）
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS  # 刷新令牌过期时间
 
 def hash_password(password:str)->str:
     return pwd_context.hash(password)
@@ -15,6 +27,55 @@ def hash_password(password:str)->str:
 def verify_password(plain_password:str,hashed_password:str)->bool:
     return pwd_context.verify(plain_password,hashed_password)
 
+class PasswordHasher:
+    """
+    在独立的线程池中执行 bcrypt（bcrypt 计算时会释放 GIL）
+
+    bcrypt 每次要几百毫秒 CPU，直接在 async 路由里调用会阻塞事件循环，
+    一波登录请求会让所有其他请求一起卡住。这里限制同时计算的数量（workers），
+    并限制排队的数量（max_pending），超过时直接返回 503，而不是无限排队。
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._pending = 0  # 只在事件循环线程中修改
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry later",
+                headers={"Retry-After": "1"}
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data:dict,expires_delta:Optional[timedelta]=None):
     to_encode = data.copy()
     if expires_delta:
@@ -25,9 +86,45 @@ def create_access_token(data:dict,expires_delta:Optional[timedelta]=None):
     encoded_jwt = jwt.encode(to_encode,SECRET_KEY,algorithm=ALGORITHM)
     return encoded_jwt
 
+# 已验证的 token -> payload，key 由密钥指纹和 token 共同计算
+jwt_cache = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_CACHE_TTL)
+
+@lru_cache(maxsize=8)
+def _key_fingerprint(secret_key:str)->bytes:
+    return hashlib.sha256(secret_key.encode()).digest()
+
+def _jwt_cache_key(token:str)->bytes:
+    """
+    缓存 key 包含当前密钥的指纹：更换 SECRET_KEY 后旧条目不会再命中，
+    用旧密钥签发的 token 会重新走签名校验（并失败）
+    """
+    return hashlib.sha256(_key_fingerprint(SECRET_KEY) + token.encode()).digest()
+
 def verify_token(token:str):
+    """
+    校验 token 并返回 payload，无效时返回 None
+
+    校验通过的结果会缓存到 token 的 exp 为止（不超过 JWT_CACHE_TTL），
+    校验失败的 token 不缓存
+    """
+    cache_key = _jwt_cache_key(token)
+    payload = jwt_cache.get(cache_key)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(token,SECRET_KEY,algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        jwt_cache.set(cache_key, dict(payload), ttl=exp - time.time())
+    return payload
+
+def hash_refresh_token(token:str)->str:
+    """刷新令牌是高熵随机数，SHA-256 足够，不需要 bcrypt"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def generate_refresh_token()->tuple:
+    """生成刷新令牌，返回 (令牌, 令牌哈希)；令牌只返回给客户端，数据库只存哈希"""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
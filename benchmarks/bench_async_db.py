@@ -0,0 +1,171 @@
+"""
+并发吞吐基准：同步 Session vs AsyncSession
+
+对比两种写法在同一个 async 路由里的表现：
+- before: async def 路由里直接调用同步 Session（旧写法，查询期间阻塞事件循环）
+- after:  async def 路由 + AsyncSession（当前写法，查询期间事件循环可以处理其他请求）
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_async_db --posts 2000 --comments 200000 --requests 200 --concurrency 10
+
+输出每种写法的吞吐（req/s）、失败请求数，以及压测期间的事件循环延迟（loop lag）。
+并发数大于同步连接池容量（默认 5 + 10）时，旧写法会在事件循环上同步等待连接，直到池超时。
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import models
+import schemas
+from database import get_async_db
+from main import app
+
+
+def seed(sync_url: str, num_posts: int, num_comments: int):
+    """准备测试数据：评论表足够大，让按 post_id 过滤的查询有明显耗时"""
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "username": "bench", "email": "bench@example.com", "hashed_password": "x", "role": "author"}
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": i, "title": f"post {i}", "content": "content", "author_id": 1, "like_count": 0}
+            for i in range(1, num_posts + 1)
+        ])
+        batch = []
+        for i in range(num_comments):
+            batch.append({"content": "comment", "post_id": i % num_posts + 1, "user_id": 1})
+            if len(batch) == 10000:
+                conn.execute(insert(models.Comment), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(models.Comment), batch)
+    engine.dispose()
+
+
+def build_legacy_app(sync_url: str) -> FastAPI:
+    """复刻旧写法：async def 路由 + 同步 Session"""
+    engine = create_engine(sync_url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    legacy = FastAPI()
+
+    @legacy.get("/")
+    async def read_root():
+        return {"message": "Hello World"}
+
+    @legacy.get("/posts/{post_id}/comments", response_model=list[schemas.CommentResponse])
+    async def get_comments(post_id: int, db: Session = Depends(get_db)):
+        db.query(models.Post).filter(models.Post.id == post_id).first()
+        return db.query(models.Comment).filter(models.Comment.post_id == post_id).all()
+
+    return legacy
+
+
+def use_async_app(async_url: str) -> FastAPI:
+    """当前写法：把 main.app 的 AsyncSession 依赖指向测试数据库"""
+    engine = create_async_engine(async_url, connect_args={"check_same_thread": False})
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+
+async def run_load(target: FastAPI, num_posts: int, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i % num_posts + 1)
+        loop_lags = []
+        errors = 0
+        done = asyncio.Event()
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                post_id = queue.get_nowait()
+                try:
+                    r = await client.get(f"/posts/{post_id}/comments")
+                    r.raise_for_status()
+                except Exception:
+                    # 同步连接池耗尽时，checkout 会在事件循环上同步等待直到超时
+                    errors += 1
+
+        async def probe():
+            # 事件循环延迟：sleep 5ms 实际醒来晚了多少，反映循环被同步调用阻塞的时间
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                loop_lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    loop_lags.sort()
+    return {
+        "rps": (total - errors) / elapsed,
+        "elapsed": elapsed,
+        "errors": errors,
+        "lag_p50": statistics.median(loop_lags) if loop_lags else 0.0,
+        "lag_max": loop_lags[-1] if loop_lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(f"sqlite:///{path}", args.posts, args.comments)
+
+        results = {
+            "before (sync Session)": asyncio.run(
+                run_load(build_legacy_app(f"sqlite:///{path}"), args.posts, args.requests, args.concurrency)
+            ),
+            "after (AsyncSession)": asyncio.run(
+                run_load(use_async_app(f"sqlite+aiosqlite:///{path}"), args.posts, args.requests, args.concurrency)
+            ),
+        }
+
+    print(f"comments={args.comments} requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'mode':<24}{'req/s':>10}{'elapsed(s)':>12}{'errors':>8}{'loop lag p50(ms)':>18}{'loop lag max(ms)':>18}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['rps']:>10.1f}{r['elapsed']:>12.2f}{r['errors']:>8}{r['lag_p50']:>18.2f}{r['lag_max']:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+鉴权开销微基准：JWT 校验缓存 / 用户快照缓存 开 vs 关
+
+- verify_token: 单次 JWT 校验的耗时（签名校验 vs 缓存命中）
+- get_current_user: 每个登录请求的鉴权依赖总耗时（JWT 校验 + 查当前用户）
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import auth
+import crud.user
+import models
+from api.users import get_current_user
+from utils import TTLCache
+
+DISABLED = TTLCache(maxsize=0, ttl=0)
+
+
+def bench_verify(token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        auth.verify_token(token)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def bench_dependency(async_url: str, token: str, iterations: int) -> float:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    try:
+        async with SessionLocal() as db:
+            await get_current_user(token=token, db=db)  # 预热连接和缓存
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await get_current_user(token=token, db=db)
+            return (time.perf_counter() - start) / iterations * 1e6
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "bench"})
+    original = auth.jwt_cache, crud.user.principal_cache
+    caches = {
+        "no cache": (DISABLED, DISABLED),
+        "jwt cache": (TTLCache(1000, 300), DISABLED),
+        "jwt + principal cache": (TTLCache(1000, 300), TTLCache(1000, 60)),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_auth.db")
+        engine = create_engine(f"sqlite:///{path}")
+        models.Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.User), [{"username": "bench", "email": "bench@example.com", "hashed_password": "x"}])
+        engine.dispose()
+
+        print(f"iterations={args.iterations}")
+        print(f"{'caches':<24}{'verify_token(us)':>18}{'get_current_user(us)':>22}")
+        try:
+            for name, (jwt_cache, principal_cache) in caches.items():
+                auth.jwt_cache, crud.user.principal_cache = jwt_cache, principal_cache
+                verify_us = bench_verify(token, args.iterations)
+                dependency_us = asyncio.run(bench_dependency(f"sqlite+aiosqlite:///{path}", token, args.iterations // 10))
+                print(f"{name:<24}{verify_us:>18.1f}{dependency_us:>22.1f}")
+        finally:
+            auth.jwt_cache, crud.user.principal_cache = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+评论列表基准：一次取出全部评论 vs 分页的顶层评论 + 回复预览 / 子树分页
+
+在临时 SQLite 数据库中给一篇文章生成 --comments 条评论（约 1/10 是顶层评论，其余是多层回复），分别统计：
+- all: 原来的做法，一次查出这篇文章的全部评论（带评论者）
+- page: 第一页 20 条顶层评论 + 每条 3 条回复预览（两条查询）
+- page (deep): 用游标翻到最后一页的同样查询
+- thread: 某条评论子树的第一页 / 最后一页（50 条）
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_comments --comments 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import crud
+import models
+from crud import loaders
+from models.comment import comment_path
+
+TOP_LEVEL_RATIO = 10
+PAGE_SIZE = 20
+PREVIEWS = 3
+THREAD_PAGE_SIZE = 50
+
+
+def seed(sync_url: str, num_comments: int):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    comments = []
+    for i in range(1, num_comments + 1):
+        parent = comments[rng.randrange(len(comments))] if i % TOP_LEVEL_RATIO and comments else None
+        comments.append({
+            "id": i, "content": f"comment {i}", "post_id": 1, "user_id": 1 + i % 100,
+            "parent_id": parent["id"] if parent else None,
+            "depth": parent["depth"] + 1 if parent else 0,
+            "path": comment_path(parent["path"] if parent else "", i),
+            "reply_count": 0,
+        })
+        if parent:
+            parent["reply_count"] += 1
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(1, 101)
+        ])
+        conn.execute(insert(models.Post), [{"id": 1, "title": "post", "content": "content", "author_id": 1}])
+        conn.execute(insert(models.Comment), comments)
+    engine.dispose()
+    # 回复最多的顶层评论，用来测子树分页
+    sizes = Counter(c["path"].split("/", 1)[0] for c in comments)
+    return int(sizes.most_common(1)[0][0])
+
+
+async def timed(fn, min_time: float = 0.5) -> float:
+    """重复执行直到累计超过 min_time 秒，返回单次耗时（毫秒）"""
+    runs, start = 0, time.perf_counter()
+    while True:
+        await fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1000
+
+
+async def run(async_url: str, thread_root: int):
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    try:
+        async with SessionLocal() as db:
+            async def all_comments():
+                result = await db.execute(
+                    select(models.Comment).options(*loaders.COMMENT_RESPONSE).filter(models.Comment.post_id == 1)
+                )
+                return result.scalars().all()
+
+            async def page(after=None):
+                rows = await crud.get_top_comments(db, 1, after=after, limit=PAGE_SIZE)
+                await crud.get_reply_previews(db, 1, [c.id for c in rows[:PAGE_SIZE]], PREVIEWS)
+
+            last_top = (await db.execute(
+                select(models.Comment.id).filter(models.Comment.post_id == 1, models.Comment.parent_id.is_(None))
+                .order_by(models.Comment.id.desc()).limit(1).offset(PAGE_SIZE)
+            )).scalar_one()
+
+            root = await crud.get_comment(db, thread_root)
+            last_path = (await db.execute(
+                select(models.Comment.path).filter(models.Comment.path.like(root.path + "/%"))
+                .order_by(models.Comment.path.desc()).limit(1).offset(THREAD_PAGE_SIZE)
+            )).scalar_one()
+
+            print(f"{'query':<24}{'ms':>10}{'rows':>10}")
+            print(f"{'all':<24}{await timed(all_comments):>10.2f}{len(await all_comments()):>10}")
+            print(f"{'page':<24}{await timed(page):>10.2f}{PAGE_SIZE:>10}")
+            print(f"{'page (deep)':<24}{await timed(lambda: page((last_top,))):>10.2f}{PAGE_SIZE:>10}")
+            print(f"{'thread':<24}{await timed(lambda: crud.get_comment_subtree(db, root, limit=THREAD_PAGE_SIZE)):>10.2f}{THREAD_PAGE_SIZE:>10}")
+            print(f"{'thread (deep)':<24}"
+                  f"{await timed(lambda: crud.get_comment_subtree(db, root, after=(last_path,), limit=THREAD_PAGE_SIZE)):>10.2f}"
+                  f"{THREAD_PAGE_SIZE:>10}")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_comments.db")
+        thread_root = seed(f"sqlite:///{path}", args.comments)
+        print(f"comments={args.comments} thread_root={thread_root}")
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}", thread_root))
+
+
+if __name__ == "__main__":
+    main()
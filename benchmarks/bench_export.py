@@ -0,0 +1,102 @@
+"""
+导出基准：流式 NDJSON 导出（ExportService）的吞吐和峰值内存
+
+在临时 SQLite 数据库中生成 --posts 篇文章，分别统计：
+- export / export gzip: 通过服务端游标分批编码整张表，记录行数、输出字节数、rows/s 和 Python 峰值内存
+- all(): 对照，一次把整张表查成 ORM 对象（分页接口每页都是这样缓存一个列表，页越大占用越高）
+
+对一半大小的表再跑一次导出，峰值内存应该基本不变（只和 EXPORT_BATCH_SIZE 有关）。
+耗时包含 tracemalloc 的开销，只用来相互比较。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_export --posts 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models
+from services.export_service import ExportService
+
+
+def seed(sync_url: str, num_posts: int):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "username": "bench", "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(models.Post), [
+            {"id": i, "title": f"post {i}", "content": "lorem ipsum dolor sit amet " * 20, "author_id": 1}
+            for i in range(1, num_posts + 1)
+        ])
+    engine.dispose()
+
+
+def truncate(sync_url: str, keep: int):
+    engine = create_engine(sync_url)
+    with engine.begin() as conn:
+        conn.execute(delete(models.Post).filter(models.Post.id > keep))
+    engine.dispose()
+
+
+async def measure(fn):
+    """返回 (结果, 耗时秒, Python 峰值内存 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = await fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+async def run(async_url: str, num_rows: int):
+    label = f"({num_rows})"
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    service = ExportService(SessionLocal)
+    try:
+        for name, compress in ((f"export {label}", False), (f"export gzip {label}", True)):
+            async def export():
+                size = 0
+                async for chunk in service.iter_ndjson("posts", compress=compress):
+                    size += len(chunk)
+                return size
+            size, elapsed, peak = await measure(export)
+            print(f"{name:<24}{elapsed:>10.2f}{size / 1024 / 1024:>10.1f}{num_rows / elapsed:>12,.0f}{peak:>10.1f}")
+
+        async def load_all():
+            async with SessionLocal() as db:
+                return len((await db.execute(select(models.Post))).scalars().all())
+        _, elapsed, peak = await measure(load_all)
+        print(f"{'all() ' + label:<24}{elapsed:>10.2f}{'-':>10}{'-':>12}{peak:>10.1f}")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_export.db")
+        seed(f"sqlite:///{path}", args.posts)
+        print(f"{'':<24}{'s':>10}{'MB out':>10}{'rows/s':>12}{'peak MB':>10}")
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}", args.posts))
+        truncate(f"sqlite:///{path}", args.posts // 2)
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}", args.posts // 2))
+
+
+if __name__ == "__main__":
+    main()
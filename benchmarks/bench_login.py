@@ -0,0 +1,153 @@
+"""
+登录吞吐 / 延迟基准：bcrypt 在事件循环上执行 vs 在线程池中执行
+
+对每个 bcrypt cost 分别测试两种写法：
+- inline: 在 async 路由里直接调用 bcrypt（旧写法，计算期间阻塞事件循环）
+- pool:   auth.password_hasher 线程池（当前写法，排队超过上限时返回 503）
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_login --rounds 4,8,10,12 --requests 100 --concurrency 20
+
+输出每分钟可处理的登录数、登录延迟 p50 / p95、被拒绝（503）的请求数，
+以及压测期间的事件循环延迟（loop lag，反映其他请求被卡住的时间）。
+单核机器上线程池版本的吞吐不会更高，收益在于事件循环不再被卡住。
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import auth
+import crud.user
+import models
+from config import settings
+from database import get_async_db
+from main import app
+
+NUM_USERS = 20
+PASSWORD = "benchmark-password"
+
+
+class InlineHasher(auth.PasswordHasher):
+    """旧写法：直接在事件循环上计算"""
+
+    async def _run(self, fn, *args):
+        return fn(*args)
+
+
+def seed(sync_url: str, hashed_password: str):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": hashed_password}
+            for i in range(NUM_USERS)
+        ])
+    engine.dispose()
+
+
+async def run_load(async_url: str, total: int, concurrency: int) -> dict:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    latencies, loop_lags = [], []
+    shed = errors = 0
+    done = asyncio.Event()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            queue = asyncio.Queue()
+            for i in range(total):
+                queue.put_nowait(i % NUM_USERS)
+
+            async def worker():
+                nonlocal shed, errors
+                while not queue.empty():
+                    i = queue.get_nowait()
+                    start = time.perf_counter()
+                    r = await client.post("/login", data={"username": f"user{i}", "password": PASSWORD})
+                    if r.status_code == 503:
+                        shed += 1
+                    elif r.status_code != 200:
+                        errors += 1
+                    else:
+                        latencies.append((time.perf_counter() - start) * 1000)
+
+            async def probe():
+                # 事件循环延迟：sleep 5ms 实际醒来晚了多少
+                while not done.is_set():
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    loop_lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+            probe_task = asyncio.create_task(probe())
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            done.set()
+            await probe_task
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await engine.dispose()
+
+    latencies.sort()
+    return {
+        "per_min": len(latencies) / elapsed * 60,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "shed": shed,
+        "errors": errors,
+        "lag_max": max(loop_lags) if loop_lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", default="4,8,10,12", help="逗号分隔的 bcrypt cost")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=settings.PASSWORD_HASH_MAX_PENDING)
+    args = parser.parse_args()
+
+    hashers = {
+        "inline": InlineHasher(1, 0),
+        "pool": auth.PasswordHasher(args.workers, args.max_pending),
+    }
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"workers={hashers['pool'].workers} max_pending={args.max_pending}")
+    print(f"{'rounds':>6}  {'mode':<8}{'logins/min':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'503':>6}{'errors':>8}{'loop lag max(ms)':>18}")
+
+    original_context, original_hasher = auth.pwd_context, crud.user.password_hasher
+    try:
+        for rounds in (int(r) for r in args.rounds.split(",")):
+            auth.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "bench_login.db")
+                seed(f"sqlite:///{path}", auth.hash_password(PASSWORD))
+                for mode, hasher in hashers.items():
+                    crud.user.password_hasher = hasher
+                    r = asyncio.run(run_load(f"sqlite+aiosqlite:///{path}", args.requests, args.concurrency))
+                    print(f"{rounds:>6}  {mode:<8}{r['per_min']:>12.0f}{r['p50']:>10.1f}{r['p95']:>10.1f}"
+                          f"{r['shed']:>6}{r['errors']:>8}{r['lag_max']:>18.1f}")
+    finally:
+        auth.pwd_context, crud.user.password_hasher = original_context, original_hasher
+
+
+if __name__ == "__main__":
+    main()
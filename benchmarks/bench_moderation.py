@@ -0,0 +1,86 @@
+"""
+敏感词检查基准：逐词正则（旧实现） vs 编译好的前缀树正则（SensitiveWordMatcher）
+
+对不同大小的词表和正文分别计时，正文不含敏感词（最坏情况：需要扫描全文）。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_moderation --words 8,1000,50000 --sizes 1024,102400,1048576
+
+旧实现每次调用都要逐词搜索一遍全文，词表很大时非常慢，超过 --legacy-max-words 的词表不测旧实现。
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content_moderation import DEFAULT_SENSITIVE_WORDS, SensitiveWordMatcher
+
+
+def legacy_contains(content: str, sensitive_words: list) -> bool:
+    """旧实现：转小写后逐词搜索"""
+    content_lower = content.lower()
+    for word in sensitive_words:
+        pattern = r'\b' + re.escape(word) + r'\b'
+        if re.search(pattern, content_lower):
+            return True
+    return False
+
+
+def make_words(count: int, rng: random.Random) -> list:
+    words = set(DEFAULT_SENSITIVE_WORDS[:count])
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))))
+    return sorted(words)
+
+
+def make_body(size: int, words: set, rng: random.Random) -> str:
+    """生成不含敏感词的正文（3~8 个字母的单词，用空格和标点分隔）"""
+    parts, length = [], 0
+    while length < size:
+        word = "".join(rng.choice(string.ascii_letters) for _ in range(rng.randint(3, 8)))
+        if word.lower() in words:
+            continue
+        parts.append(word + rng.choice("     ,."))
+        length += len(parts[-1])
+    return "".join(parts)[:size]
+
+
+def timed(fn, *args, min_time: float = 0.5) -> float:
+    """重复执行直到累计超过 min_time 秒，返回单次耗时（毫秒）"""
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn(*args)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="8,1000,50000", help="逗号分隔的词表大小")
+    parser.add_argument("--sizes", default="1024,102400,1048576", help="逗号分隔的正文字节数")
+    parser.add_argument("--legacy-max-words", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'words':>7}{'body':>10}{'compile(ms)':>14}{'legacy(ms)':>14}{'matcher(ms)':>14}")
+    for count in (int(w) for w in args.words.split(",")):
+        words = make_words(count, rng)
+        start = time.perf_counter()
+        matcher = SensitiveWordMatcher(words)
+        compile_ms = (time.perf_counter() - start) * 1000
+        for size in (int(s) for s in args.sizes.split(",")):
+            body = make_body(size, set(words), rng)
+            assert not matcher.contains(body)
+            legacy = f"{timed(legacy_contains, body, words):.2f}" if count <= args.legacy_max_words else "-"
+            print(f"{count:>7}{size:>10}{compile_ms:>14.1f}{legacy:>14}{timed(matcher.contains, body):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
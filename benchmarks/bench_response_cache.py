@@ -0,0 +1,126 @@
+"""
+响应缓存基准：热点读接口在缓存开 / 关时的单请求耗时
+
+在临时 SQLite 数据库中生成文章、标签和评论，通过 ASGI 直接请求（不经过网络）：
+- GET /posts/{id}
+- GET /posts?limit=20
+- GET /posts/{id}/comments
+- GET /tags
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_response_cache --posts 1000 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import core.response_cache as rc
+import models
+from database import get_async_db
+from main import app
+
+NUM_TAGS = 20
+COMMENTS_PER_POST = 10
+
+
+def seed(sync_url: str, num_posts: int):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"username": "bench", "email": "bench@example.com", "hashed_password": "x", "role": "author"}])
+        conn.execute(insert(models.Tag), [{"name": f"tag{i}"} for i in range(NUM_TAGS)])
+        conn.execute(insert(models.Post), [
+            {"title": f"post {i}", "content": "lorem ipsum " * 50, "author_id": 1} for i in range(num_posts)
+        ])
+        conn.execute(insert(models.post_tags), [
+            {"post_id": post_id, "tag_id": tag_id}
+            for post_id in range(1, num_posts + 1)
+            for tag_id in rng.sample(range(1, NUM_TAGS + 1), 3)
+        ])
+        conn.execute(insert(models.Comment), [
+            {"content": "nice post", "post_id": post_id, "user_id": 1}
+            for post_id in range(1, num_posts + 1)
+            for _ in range(COMMENTS_PER_POST)
+        ])
+    engine.dispose()
+
+
+async def run(async_url: str, urls: list) -> float:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            for url in urls:
+                r = await client.get(url)
+                assert r.status_code == 200, r.text
+            return (time.perf_counter() - start) / len(urls) * 1e6
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await engine.dispose()
+
+
+def _cache_users():
+    import api.tags
+    import services.comment_service
+    import services.like_service
+    import services.post_service
+    return [api.tags, services.comment_service, services.like_service, services.post_service]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hot", type=int, default=100, help="请求集中在前多少篇文章上")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    endpoints = {
+        "/posts/{id}": lambda: f"/posts/{rng.randint(1, args.hot)}",
+        "/posts": lambda: "/posts?limit=20",
+        "/posts/{id}/comments": lambda: f"/posts/{rng.randint(1, args.hot)}/comments",
+        "/tags": lambda: "/tags",
+    }
+    original = rc.response_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_response_cache.db")
+        seed(f"sqlite:///{path}", args.posts)
+        print(f"posts={args.posts} requests={args.requests} hot={args.hot}")
+        print(f"{'endpoint':<24}{'no cache(us)':>14}{'memory(us)':>14}{'hit rate':>10}")
+        try:
+            for name, make_url in endpoints.items():
+                urls = [make_url() for _ in range(args.requests)]
+                results = []
+                for cache in (rc.ResponseCache(None), rc.ResponseCache(rc.MemoryBackend(10000, 60))):
+                    # 服务层和路由模块在导入时绑定了 response_cache，这里逐个替换
+                    for module in _cache_users():
+                        module.response_cache = cache
+                    results.append(asyncio.run(run(f"sqlite+aiosqlite:///{path}", urls)))
+                hit_rate = cache.hits / (cache.hits + cache.misses)
+                print(f"{name:<24}{results[0]:>14.0f}{results[1]:>14.0f}{hit_rate:>10.2%}")
+        finally:
+            for module in _cache_users():
+                module.response_cache = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+全文搜索基准：FTS 索引（crud.search_posts） vs LIKE '%词%' 扫描 posts 表
+
+在临时 SQLite 数据库中生成文章和评论（触发器同步建立索引），分别统计：
+- 写入全部数据的耗时（含触发器维护索引的开销）
+- 常见词 / 少见词查询第一页（limit 20）的单次耗时
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_search --posts 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import crud
+import models
+
+COMMENTS_PER_POST = 3
+# 常见词出现在每篇文章里，少见词大约每 1000 篇出现一次
+COMMON, RARE = "python", "zeppelin"
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(words))
+
+
+def seed(sync_url: str, num_posts: int) -> float:
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"username": "bench", "email": "bench@example.com", "hashed_password": "x", "role": "author"}])
+        conn.execute(insert(models.Post), [
+            {"title": make_text(rng, 6), "author_id": 1,
+             "content": f"{COMMON} {make_text(rng, 150)}" + (f" {RARE}" if i % 1000 == 0 else "")}
+            for i in range(num_posts)
+        ])
+        conn.execute(insert(models.Comment), [
+            {"content": make_text(rng, 20), "post_id": post_id, "user_id": 1}
+            for post_id in range(1, num_posts + 1)
+            for _ in range(COMMENTS_PER_POST)
+        ])
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+
+async def timed(fn, min_time: float = 0.5) -> float:
+    """重复执行直到累计超过 min_time 秒，返回单次耗时（毫秒）"""
+    runs, start = 0, time.perf_counter()
+    while True:
+        await fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1000
+
+
+async def run(async_url: str):
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    try:
+        async with SessionLocal() as db:
+            for word in (COMMON, RARE):
+                async def fts():
+                    return await crud.search_posts(db, word, limit=20)
+
+                async def like():
+                    pattern = f"%{word}%"
+                    comments = select(models.Comment.post_id).filter(models.Comment.content.like(pattern))
+                    result = await db.execute(
+                        select(models.Post).filter(or_(
+                            models.Post.title.like(pattern), models.Post.content.like(pattern),
+                            models.Post.id.in_(comments),
+                        )).order_by(models.Post.id.desc()).limit(21)
+                    )
+                    return result.scalars().all()
+
+                hits = len(await fts())
+                print(f"{word:<10}{hits:>6}{await timed(fts):>12.2f}{await timed(like):>12.2f}")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_search.db")
+        elapsed = seed(f"sqlite:///{path}", args.posts)
+        print(f"posts={args.posts} comments={args.posts * COMMENTS_PER_POST} seed={elapsed:.1f}s")
+        print(f"{'query':<10}{'hits':>6}{'fts(ms)':>12}{'like(ms)':>12}")
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+标签自动补全基准：内存前缀索引（TagSuggestIndex） vs 数据库前缀查询
+
+在临时 SQLite 数据库中生成标签（随机名字和文章数），对不同长度的前缀分别计时：
+- index: tag_suggest_index.suggest(prefix, 10)
+- sql:   SELECT ... WHERE name LIKE 'prefix%' ORDER BY post_count DESC LIMIT 10
+另外统计修改文章数后第一次查询的耗时（需要修正或重算缓存）。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_tag_suggest --tags 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+
+import models
+from core.tag_suggest import TagSuggestIndex
+
+
+def timed(fn, *args, min_time: float = 0.5) -> float:
+    """重复执行直到累计超过 min_time 秒，返回单次耗时（微秒）"""
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn(*args)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tags", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = {}
+    while len(rows) < args.tags:
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+        rows[name] = rng.randint(0, 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench_tag_suggest.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Tag), [{"name": name, "post_count": count} for name, count in rows.items()])
+
+        async def load():
+            with engine.connect() as conn:
+                return conn.execute(select(models.Tag.id, models.Tag.name, models.Tag.post_count)).all()
+
+        index = TagSuggestIndex(load, top_k=10)
+        start = time.perf_counter()
+        asyncio.run(index.reload())
+        print(f"tags={args.tags} load={time.perf_counter() - start:.2f}s")
+
+        def sql(prefix):
+            with engine.connect() as conn:
+                conn.execute(
+                    select(models.Tag.id, models.Tag.name, models.Tag.post_count)
+                    .filter(models.Tag.name.like(prefix + "%"))
+                    .order_by(models.Tag.post_count.desc(), models.Tag.id.desc())
+                    .limit(10)
+                ).all()
+
+        print(f"{'prefix':<8}{'index(us)':>12}{'sql(us)':>12}")
+        for prefix in ("", "a", "ab", "abc", "abcd"):
+            print(f"{prefix!r:<8}{timed(index.suggest, prefix, 10):>12.1f}{timed(sql, prefix):>12.0f}")
+        engine.dispose()
+
+    # 修改文章数后的第一次查询（前 1000 个标签逐个修改，每次修改后查询根前缀和首字母前缀）
+    tag_ids = list(range(1, 1001))
+    for label, change in (("increase", 1), ("decrease", -1)):
+        start = time.perf_counter()
+        for tag_id in tag_ids:
+            name, count = index._index.tags[tag_id]
+            index.set_counts([(tag_id, max(count + change, 0))])
+            index.suggest("", 10)
+            index.suggest(name[0], 10)
+        print(f"update ({label}) + 2 queries: {(time.perf_counter() - start) / len(tag_ids) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+热门文章基准：预先维护的分数表（crud.get_trending_posts） vs 查询时计算衰减分数排序
+
+在临时 SQLite 数据库中生成文章、点赞和评论（时间分布在最近 30 天），分别统计：
+- table: 从 post_scores 按 (score, post_id) 索引倒序读前 20 篇
+- query: 对每篇文章按 (发文 + 点赞 + 评论) 的权重和发布时间计算衰减分数后排序取前 20
+  （只按文章发布时间衰减，比分数表的逐事件衰减还要粗糙，仍然要扫描全部文章）
+- 每次点赞 / 评论额外执行的 add_post_score 耗时
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_trending --posts 50000
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Float, create_engine, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import crud
+import models
+from config import settings
+from crud.trending import DECAY_RATE, epoch_seconds
+
+LIKES_PER_POST = 5
+COMMENTS_PER_POST = 1
+DAYS = 30
+
+
+def seed(sync_url: str, num_posts: int) -> int:
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    ago = lambda: now - timedelta(seconds=rng.uniform(0, DAYS * 86400))
+    posts = [{"id": i, "title": f"post {i}", "content": "content", "author_id": 1, "created_at": ago()}
+             for i in range(1, num_posts + 1)]
+    likes = [{"user_id": 1 + n, "post_id": p["id"], "created_at": max(p["created_at"], ago())}
+             for p in posts for n in range(rng.randint(0, LIKES_PER_POST * 2))]
+    comments = [{"content": "comment", "user_id": 1, "post_id": p["id"], "created_at": max(p["created_at"], ago())}
+                for p in posts for _ in range(rng.randint(0, COMMENTS_PER_POST * 2))]
+    like_counts = defaultdict(int)
+    for like in likes:
+        like_counts[like["post_id"]] += 1
+    for p in posts:
+        p["like_count"] = like_counts[p["id"]]
+
+    with engine.begin() as conn:
+        anchor = conn.execute(select(models.TrendingAnchor.anchor)).scalar_one()
+        scores = defaultdict(float)
+        for rows, weight in ((posts, settings.TRENDING_POST_WEIGHT), (likes, settings.TRENDING_LIKE_WEIGHT),
+                             (comments, settings.TRENDING_COMMENT_WEIGHT)):
+            for row in rows:
+                post_id = row["post_id"] if "post_id" in row else row["id"]
+                scores[post_id] += weight * math.exp(DECAY_RATE * (epoch_seconds(row["created_at"]) - anchor))
+        conn.execute(insert(models.User), [{"id": 1, "username": "bench", "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(models.Post), posts)
+        conn.execute(insert(models.Like), likes)
+        conn.execute(insert(models.Comment), comments)
+        conn.execute(insert(models.PostScore), [{"post_id": pid, "score": score} for pid, score in scores.items()])
+    engine.dispose()
+    return len(likes) + len(comments)
+
+
+async def timed(fn, min_time: float = 0.5) -> float:
+    """重复执行直到累计超过 min_time 秒，返回单次耗时（毫秒）"""
+    runs, start = 0, time.perf_counter()
+    while True:
+        await fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1000
+
+
+async def run(async_url: str, num_posts: int):
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    try:
+        async with SessionLocal() as db:
+            async def table():
+                return await crud.get_trending_posts(db, limit=20)
+
+            comment_counts = select(
+                models.Comment.post_id, func.count().label("n")
+            ).group_by(models.Comment.post_id).subquery()
+            age = literal(time.time(), Float) - (func.julianday(models.Post.created_at) - 2440587.5) * 86400
+            score = (
+                settings.TRENDING_POST_WEIGHT
+                + models.Post.like_count * settings.TRENDING_LIKE_WEIGHT
+                + func.coalesce(comment_counts.c.n, 0) * settings.TRENDING_COMMENT_WEIGHT
+            ) * func.exp(-DECAY_RATE * age)
+
+            async def query():
+                result = await db.execute(
+                    select(models.Post).outerjoin(comment_counts, comment_counts.c.post_id == models.Post.id)
+                    .order_by(score.desc(), models.Post.id.desc()).limit(21)
+                )
+                return result.scalars().all()
+
+            print(f"{'read top 20':<24}{'table':>10}{'query':>10}  (ms)")
+            print(f"{'':<24}{await timed(table):>10.2f}{await timed(query):>10.2f}")
+
+            rng = random.Random(7)
+
+            async def event():
+                await crud.add_post_score(db, rng.randint(1, num_posts), settings.TRENDING_LIKE_WEIGHT)
+                await db.commit()
+
+            async def bump():
+                # 对照：只更新一行计数的代价
+                await db.execute(update(models.Post).filter(models.Post.id == rng.randint(1, num_posts))
+                                 .values(like_count=models.Post.like_count + 1))
+                await db.commit()
+
+            print(f"{'per event (ms)':<24}{'score':>10}{'counter':>10}")
+            print(f"{'':<24}{await timed(event):>10.3f}{await timed(bump):>10.3f}")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_trending.db")
+        events = seed(f"sqlite:///{path}", args.posts)
+        print(f"posts={args.posts} likes+comments={events}")
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}", args.posts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+点赞计数写缓冲的关闭检查（core.counters.CounterBuffer）
+
+写回很慢（每条 SQL 前都等待一段时间）时，在写回进行中关闭缓冲，检查增减量没有丢失：
+- stop: 写回任务正在执行 UPDATE 时调用 stop()，数据库里的计数应等于全部增减量
+- cancel: 写回任务正在执行 UPDATE 时直接取消任务，增减量应回到缓冲中，下一次 flush() 写回
+
+任何一项不符合时脚本以非零状态退出。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.counter_shutdown
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models
+from core.counters import CounterBuffer
+
+NUM_POSTS = 5
+SLOW_SECONDS = 0.5
+
+
+class SlowSession(AsyncSession):
+    """每条 SQL 执行前先等待，模拟写回时数据库很慢"""
+
+    async def execute(self, *args, **kwargs):
+        await asyncio.sleep(SLOW_SECONDS)
+        return await super().execute(*args, **kwargs)
+
+
+def seed(sync_url: str):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "username": "user1", "email": "user1@example.com", "hashed_password": "x"}])
+        conn.execute(insert(models.Post), [
+            {"id": i, "title": f"post {i}", "content": "content", "author_id": 1, "like_count": 0}
+            for i in range(1, NUM_POSTS + 1)
+        ])
+    engine.dispose()
+
+
+async def like_counts(SessionLocal) -> dict:
+    async with SessionLocal() as db:
+        result = await db.execute(select(models.Post.id, models.Post.like_count))
+        return dict(result.all())
+
+
+async def add_likes(buffer: CounterBuffer, SessionLocal):
+    """每篇文章点赞一次，提交后进入缓冲"""
+    async with SessionLocal() as db:
+        for post_id in range(1, NUM_POSTS + 1):
+            buffer.add(db, post_id, 1)
+        await db.commit()
+
+
+async def check(async_url: str) -> list:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    SlowSessionLocal = async_sessionmaker(bind=engine, class_=SlowSession, expire_on_commit=False)
+    results = []
+    try:
+        # stop(): 写回进行中关闭，应等写回完成
+        buffer = CounterBuffer(models.Post, "like_count", SlowSessionLocal, enabled=True, flush_interval=0.05)
+        buffer.start()
+        await add_likes(buffer, SessionLocal)
+        await asyncio.sleep(0.2)  # 定时写回已经开始，正在等待慢 SQL
+        await buffer.stop()
+        counts = await like_counts(SessionLocal)
+        results.append(("stop during slow flush", sum(counts.values()), NUM_POSTS))
+
+        # cancel: 写回进行中取消任务，增减量应放回缓冲
+        # （沿用同一个缓冲：每个 CounterBuffer 都在 Session 上注册提交事件，第二个实例会和第一个争抢增减量）
+        buffer.start()
+        await add_likes(buffer, SessionLocal)
+        await asyncio.sleep(0.2)
+        buffer._task.cancel()
+        try:
+            await buffer._task
+        except asyncio.CancelledError:
+            pass
+        buffer._task = None
+        pending = sum(buffer.pending(post_id) for post_id in range(1, NUM_POSTS + 1))
+        results.append(("pending after cancel", pending, NUM_POSTS))
+        await buffer.flush()
+        counts = await like_counts(SessionLocal)
+        results.append(("flush after cancel", sum(counts.values()), 2 * NUM_POSTS))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "counter_shutdown.db")
+        seed(f"sqlite:///{path}")
+        results = asyncio.run(check(f"sqlite+aiosqlite:///{path}"))
+
+    failed = False
+    print(f"{'case':<28}{'likes':>8}{'expected':>10}")
+    for name, got, expected in results:
+        flag = "" if got == expected else "  <-- lost"
+        failed = failed or got != expected
+        print(f"{name:<28}{got:>8}{expected:>10}{flag}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
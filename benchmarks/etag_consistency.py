@@ -0,0 +1,121 @@
+"""
+点赞后的条件请求检查（ETag 与响应缓存）
+
+文章的 ETag 有两条计算路径：响应缓存命中时使用缓存里的 ETag，
+没有缓存（或未命中）时用轻量的版本查询计算（core/etag.py）。
+两条路径对同一个资源必须给出相同的结果，否则客户端会在一种部署下拿到 304 旧内容，另一种下拿到 200。
+
+分别在关闭和开启响应缓存时执行：读取文章详情和文章列表（记下 ETag，开启时写入缓存），
+点赞，再带 If-None-Match 请求一次，并不带条件请求取最新的 ETag。
+两种模式下的状态码和 ETag 应完全相同；任何一项不同时脚本以非零状态退出。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.etag_consistency
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import core.response_cache as rc
+import models
+from auth import create_access_token
+from database import get_async_db
+from main import app
+
+URLS = [("GET /posts/{id}", "/posts/1"), ("GET /posts", "/posts?limit=20")]
+
+
+def seed(sync_url: str):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "role": "author"}
+            for i in (1, 2, 3)
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": i, "title": f"post {i}", "content": "content", "author_id": 1} for i in (1, 2, 3)
+        ])
+    engine.dispose()
+
+
+def _cache_users():
+    import api.tags
+    import services.comment_service
+    import services.like_service
+    import services.post_service
+    return [api.tags, services.comment_service, services.like_service, services.post_service]
+
+
+async def run(async_url: str, liker: str) -> dict:
+    """点赞前后各请求一次，返回 {(接口, 检查项): 值}"""
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            etags = {}
+            for name, url in URLS:
+                r = await client.get(url)
+                assert r.status_code == 200, r.text
+                etags[name] = r.headers["etag"]
+            headers = {"Authorization": f"Bearer {create_access_token({'sub': liker})}"}
+            r = await client.post("/posts/1/like", headers=headers)
+            assert r.status_code == 200, r.text
+            for name, url in URLS:
+                r = await client.get(url, headers={"If-None-Match": etags[name]})
+                results[(name, "conditional status")] = r.status_code
+                r = await client.get(url)
+                results[(name, "etag changed")] = r.headers["etag"] != etags[name]
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await engine.dispose()
+    return results
+
+
+def main():
+    original = rc.response_cache
+    modes = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "etag_consistency.db")
+        seed(f"sqlite:///{path}")
+        try:
+            # 两种模式用不同的用户点赞同一篇文章，点赞前的状态相同（都没有被这个用户点过）
+            for (name, cache), liker in zip(
+                (("no cache", rc.ResponseCache(None)), ("memory", rc.ResponseCache(rc.MemoryBackend(1000, 60)))),
+                ("user2", "user3"),
+            ):
+                # 服务层和路由模块在导入时绑定了 response_cache，这里逐个替换
+                for module in _cache_users():
+                    module.response_cache = cache
+                modes[name] = asyncio.run(run(f"sqlite+aiosqlite:///{path}", liker))
+        finally:
+            for module in _cache_users():
+                module.response_cache = original
+
+    failed = False
+    print(f"{'case':<44}{'no cache':>10}{'memory':>10}")
+    for key in modes["no cache"]:
+        got = [modes[name][key] for name in ("no cache", "memory")]
+        flag = "" if got[0] == got[1] else "  <-- mismatch"
+        failed = failed or got[0] != got[1]
+        print(f"{key[0] + ' ' + key[1]:<44}{got[0]!s:>10}{got[1]!s:>10}{flag}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+列表接口的查询次数检查（N+1 回归检查）
+
+对每个列表接口分别请求一小页和一大页，统计处理请求时执行的 SQL 条数。
+预加载策略正确时两者相同；如果查询次数随页大小增长，说明序列化时出现了逐行加载，
+脚本以非零状态退出。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.query_counts
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models
+from models.comment import comment_path
+from auth import create_access_token
+from crud.user import principal_cache
+from database import get_async_db
+from main import app
+
+NUM_USERS = 60
+POSTS_PER_USER = 2
+NUM_TAGS = 60
+
+# (名称, 小页 URL, 大页 URL)
+CASES = [
+    ("GET /posts", "/posts?limit=5", "/posts?limit=50"),
+    ("GET /posts?sort=like_count", "/posts?limit=5&sort=like_count", "/posts?limit=50&sort=like_count"),
+    ("GET /users/{id}/posts", "/users/1/posts?limit=1", "/users/1/posts?limit=2"),
+    ("GET /users", "/users?limit=5", "/users?limit=50"),
+    ("GET /tags", "/tags?limit=5", "/tags?limit=50"),
+    ("GET /tags?sort=popular", "/tags?limit=5&sort=popular", "/tags?limit=50&sort=popular"),
+    ("GET /tags/{id}/posts", "/tags/1/posts?limit=5", "/tags/1/posts?limit=50"),
+    ("GET /posts/trending", "/posts/trending?limit=5", "/posts/trending?limit=50"),
+    ("GET /posts/{id}/likes", "/posts/1/likes?limit=5", "/posts/1/likes?limit=50"),
+    ("GET /users/me/likes", "/users/me/likes?limit=5", "/users/me/likes?limit=50"),
+    ("GET /users/me/likes?expand=post", "/users/me/likes?limit=5&expand=post", "/users/me/likes?limit=50&expand=post"),
+    ("GET /posts/{id}/comments", "/posts/1/comments?limit=5", "/posts/1/comments?limit=50"),
+    ("GET /comments/{id}/replies", "/comments/1/replies?limit=1", "/comments/1/replies?limit=3"),
+    ("GET /comments/{id}/thread", "/comments/1/thread?limit=1", "/comments/1/thread?limit=3"),
+]
+
+
+def seed(sync_url: str):
+    engine = create_engine(sync_url)
+    models.Base.metadata.create_all(bind=engine)
+    num_posts = NUM_USERS * POSTS_PER_USER
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "role": "author"}
+            for i in range(1, NUM_USERS + 1)
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": i, "title": f"post {i}", "content": "content", "author_id": (i - 1) % NUM_USERS + 1, "like_count": i % 7}
+            for i in range(1, num_posts + 1)
+        ])
+        conn.execute(insert(models.Tag), [{"id": i, "name": f"tag{i}"} for i in range(1, NUM_TAGS + 1)])
+        conn.execute(insert(models.post_tags), [
+            {"post_id": p, "tag_id": t}
+            for p in range(1, num_posts + 1)
+            for t in {(p - 1) % NUM_TAGS + 1, p % NUM_TAGS + 1}
+        ])
+        conn.execute(insert(models.PostScore), [{"post_id": i, "score": i % 11} for i in range(1, num_posts + 1)])
+        # 每个用户都给文章 1 点赞，用户 1 给所有文章点赞
+        likes = {(u, 1) for u in range(1, NUM_USERS + 1)} | {(1, p) for p in range(1, num_posts + 1)}
+        conn.execute(insert(models.Like), [{"user_id": u, "post_id": p} for u, p in sorted(likes)])
+        # 文章 1 有 50 条顶层评论（来自不同用户），每条有 3 条回复；文章 2 只有 1 条
+        conn.execute(insert(models.Comment), [
+            {"id": i, "content": "comment", "post_id": 1, "user_id": i, "path": comment_path("", i), "reply_count": 3}
+            for i in range(1, 51)
+        ] + [{"id": 201, "content": "comment", "post_id": 2, "user_id": 1, "path": comment_path("", 201), "reply_count": 0}])
+        conn.execute(insert(models.Comment), [
+            {"id": i, "content": "reply", "post_id": 1, "user_id": i % NUM_USERS + 1, "parent_id": (i - 51) // 3 + 1,
+             "depth": 1, "path": comment_path(comment_path("", (i - 51) // 3 + 1), i)}
+            for i in range(51, 201)
+        ])
+    engine.dispose()
+
+
+async def measure(async_url: str) -> list:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user1'})}"}
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check", headers=headers) as client:
+            for name, small_url, large_url in CASES:
+                counts = []
+                for url in (small_url, large_url):
+                    # 每次都从空的鉴权缓存开始，否则第二次请求少一次查用户的 SQL，两次结果不可比
+                    principal_cache.clear()
+                    statements.clear()
+                    r = await client.get(url)
+                    r.raise_for_status()
+                    counts.append(len(statements))
+                results.append((name, *counts))
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await engine.dispose()
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "query_counts.db")
+        seed(f"sqlite:///{path}")
+        results = asyncio.run(measure(f"sqlite+aiosqlite:///{path}"))
+
+    failed = False
+    print(f"{'endpoint':<32}{'small page':>12}{'large page':>12}")
+    for name, small, large in results:
+        flag = "" if small == large else "  <-- grows with page size"
+        failed = failed or small != large
+        print(f"{name:<32}{small:>12}{large:>12}{flag}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+crud 查询计划检查（全表扫描回归检查）
+
+依次调用 crud 包里的每个公开函数，记录它们执行的 SQL，再对每条 SELECT / INSERT / UPDATE / DELETE
+执行 EXPLAIN QUERY PLAN。出现以下情况时视为失败，脚本以非零状态退出：
+- SCAN <表>：没有可用索引，整表扫描
+- USE TEMP B-TREE FOR ORDER BY：排序没有走索引，需要先取出全部匹配行再排序
+
+按索引顺序读取（SCAN ... USING INDEX）是游标分页第一页的正常计划，读够 LIMIT 行就停止，不算失败。
+数据库不执行 ANALYZE，和刚部署时一样由 SQLite 按默认规则选索引，这是最坏的情况。
+
+crud 新增函数时需要在 scenario() 里调用它，否则检查会因为覆盖不全而失败。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.query_plans
+"""
+import asyncio
+import inspect
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import crud
+import models
+import schemas
+
+# 允许整表扫描的函数及原因
+ALLOWED_SCANS = {
+    "get_users": "offset 分页没有过滤条件，按主键顺序读到 skip + limit 行即停止",
+    "get_user_versions": "与 get_users 相同的 offset 分页",
+    "search_posts": "按相关度排序，分数要对全文索引找到的所有匹配行计算后才能排序",
+    "rebase_post_scores": "定时任务，按同一个系数换算分数表的每一行（表的大小由清理衰减到可以忽略的行控制）",
+    "get_reply_previews": "扫描的是每条父评论各自走索引取出的前 k 条回复（UNION ALL 的临时结果），最多 limit * k 行",
+    "get_comment_page_versions": "与 get_reply_previews 相同的回复预览",
+}
+
+
+class Recorder:
+    """记录每个 crud 函数执行的 SQL"""
+
+    def __init__(self):
+        self.current = None
+        self.called = set()
+        self.statements = []
+
+    def attach(self, engine):
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if self.current and not executemany:
+                self.statements.append((self.current, statement, parameters))
+
+    async def call(self, name: str, *args, **kwargs):
+        self.current = name
+        self.called.add(name)
+        try:
+            result = getattr(crud, name)(*args, **kwargs)
+            return await result if inspect.isawaitable(result) else result
+        finally:
+            self.current = None
+
+
+async def scenario(db: AsyncSession, rec: Recorder):
+    """按依赖顺序调用每个 crud 函数，翻页类函数同时覆盖第一页和带游标的后续页"""
+    alice = await rec.call("create_user", db, schemas.UserCreate(username="alice", email="a@example.com", password="pw", role="author"))
+    bob = await rec.call("create_user", db, schemas.UserCreate(username="bob", email="b@example.com", password="pw"))
+    await rec.call("get_user", db, alice.id)
+    await rec.call("get_user_by_username", db, "alice")
+    await rec.call("get_user_by_email", db, "a@example.com")
+    await rec.call("get_users", db, skip=0, limit=10)
+    await rec.call("get_user_version", db, alice.id)
+    await rec.call("get_user_versions", db, skip=0, limit=10)
+    await rec.call("authenticate_user", db, "alice", "pw")
+    await rec.call("get_principal", db, "alice")
+    await rec.call("invalidate_principal", "alice")
+    refresh_token = await rec.call("create_refresh_token", db, alice.id, "alice")
+    _, refresh_token = await rec.call("rotate_refresh_token", db, refresh_token)
+    await rec.call("revoke_refresh_token", db, refresh_token)
+    await rec.call("get_sensitive_words", db)
+
+    post_data = schemas.PostCreate(title="title", content="content")
+    posts = [await rec.call("create_post", db, post_data, alice.id) for _ in range(3)]
+    post = posts[0]
+    for sort in ("created_at", "like_count"):
+        page = await rec.call("get_posts", db, limit=1, sort=sort)
+        await rec.call("get_posts", db, after=(getattr(page[0], sort), page[0].id), limit=1, sort=sort)
+    page = await rec.call("get_user_posts", db, alice.id, limit=1)
+    await rec.call("get_user_posts", db, alice.id, after=(page[0].created_at, page[0].id), limit=1)
+    await rec.call("get_post", db, post.id)
+    await rec.call("get_post_version", db, post.id)
+    for sort in ("created_at", "like_count"):
+        await rec.call("get_post_versions", db, limit=1, sort=sort)
+        await rec.call("get_post_versions", db, after=(getattr(post, sort), post.id), limit=1, sort=sort)
+    await rec.call("get_post_versions", db, limit=5, author_id=alice.id, with_author=False)
+    await rec.call("update_post", db, post.id, post_data)
+
+    tag = await rec.call("create_tag", db, schemas.TagCreate(name="python"))
+    await rec.call("create_tag", db, schemas.TagCreate(name="sql"))
+    await rec.call("get_tag", db, tag.id)
+    await rec.call("get_tag_by_name", db, "python")
+    page = await rec.call("get_tags", db, limit=1)
+    await rec.call("get_tags", db, after=(page[0].created_at, page[0].id), limit=1)
+    await rec.call("add_tag_to_post", db, post.id, tag.id)
+    await rec.call("add_tag_to_post", db, posts[1].id, tag.id)
+    page = await rec.call("get_tags", db, limit=1, sort="popular")
+    await rec.call("get_tags", db, after=(page[0].post_count, page[0].id), limit=1, sort="popular")
+    page = await rec.call("get_tag_posts", db, tag.id, limit=1)
+    await rec.call("get_tag_posts", db, tag.id, after=(page[0].id,), limit=1)
+
+    comment = await rec.call("create_comment", db, schemas.CommentCreate(content="comment"), post.id, bob.id)
+    reply = await rec.call("create_comment", db, schemas.CommentCreate(content="reply"), post.id, alice.id, comment)
+    await crud.create_comment(db, schemas.CommentCreate(content="reply"), post.id, bob.id, reply)
+    await crud.create_comment(db, schemas.CommentCreate(content="comment"), post.id, alice.id)
+    page = await rec.call("get_top_comments", db, post.id, limit=1)
+    await rec.call("get_top_comments", db, post.id, after=(page[0].id,), limit=1)
+    await rec.call("get_reply_previews", db, post.id, [c.id for c in page], 3)
+    await rec.call("get_comment_page_versions", db, post.id, limit=1)
+    await rec.call("get_comment_page_versions", db, post.id, after=(page[0].id,), limit=1)
+    page = await rec.call("get_replies", db, comment, limit=1)
+    await rec.call("get_replies", db, comment, after=(page[0].id,), limit=1)
+    page = await rec.call("get_comment_subtree", db, comment, limit=1)
+    await rec.call("get_comment_subtree", db, comment, after=(page[0].path,), limit=1)
+    await rec.call("get_comment", db, comment.id)
+    await rec.call("update_comment", db, comment.id, schemas.CommentUpdate(content="edited"))
+    page = await rec.call("search_posts", db, "edited", limit=1)
+    await rec.call("search_posts", db, "content", after=(page[0].score, page[0].Post.id), limit=1,
+                   tag_id=tag.id, author_id=alice.id)
+
+    for user in (alice, bob):
+        await rec.call("create_like", db, user.id, post.id)
+    await rec.call("create_like", db, alice.id, posts[1].id)
+    await db.commit()
+    await rec.call("get_like", db, bob.id, post.id)
+    page = await rec.call("get_post_likes", db, post.id, limit=1)
+    await rec.call("get_post_likes", db, post.id, after=(page[0].created_at, page[0].id), limit=1)
+    page = await rec.call("get_user_likes", db, alice.id, limit=1)
+    await rec.call("get_user_likes", db, alice.id, after=(page[0].created_at, page[0].id), limit=1)
+    page = await rec.call("get_user_liked_posts", db, alice.id, limit=1)
+    await rec.call("get_user_liked_posts", db, alice.id, after=(page[0].liked_at, page[0].like_id), limit=1)
+    await rec.call("get_like_count", db, post.id)
+    await rec.call("get_post_like_count", db, post.id)
+    await rec.call("get_post_like_counts", db, [p.id for p in posts])
+    await rec.call("get_liked_post_ids", db, alice.id, [p.id for p in posts])
+    await rec.call("increment_post_like_count", db, post.id)
+    await rec.call("decrement_post_like_count", db, post.id)
+    await db.commit()
+
+    for p, weight in ((post, 3.0), (posts[1], 1.0), (posts[2], 2.0)):
+        await rec.call("add_post_score", db, p.id, weight)
+    await db.commit()
+    page = await rec.call("get_trending_posts", db, limit=1)
+    await rec.call("get_trending_posts", db, after=(page[0].score, page[0].Post.id), limit=1)
+    anchor = await rec.call("get_trending_anchor", db)
+    await rec.call("rebase_post_scores", db, now=anchor + 3600)
+
+    for kind in ("posts", "comments", "likes"):
+        for since in (None, post.created_at):
+            result = await rec.call("stream_export", db, kind, since)
+            await result.close()
+
+    # 删除放在最后：ORM 删除会先按外键加载关联行
+    await rec.call("delete_like", db, bob.id, post.id)
+    await db.commit()
+    await rec.call("delete_comment", db, comment.id)
+    await rec.call("remove_tag_from_post", db, post.id, tag.id)
+    await rec.call("add_tag_to_post", db, posts[2].id, tag.id)
+    await rec.call("delete_tag", db, tag.id)
+    await rec.call("delete_post", db, posts[2].id)
+
+
+async def record(async_url: str) -> Recorder:
+    engine = create_async_engine(async_url)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    rec = Recorder()
+    rec.attach(engine)
+    try:
+        async with SessionLocal() as db:
+            await scenario(db, rec)
+    finally:
+        await engine.dispose()
+    return rec
+
+
+def problems_in(plan: list) -> list:
+    """从 EXPLAIN QUERY PLAN 的 detail 列中找出整表扫描和临时排序"""
+    found = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and " INDEX " not in detail and "CONSTANT ROW" not in detail:
+            found.append(detail)
+        elif detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            found.append(detail)
+    return found
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "query_plans.db")
+        engine = create_engine(f"sqlite:///{path}")
+        models.Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        rec = asyncio.run(record(f"sqlite+aiosqlite:///{path}"))
+
+        conn = sqlite3.connect(path)
+        failures = []
+        checked = 0
+        seen = set()
+        for name, statement, parameters in rec.statements:
+            verb = statement.lstrip().split(None, 1)[0].upper()
+            if verb not in ("SELECT", "INSERT", "UPDATE", "DELETE") or (name, statement) in seen:
+                continue
+            seen.add((name, statement))
+            checked += 1
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            problems = problems_in(plan)
+            if problems and name not in ALLOWED_SCANS:
+                failures.append((name, statement, problems))
+        conn.close()
+
+    missing = sorted(set(crud.__all__) - rec.called)
+    print(f"checked {checked} distinct statements from {len(rec.called)} crud functions")
+    for name, statement, problems in failures:
+        print(f"\n[{name}] {'; '.join(problems)}\n    {' '.join(statement.split())}")
+    if missing:
+        print(f"\ncrud functions not covered by scenario(): {', '.join(missing)}")
+    for name, reason in ALLOWED_SCANS.items():
+        print(f"allowed scan in {name}: {reason}")
+    sys.exit(1 if failures or missing else 0)
+
+
+if __name__ == "__main__":
+    main()
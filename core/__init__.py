@@ -1,5 +1,9 @@
 # core/__init__.py
 from .permissions import check_owner_or_admin, require_role
+from .pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order, make_page
 
-__all__ = ["check_owner_or_admin", "require_role"]
+__all__ = [
+    "check_owner_or_admin", "require_role",
+    "decode_cursor", "encode_cursor", "keyset_filter", "keyset_order", "make_page",
+]
 
@@ -0,0 +1,169 @@
+# core/counters.py
+"""
+计数器写缓冲（write-behind）
+
+热门文章被集中点赞时，每次点赞都执行 UPDATE posts SET like_count = like_count + 1，
+这些更新落在同一行上，只能排队执行。开启写缓冲后，增减量先按行累积在内存里，
+定时或攒够一定次数后合并成一次批量 UPDATE 写回。
+
+- 增减量在所属事务提交后才计入缓冲，事务回滚则丢弃
+- 通过 pending() 读取计数时加上尚未写回的增减量（只包含本进程的缓冲）；
+  读取恰好与一次写回重叠时，可能少算或重复计入正在写回的这一批；
+  直接在 SQL 中使用计数列的读取（例如排序）看到的是上次写回的值，最多落后一个写回周期
+- 写回失败（包括被取消）时增减量放回缓冲，下次重试；
+  应用关闭时等正在进行的写回完成（不取消），再把剩余的增减量写回
+- 进程异常退出会丢失尚未写回的增减量，明细表（如 likes）仍然是准确的
+"""
+import asyncio
+import logging
+from typing import Callable, Dict
+
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    按主键累积某个计数列的增减量，批量写回
+
+    Args:
+        model: ORM 模型，例如 Post
+        column: 计数列名，例如 "like_count"
+        session_factory: 写回时使用的 AsyncSession 工厂
+        enabled: 是否开启；关闭时调用方应直接 UPDATE
+        flush_interval: 定时写回间隔（秒）
+        flush_threshold: 缓冲的增减次数达到该值时立即写回
+    """
+
+    def __init__(
+        self,
+        model,
+        column: str,
+        session_factory: Callable[[], AsyncSession],
+        enabled: bool = False,
+        flush_interval: float = 1.0,
+        flush_threshold: int = 1000,
+    ):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._session_factory = session_factory
+        self._info_key = f"counter_buffer:{model.__tablename__}.{column}"
+
+        table = model.__table__
+        # 计数变化不算修改行：带 onupdate 的列（如 updated_at）保持原值
+        untouched = {c.name: c for c in table.c if c.onupdate is not None}
+        self._update = update(table).where(
+            table.c.id == bindparam("b_id")
+        ).values({**untouched, column: table.c[column] + bindparam("b_delta")})
+
+        self._pending: Dict[int, int] = {}  # 已提交、等待写回
+        self._inflight: Dict[int, int] = {}  # 正在写回
+        self._buffered = 0  # 自上次写回以来累积的增减次数
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.errors = 0
+
+        event.listen(Session, "after_commit", self._on_commit)
+        event.listen(Session, "after_rollback", self._on_rollback)
+
+    # ============= 记录增减量 =============
+
+    def add(self, db: AsyncSession, key: int, delta: int):
+        """记录一次增减，在 db 的当前事务提交后才计入缓冲"""
+        deltas = db.sync_session.info.setdefault(self._info_key, {})
+        deltas[key] = deltas.get(key, 0) + delta
+
+    def pending(self, key: int, db: AsyncSession = None) -> int:
+        """尚未写回数据库的增减量（包括 db 当前事务中还没提交的部分）"""
+        delta = self._pending.get(key, 0) + self._inflight.get(key, 0)
+        if db is not None:
+            delta += db.sync_session.info.get(self._info_key, {}).get(key, 0)
+        return delta
+
+    def _on_commit(self, session: Session):
+        deltas = session.info.pop(self._info_key, None)
+        if not deltas:
+            return
+        for key, delta in deltas.items():
+            self._pending[key] = self._pending.get(key, 0) + delta
+        self._buffered += len(deltas)
+        if self._buffered >= self.flush_threshold:
+            self._wake.set()
+
+    def _on_rollback(self, session: Session):
+        session.info.pop(self._info_key, None)
+
+    # ============= 写回 =============
+
+    async def flush(self) -> int:
+        """把缓冲的增减量合并成一次批量 UPDATE 写回，返回更新的行数"""
+        async with self._lock:
+            self._inflight, self._pending = self._pending, {}
+            self._buffered = 0
+            params = [{"b_id": key, "b_delta": delta} for key, delta in self._inflight.items() if delta]
+            if not params:
+                self._inflight = {}
+                return 0
+            try:
+                async with self._session_factory() as db:
+                    await db.execute(self._update, params)
+                    await db.commit()
+            except BaseException:
+                # 放回缓冲，下次重试（CancelledError 不是 Exception，也要放回，否则这批增减量会丢失）
+                for key, delta in self._inflight.items():
+                    self._pending[key] = self._pending.get(key, 0) + delta
+                self.errors += 1
+                raise
+            finally:
+                self._inflight = {}
+            self.flushes += 1
+            self.flushed_rows += len(params)
+            return len(params)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("counter flush failed, will retry")
+
+    def start(self):
+        """启动定时写回任务（在应用启动时调用）"""
+        if self.enabled and self._task is None:
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """停止定时写回任务，并把剩余的增减量写回（在应用关闭时调用）
+
+        不取消任务：取消会打断正在执行的写回，只设置停止标记并唤醒，等当前这一轮写回结束后任务自己退出
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending_rows": len(self._pending),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "errors": self.errors,
+        }
@@ -0,0 +1,92 @@
+# core/etag.py
+"""
+条件请求：ETag / If-None-Match 和 Cache-Control
+
+ETag 由资源的版本字段计算（id、updated_at，以及内嵌的作者 / 评论者的 updated_at），
+不依赖响应正文，所以有两种算法得到同一个值：
+- 生成响应时，从已经加载的对象计算
+- 请求带 If-None-Match 时，先用只查版本字段的轻量查询计算（crud 中的 *_versions），
+  匹配就直接返回 304，不加载正文和关联，也不序列化
+
+各资源的版本字段定义在这里，两种算法共用，保证结果一致。
+"""
+import hashlib
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+
+from config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """强 ETag：版本字段的摘要"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match 是否命中（按 RFC 9110 的弱比较，忽略 W/ 前缀；* 匹配任何存在的资源）"""
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_control(route: str) -> str:
+    return settings.CACHE_CONTROL.get(route, settings.CACHE_CONTROL_DEFAULT)
+
+
+def cache_headers(route: Optional[str], etag: Optional[str]) -> dict:
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if route:
+        headers["Cache-Control"] = cache_control(route)
+    return headers
+
+
+def not_modified(route: Optional[str], etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(route, etag))
+
+
+# ============= 各资源的版本字段 =============
+# 对象和轻量查询的行（crud 中的 *_versions）使用相同的属性名
+
+def post_version(post) -> tuple:
+    """
+    PostResponse：文章本身 + 作者（标签增删会刷新文章的 updated_at）
+
+    不包含 like_count：PostResponse 不输出点赞数，点赞 / 取消点赞不改变文章的表示，
+    文章详情和列表的缓存也不随点赞失效（按点赞数排序的列表顺序会变，由 posts:like_count 失效）
+    """
+    return (post.id, post.updated_at, post.author_updated_at)
+
+
+def post_page_etag(rows: Sequence, has_more: bool) -> str:
+    return make_etag("posts", [post_version(row) for row in rows], has_more)
+
+
+def comment_version(comment) -> tuple:
+    """CommentResponse：评论本身 + 评论者（回复数变化不刷新 updated_at，单独列出）"""
+    return (comment.id, comment.updated_at, comment.reply_count, comment.user_updated_at)
+
+
+def comment_page_etag(post_id: int, threads: Sequence, has_more: bool) -> str:
+    """一页顶层评论，threads 为 (顶层评论, 预览回复列表)，与 crud.get_comment_page_versions 的结果一致"""
+    return make_etag(
+        "comments", post_id,
+        [(comment_version(comment), [comment_version(r) for r in replies]) for comment, replies in threads],
+        has_more,
+    )
+
+
+def user_etag(user, recent_posts: Sequence = (), has_more: bool = False) -> str:
+    """UserListItem / UserResponse：用户本身 + 最近文章预览（PostSimple 只有 id / updated_at 会变）"""
+    return make_etag("user", user.id, user.updated_at, [(p.id, p.updated_at) for p in recent_posts], has_more)
+
+
+def user_list_etag(users: Sequence) -> str:
+    return make_etag("users", [(u.id, u.updated_at) for u in users])
@@ -0,0 +1,120 @@
+# core/pagination.py
+"""
+游标分页（keyset pagination）工具
+
+用上一页最后一行的排序键作为游标，下一页直接 WHERE (排序键) < (游标) 走索引定位，
+不需要 OFFSET 扫描并丢弃前面的行，第 10000 页和第 1 页的代价相同。
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, bindparam, tuple_
+from sqlalchemy.types import TypeDecorator
+
+
+class _KeysetDateTime(TypeDecorator):
+    """
+    游标里的时间值绑定成与存储一致的格式
+
+    SQLite 没有时间类型，按字符串比较；func.now() 写入的值没有微秒部分
+    （"2025-01-01 12:00:00"），utcnow() 写入的值精确到毫秒（"2025-01-01 12:00:00.123"），
+    而默认绑定格式总是带 6 位微秒，两者按字符串比较时相等的时间会被判成不相等，导致翻页重复或遗漏。
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and isinstance(value, datetime):
+            if value.microsecond == 0:
+                return value.strftime("%Y-%m-%d %H:%M:%S")
+            if value.microsecond % 1000 == 0:
+                return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return value
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    """
+    把排序键编码成不透明的游标字符串
+
+    Args:
+        kind: 游标类型（对应排序方式），解码时校验，防止游标混用
+        values: 排序键的值，例如 (created_at, id)
+    """
+    payload = {
+        "k": kind,
+        "v": [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], kind: str, size: int) -> Optional[tuple]:
+    """
+    解析游标，返回排序键的值；cursor 为空表示第一页，返回 None
+
+    Raises:
+        HTTPException: 400 如果游标无效或与当前排序方式不匹配
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = tuple(
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload["v"]
+        )
+        valid = payload["k"] == kind and len(values) == size
+    except (ValueError, TypeError, KeyError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def bind_value(column, value):
+    """按列的类型绑定参数（DateTime 列的格式与存储一致，见 _KeysetDateTime），用于和列比较"""
+    return bindparam(None, value, type_=_KeysetDateTime() if isinstance(column.type, DateTime) else column.type)
+
+
+def keyset_filter(columns: Sequence, values: Sequence[Any], descending: bool = True):
+    """
+    生成 (col1, col2) < (v1, v2) 的行值比较条件（升序时为 >）
+
+    每个值按对应列的类型绑定参数，保证 DateTime 等类型的格式与存储一致。
+    """
+    params = [bind_value(column, value) for column, value in zip(columns, values)]
+    if descending:
+        return tuple_(*columns) < tuple_(*params)
+    return tuple_(*columns) > tuple_(*params)
+
+
+def keyset_order(columns: Sequence, descending: bool = True) -> list:
+    """排序子句，与 keyset_filter 的方向保持一致"""
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+def make_page(rows: Sequence, limit: int, kind: str, key: Callable[[Any], Sequence[Any]]) -> dict:
+    """
+    把多查一行（limit + 1）的结果整理成一页
+
+    Args:
+        rows: 查询结果，最多 limit + 1 行，多出的一行表示还有下一页
+        limit: 每页条数
+        kind: 游标类型
+        key: 从一行数据中取出排序键的函数
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(kind, key(items[-1]))
+    return {"items": items, "next_cursor": next_cursor}
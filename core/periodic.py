@@ -0,0 +1,67 @@
+# core/periodic.py
+"""
+进程内的定时任务：每隔 interval 秒执行一次协程函数
+
+执行失败只记录日志和次数，下一个周期继续；由 main.py 在应用启动时 start()、关闭时 stop()。
+多进程部署时每个进程都会执行，任务本身要能容忍重复执行。
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Args:
+        name: 任务名（日志和统计使用）
+        func: 每个周期执行的协程函数
+        interval: 间隔（秒），0 表示不执行
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[object]], interval: float):
+        self.name = name
+        self.interval = interval
+        self._func = func
+        self._task = None
+        self.runs = 0
+        self.errors = 0
+        self.last_run_at: Optional[float] = None
+
+    async def run_once(self):
+        try:
+            await self._func()
+        except Exception:
+            self.errors += 1
+            logger.exception("periodic task %s failed", self.name)
+        else:
+            self.runs += 1
+            self.last_run_at = time.time()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at,
+        }
@@ -0,0 +1,270 @@
+# core/response_cache.py
+"""
+热点读接口的响应缓存
+
+缓存的是序列化好的 JSON（bytes），命中时直接返回，不查数据库也不重新序列化。
+
+失效按"命名空间版本号"进行，而不是逐个删除 key：
+- 每个缓存条目声明依赖哪些命名空间，例如文章详情依赖 post:{id} 和 tags
+- 条目的 key 包含读取时这些命名空间的版本号
+- 写操作提交后调用 invalidate 把相关命名空间的版本号往上加，旧条目不会再被读到，等过期或被 LRU 淘汰
+- 列表的分页组合很多，失效时不需要知道缓存了哪些页；
+  读写并发时，读到旧数据的请求用的是旧版本号，写进缓存后也不会被之后的请求读到
+
+后端：
+- memory: 进程内 LRU（默认）。多进程部署时失效只对当前进程生效，其他进程最多延迟 TTL 秒
+- redis: 多进程共享，需要安装 redis 包。版本号 key 不设过期时间，
+  Redis 的 maxmemory-policy 应使用 volatile-*（只淘汰带过期时间的缓存条目）
+- none: 关闭，每次都查询
+
+缓存后端出错时直接查询数据库（记入 errors），不影响请求。
+
+条目同时保存 ETag（见 core/etag.py），命中时如果与请求的 If-None-Match 相同直接返回 304。
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from config import settings
+from core.etag import cache_headers, etag_matches, not_modified
+from utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    进程内 LRU 后端
+
+    版本号用一个递增的时钟值表示，最多保留 maxsize 个命名空间；
+    被淘汰的命名空间按"被淘汰的最大版本号"计算，只会让旧条目失效，不会让失效过的条目重新可读
+    """
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._max_versions = max(maxsize, 1)
+        self._clock = 0
+        self._floor = 0
+
+    async def versions(self, namespaces: Sequence[str]) -> List[int]:
+        return [self._versions.get(ns, self._floor) for ns in namespaces]
+
+    async def bump(self, namespaces: Sequence[str]):
+        for ns in namespaces:
+            self._clock += 1
+            self._versions[ns] = self._clock
+            self._versions.move_to_end(ns)
+        while len(self._versions) > self._max_versions:
+            _, version = self._versions.popitem(last=False)
+            self._floor = max(self._floor, version)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+
+    async def stats(self) -> dict:
+        stats = self.entries.stats()
+        return {"size": stats["size"], "maxsize": stats["maxsize"], "evictions": stats["evictions"],
+                "namespaces": len(self._versions)}
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """Redis 后端：条目带 TTL，版本号用 INCR 维护"""
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "response_cache:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package (pip install redis)") from e
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def versions(self, namespaces: Sequence[str]) -> List[int]:
+        values = await self._redis.mget([f"{self.prefix}version:{ns}" for ns in namespaces])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, namespaces: Sequence[str]):
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for ns in namespaces:
+                pipe.incr(f"{self.prefix}version:{ns}")
+            await pipe.execute()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self._redis.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    async def stats(self) -> dict:
+        info = await self._redis.info("stats")
+        return {"evictions": info.get("evicted_keys", 0), "expired": info.get("expired_keys", 0)}
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """
+    响应缓存（backend 为 None 时关闭）
+
+    用法：
+        return await response_cache.fetch(
+            f"post:{post_id}", [f"post:{post_id}", "tags"], load, schemas.PostResponse
+        )
+        ...
+        await response_cache.invalidate(f"post:{post_id}", "posts")  # 写操作提交之后
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _render(self, schema, value) -> bytes:
+        """按响应模型序列化（与 FastAPI 的 response_model 输出一致）"""
+        adapter = self._adapters.get(schema)
+        if adapter is None:
+            adapter = self._adapters[schema] = TypeAdapter(schema)
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+    async def fetch(
+        self,
+        key: str,
+        depends: Sequence[str],
+        load: Callable[[], Awaitable[Any]],
+        schema,
+        *,
+        etag: Optional[Callable[[Any], str]] = None,
+        validate: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+        if_none_match: Optional[str] = None,
+        route: Optional[str] = None,
+    ) -> Response:
+        """
+        读取缓存的响应，未命中时调用 load() 查询并写入缓存
+
+        Args:
+            key: 条目 key（包含所有查询参数）
+            depends: 条目依赖的命名空间，其中任何一个失效，条目都会失效
+            load: 查询数据的协程函数，抛出的异常（如 404）直接向上传递，不会被缓存
+            schema: 响应模型，用于序列化
+            etag: 从 load() 的结果计算 ETag，和正文一起缓存
+            validate: 用轻量查询计算当前 ETag（资源不存在时返回 None），
+                      未命中缓存且请求带 If-None-Match 时先调用它，匹配就返回 304，不调用 load()
+            if_none_match: 请求的 If-None-Match 头
+            route: Cache-Control 的路由名（见 settings.CACHE_CONTROL）
+        """
+        full_key = None
+        if self.enabled:
+            try:
+                versions = await self.backend.versions(depends)
+                full_key = key + "|" + ",".join(f"{ns}={v}" for ns, v in zip(depends, versions))
+                cached = await self.backend.get(full_key)
+            except Exception:
+                self.errors += 1
+                logger.exception("response cache read failed")
+                cached = None
+            if cached is not None:
+                self.hits += 1
+                cached_etag, body = self._unpack(cached)
+                if etag_matches(if_none_match, cached_etag):
+                    return not_modified(route, cached_etag)
+                return self._response(body, "HIT", route, cached_etag)
+            self.misses += 1
+
+        if validate is not None and if_none_match:
+            current = await validate()
+            if etag_matches(if_none_match, current):
+                return not_modified(route, current)
+
+        value = await load()
+        body = self._render(schema, value)
+        value_etag = etag(value) if etag is not None else None
+        if full_key is not None:
+            try:
+                await self.backend.set(full_key, self._pack(value_etag, body))
+            except Exception:
+                self.errors += 1
+                logger.exception("response cache write failed")
+        return self._response(body, "MISS" if self.enabled else None, route, value_etag)
+
+    async def invalidate(self, *namespaces: str):
+        """使依赖这些命名空间的条目失效，在写操作提交之后调用"""
+        if not self.enabled or not namespaces:
+            return
+        self.invalidations += len(namespaces)
+        try:
+            await self.backend.bump(namespaces)
+        except Exception:
+            self.errors += 1
+            logger.exception("response cache invalidation failed")
+
+    @staticmethod
+    def _pack(etag: Optional[str], body: bytes) -> bytes:
+        """ETag 和正文存在同一个条目里：ETag 一行 + 正文"""
+        return (etag or "").encode() + b"\n" + body
+
+    @staticmethod
+    def _unpack(value: bytes) -> tuple:
+        etag, _, body = value.partition(b"\n")
+        return etag.decode() or None, body
+
+    @staticmethod
+    def _response(body: bytes, status: Optional[str], route: Optional[str], etag: Optional[str]) -> Response:
+        headers = cache_headers(route, etag)
+        if status:
+            headers["X-Cache"] = status
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": self.backend.name if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+        if self.enabled:
+            try:
+                stats.update(await self.backend.stats())
+            except Exception:
+                self.errors += 1
+        return stats
+
+    async def close(self):
+        if self.enabled:
+            await self.backend.close()
+
+
+def _make_backend():
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "none" or settings.RESPONSE_CACHE_TTL <= 0:
+        return None
+    if backend == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
+    if backend == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_URL, settings.RESPONSE_CACHE_TTL)
+    raise ValueError(f"unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+
+
+response_cache = ResponseCache(_make_backend())
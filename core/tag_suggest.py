@@ -0,0 +1,264 @@
+# core/tag_suggest.py
+"""
+标签自动补全的内存索引
+
+标签名（忽略大小写）排成有序数组，以某个前缀开头的标签是数组中连续的一段，二分查找定位，不访问数据库：
+- 标签不多的前缀（不超过 SMALL_RANGE 个）直接取这一段按文章数排序
+- 标签多的前缀缓存 top_k；缓存失效后重算，很大的前缀（如单个字母）按下一个字符拆成子前缀，
+  合并子前缀的 top_k，不需要扫描整段
+- 标签增删、文章数变化时就地修正这个标签名各级前缀的缓存：排名上升直接插入，
+  只有原本在 top_k 里的标签排名下降或被删除时这一级缓存才失效
+- 启动时从 tags 表加载；crud 在提交后同步修改（见 crud/tag.py）
+- 多进程部署时其他进程的修改不会同步过来，refresh_interval 秒整体重新加载一次（0 表示不重新加载）；
+  重新加载期间的修改会记录下来，换上新索引后重放，不会丢失
+"""
+import asyncio
+import heapq
+import logging
+import sys
+import time
+from bisect import bisect_left, insort
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 不超过 SMALL_RANGE 个标签的前缀直接对区间排序，不缓存；
+# 超过时缓存 top_k，重算时不超过 SPLIT_RANGE 个直接排序，再多就拆成子前缀合并
+SMALL_RANGE = 64
+SPLIT_RANGE = 1024
+# 拆分子前缀的最大深度，更深时（大量标签共用很长的前缀）直接对区间排序
+MAX_DEPTH = 32
+
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """比所有以 prefix 开头的字符串都大的最小字符串：最后一个字符加一（已经是最大字符时返回 None）"""
+    if prefix[-1] == chr(sys.maxunicode):
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class _PrefixIndex:
+    """有序数组 + 大前缀的 top_k 缓存（不处理并发和重新加载）"""
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.tags: Dict[int, Tuple[str, int]] = {}  # id -> (name, post_count)
+        self.entries: List[Tuple[str, int]] = []  # (忽略大小写的名字, id)，有序
+        self.cache: Dict[str, list] = {}  # 大前缀 -> top_k 个标签的排序键
+        self._max_cached = 0  # 缓存中最长前缀的长度，失效时只需要检查这么长
+
+    def _ranked(self, entries) -> list:
+        """
+        排序键 (-文章数, 忽略大小写的名字, id)：文章数多的在前，相同时按名字、id；
+        缓存的也是排序键，合并时不需要重新计算
+        """
+        tags = self.tags
+        return [(-tags[tag_id][1], key, tag_id) for key, tag_id in entries]
+
+    def _range(self, prefix: str, lo: int = 0, hi: int = None) -> Tuple[int, int]:
+        hi = len(self.entries) if hi is None else hi
+        start = bisect_left(self.entries, (prefix,), lo, hi)
+        end = _prefix_end(prefix) if prefix else None
+        if end is None:
+            return start, hi
+        return start, bisect_left(self.entries, (end,), start, hi)
+
+    def _update_cache(self, key: str, old: Optional[tuple], new: Optional[tuple]):
+        """
+        标签的排序键从 old 变成 new（新增时 old 为 None，删除时 new 为 None），就地修正各级前缀缓存的 top_k
+
+        排名上升（新增、文章数增加）只可能挤进 top_k，直接修正；
+        已经在 top_k 里的标签排名下降或被删除时，补位的是哪个标签不知道，这一级缓存失效
+        """
+        for length in range(min(len(key), self._max_cached) + 1):
+            prefix = key[:length]
+            top = self.cache.get(prefix)
+            if top is None:
+                continue
+            if old is not None and old in top:
+                if new is None or new > old:
+                    del self.cache[prefix]
+                    continue
+                top.remove(old)
+            elif new is None or (len(top) >= self.top_k and new > top[-1]):
+                continue
+            insort(top, new)
+            del top[self.top_k:]
+
+    def put(self, tag_id: int, name: str, post_count: int):
+        if tag_id in self.tags:
+            self.discard(tag_id)
+        key = name.casefold()
+        self.tags[tag_id] = (name, post_count)
+        insort(self.entries, (key, tag_id))
+        self._update_cache(key, None, (-post_count, key, tag_id))
+
+    def discard(self, tag_id: int):
+        entry = self.tags.pop(tag_id, None)
+        if entry is None:
+            return
+        key = entry[0].casefold()
+        del self.entries[bisect_left(self.entries, (key, tag_id))]
+        self._update_cache(key, (-entry[1], key, tag_id), None)
+
+    def set_count(self, tag_id: int, post_count: int):
+        entry = self.tags.get(tag_id)
+        if entry is not None and entry[1] != post_count:
+            name, old_count = entry
+            key = name.casefold()
+            self.tags[tag_id] = (name, post_count)
+            self._update_cache(key, (-old_count, key, tag_id), (-post_count, key, tag_id))
+
+    def _top(self, prefix: str, lo: int, hi: int, depth: int = 0) -> list:
+        """[lo, hi) 是以 prefix 开头的区间，返回其中的 top_k"""
+        if hi - lo <= SMALL_RANGE:
+            return heapq.nsmallest(self.top_k, self._ranked(self.entries[lo:hi]))
+        top = self.cache.get(prefix)
+        if top is None:
+            top = self.cache[prefix] = self._compute(prefix, lo, hi, depth)
+            self._max_cached = max(self._max_cached, len(prefix))
+        return top
+
+    def _compute(self, prefix: str, lo: int, hi: int, depth: int) -> list:
+        if hi - lo <= SPLIT_RANGE or depth > MAX_DEPTH:
+            return heapq.nsmallest(self.top_k, self._ranked(self.entries[lo:hi]))
+        # 很大的区间：按下一个字符分成子前缀，合并子前缀的 top_k（子前缀本身又是小区间或有缓存）
+        pos = lo
+        while pos < hi and self.entries[pos][0] == prefix:
+            pos += 1
+        candidates = self._ranked(self.entries[lo:pos])
+        while pos < hi:
+            child = self.entries[pos][0][:len(prefix) + 1]
+            _, child_hi = self._range(child, pos, hi)
+            candidates.extend(self._top(child, pos, child_hi, depth + 1))
+            pos = child_hi
+        return heapq.nsmallest(self.top_k, candidates)
+
+    def suggest(self, prefix: str, limit: int) -> List[dict]:
+        prefix = prefix.casefold()
+        lo, hi = self._range(prefix)
+        return [
+            {"id": tag_id, "name": self.tags[tag_id][0], "post_count": -count}
+            for count, _, tag_id in self._top(prefix, lo, hi)[:limit]
+        ]
+
+
+class TagSuggestIndex:
+    """
+    标签补全索引
+
+    用法：
+        tag_suggest_index = TagSuggestIndex(load_rows, top_k=10)
+        await tag_suggest_index.reload()          # 应用启动时
+        tag_suggest_index.suggest("py", 10)
+        tag_suggest_index.put(tag.id, tag.name, tag.post_count)  # 提交之后
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Iterable[Tuple[int, str, int]]]],
+        top_k: int = 10,
+        refresh_interval: float = 0,
+    ):
+        """
+        Args:
+            loader: 读取全部标签 (id, name, post_count) 的协程函数
+            top_k: 每个前缀最多返回多少个标签
+            refresh_interval: 定时重新加载的间隔（秒），0 表示只在启动时加载
+        """
+        self._loader = loader
+        self.top_k = top_k
+        self.refresh_interval = refresh_interval
+        self._index = _PrefixIndex(top_k)
+        self._replay: Optional[list] = None
+        self._task = None
+        self.loaded_at: Optional[float] = None
+        self.queries = 0
+        self.reloads = 0
+        self.errors = 0
+
+    # ============= 查询 =============
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """返回名字以 prefix 开头（忽略大小写）的标签，文章数多的在前，最多 min(limit, top_k) 个"""
+        self.queries += 1
+        return self._index.suggest(prefix, min(limit, self.top_k))
+
+    # ============= 修改（在数据库事务提交之后调用） =============
+
+    def _apply(self, op: str, *args):
+        getattr(self._index, op)(*args)
+        if self._replay is not None:
+            self._replay.append((op, args))
+
+    def put(self, tag_id: int, name: str, post_count: int = 0):
+        """新增标签（或覆盖已有的）"""
+        self._apply("put", tag_id, name, post_count)
+
+    def discard(self, tag_id: int):
+        """删除标签"""
+        self._apply("discard", tag_id)
+
+    def set_counts(self, counts: Iterable[Tuple[int, int]]):
+        """更新标签的文章数，counts 为 (tag_id, post_count)"""
+        for tag_id, post_count in counts:
+            self._apply("set_count", tag_id, post_count)
+
+    # ============= 加载 =============
+
+    def _build(self, rows) -> _PrefixIndex:
+        index = _PrefixIndex(self.top_k)
+        for tag_id, name, post_count in rows:
+            index.tags[tag_id] = (name, post_count)
+            index.entries.append((name.casefold(), tag_id))
+        index.entries.sort()
+        index.suggest("", self.top_k)  # 预先算好大前缀的缓存，第一次查询不需要重算
+        return index
+
+    async def reload(self):
+        """从数据库重新加载，建好新索引后整体替换（建索引在线程中进行，不阻塞事件循环）"""
+        self._replay = []
+        try:
+            rows = await self._loader()
+            index = await asyncio.to_thread(self._build, rows)
+            for op, args in self._replay:
+                getattr(index, op)(*args)
+            self._index = index
+        finally:
+            self._replay = None
+        self.loaded_at = time.time()
+        self.reloads += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception:
+                self.errors += 1
+                logger.exception("tag suggest index reload failed, keeping the current index")
+
+    def start(self):
+        """启动定时重新加载任务（在应用启动时调用）"""
+        if self.refresh_interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tags": len(self._index.tags),
+            "cached_prefixes": len(self._index.cache),
+            "top_k": self.top_k,
+            "queries": self.queries,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "loaded_at": self.loaded_at,
+        }
@@ -5,7 +5,11 @@ from .user import (
     get_user_by_username,
     get_user_by_email,
     get_users,
+    get_user_version,
+    get_user_versions,
     authenticate_user,
+    get_principal,
+    invalidate_principal,
 )
 from .post import (
     create_post,
@@ -14,19 +18,26 @@ from .post import (
     update_post,
     delete_post,
     get_user_posts,
+    get_post_version,
+    get_post_versions,
 )
 from .tag import (
     create_tag,
     get_tag,
     get_tag_by_name,
     get_tags,
+    get_tag_posts,
     add_tag_to_post,
     remove_tag_from_post,
     delete_tag,
 )
 from .comment import (
     create_comment,
-    get_comments,
+    get_top_comments,
+    get_reply_previews,
+    get_comment_page_versions,
+    get_replies,
+    get_comment_subtree,
     update_comment,
     delete_comment,
     get_comment
@@ -37,20 +48,45 @@ from .like import (
     delete_like,
     get_post_likes,
     get_like_count,
+    get_post_like_count,
+    get_post_like_counts,
+    get_liked_post_ids,
     increment_post_like_count,
     decrement_post_like_count,
     get_user_likes,
+    get_user_liked_posts,
+)
+from .refresh_token import (
+    create_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+)
+from .moderation import get_sensitive_words
+from .search import search_posts
+from .export import stream_export
+from .trending import (
+    add_post_score,
+    get_trending_posts,
+    get_trending_anchor,
+    rebase_post_scores,
 )
 
 __all__ = [
     "create_user", "get_user", "get_user_by_username", "get_user_by_email",
-    "get_users", "authenticate_user",
+    "get_users", "get_user_version", "get_user_versions", "authenticate_user", "get_principal", "invalidate_principal",
     "create_post", "get_posts", "get_post", "update_post", "delete_post",
-    "get_user_posts",
-    "create_tag", "get_tag", "get_tag_by_name", "get_tags",
+    "get_user_posts", "get_post_version", "get_post_versions",
+    "create_tag", "get_tag", "get_tag_by_name", "get_tags", "get_tag_posts",
     "add_tag_to_post", "remove_tag_from_post", "delete_tag",
-    "create_comment", "get_comments", "update_comment", "delete_comment", "get_comment",
+    "create_comment", "get_top_comments", "get_reply_previews", "get_comment_page_versions",
+    "get_replies", "get_comment_subtree", "update_comment", "delete_comment", "get_comment",
     "create_like", "get_like", "delete_like", "get_post_likes", "get_like_count",
-    "increment_post_like_count", "decrement_post_like_count", "get_user_likes",
+    "get_post_like_count", "get_post_like_counts", "get_liked_post_ids",
+    "increment_post_like_count", "decrement_post_like_count", "get_user_likes", "get_user_liked_posts",
+    "create_refresh_token", "rotate_refresh_token", "revoke_refresh_token",
+    "get_sensitive_words",
+    "search_posts",
+    "add_post_score", "get_trending_posts", "get_trending_anchor", "rebase_post_scores",
+    "stream_export",
 ]
 
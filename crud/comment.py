@@ -1,37 +1,179 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Sequence
 
 import models
+from core.pagination import keyset_filter, keyset_order
+from crud import loaders
+from models.comment import PATH_SEP, comment_path
 from schemas.comment import CommentCreate, CommentUpdate
 
+# 顶层评论 / 直接回复按 id 正序翻页（先发表的在前），走 (post_id, parent_id, id) 索引
+REPLY_SORT_KEY = (models.Comment.id,)
+# 子树按 path 正序翻页（先序遍历），走 path 索引
+THREAD_SORT_KEY = (models.Comment.path,)
 
 
-def create_comment(db:Session,comment:CommentCreate,post_id:int, user_id:int):
-    db_comment = models.Comment(content=comment.content,post_id=post_id,user_id=user_id)
+def _comment_query(options: tuple = loaders.COMMENT_RESPONSE):
+    return select(models.Comment).options(*options)
+
+def _version_query():
+    """ETag 版本字段（列名与 core.etag.comment_version 使用的属性一致），不读取评论内容"""
+    return select(
+        models.Comment.id, models.Comment.parent_id, models.Comment.updated_at, models.Comment.reply_count,
+        models.User.updated_at.label("user_updated_at"),
+    ).outerjoin(models.User, models.User.id == models.Comment.user_id)
+
+def _subtree_end(path: str) -> str:
+    """比 path 的所有子孙的 path 都大的最小字符串（PATH_SEP 的下一个字符）"""
+    return path + chr(ord(PATH_SEP) + 1)
+
+async def create_comment(db:AsyncSession,comment:CommentCreate,post_id:int, user_id:int, parent: models.Comment = None):
+    """
+    创建评论；parent 为被回复的评论（调用方已检查存在且属于同一篇文章）
+
+    先插入拿到 id 再写 path，父评论的 reply_count 原子加一，一起提交
+    """
+    db_comment = models.Comment(
+        content=comment.content, post_id=post_id, user_id=user_id,
+        parent_id=parent.id if parent else None, depth=parent.depth + 1 if parent else 0,
+    )
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
-    return db_comment
+    await db.flush()
+    db_comment.path = comment_path(parent.path if parent else "", db_comment.id)
+    if parent is not None:
+        await _add_reply_count(db, parent.id, 1)
+    await db.commit()
+    return await get_comment(db, db_comment.id)
+
+async def _add_reply_count(db: AsyncSession, comment_id: int, delta: int):
+    await db.execute(update(models.Comment).filter(models.Comment.id == comment_id).values({
+        models.Comment.reply_count: models.Comment.reply_count + delta,
+        # 回复数变化不算修改评论，保持 updated_at 不变
+        models.Comment.updated_at: models.Comment.updated_at,
+    }))
+
+def _top_level(query, post_id: int, after: tuple, limit: int):
+    query = query.filter(models.Comment.post_id == post_id, models.Comment.parent_id.is_(None))
+    if after is not None:
+        query = query.filter(keyset_filter(REPLY_SORT_KEY, after, descending=False))
+    return query.order_by(*keyset_order(REPLY_SORT_KEY, descending=False)).limit(limit + 1)
+
+def _preview_ids(post_id: int, parent_ids: Sequence[int], per_parent: int):
+    """
+    每条父评论的前 per_parent 条直接回复的 id：每个父评论一个带 LIMIT 的子查询，UNION ALL 成一条语句
+
+    不用窗口函数：ROW_NUMBER() 要先对父评论的全部回复编号，回复很多时代价和回复数成正比；
+    这里每个分支只沿索引读 per_parent 行
+    """
+    branches = []
+    for parent_id in parent_ids:
+        sub = select(models.Comment.id).filter(
+            models.Comment.post_id == post_id, models.Comment.parent_id == parent_id
+        ).order_by(models.Comment.id).limit(per_parent).subquery()
+        branches.append(select(sub.c.id))
+    return union_all(*branches)
 
-def get_comments(db:Session,post_id:int):
-    return db.query(models.Comment).filter(models.Comment.post_id==post_id).all()
+async def get_top_comments(db: AsyncSession, post_id: int, after: tuple = None, limit: int = 20):
+    """文章的顶层评论（游标分页，先发表的在前，多查一行用来判断是否还有下一页）"""
+    result = await db.execute(_top_level(_comment_query(), post_id, after, limit))
+    return result.scalars().all()
 
-def update_comment(db:Session,comment_id:int,comment:CommentUpdate):
-    db_comment = db.query(models.Comment).filter(models.Comment.id==comment_id).first()
+async def get_reply_previews(
+    db: AsyncSession, post_id: int, parent_ids: Sequence[int], per_parent: int
+) -> Dict[int, List[models.Comment]]:
+    """一次查询取出每条父评论的前 per_parent 条直接回复，返回 {parent_id: [回复]}"""
+    previews = {parent_id: [] for parent_id in parent_ids}
+    if not parent_ids or per_parent <= 0:
+        return previews
+    result = await db.execute(
+        _comment_query().filter(models.Comment.id.in_(_preview_ids(post_id, parent_ids, per_parent)))
+        .order_by(models.Comment.parent_id, models.Comment.id)
+    )
+    for reply in result.scalars().all():
+        previews[reply.parent_id].append(reply)
+    return previews
+
+async def get_comment_page_versions(
+    db: AsyncSession, post_id: int, after: tuple = None, limit: int = 20, per_parent: int = 3
+):
+    """
+    与 get_top_comments + get_reply_previews 同样的一页，只返回版本字段（用于 If-None-Match）
+
+    Returns:
+        (顶层评论的版本行（多一行）, {parent_id: [回复的版本行]})
+    """
+    result = await db.execute(_top_level(_version_query(), post_id, after, limit))
+    rows = result.all()
+    parent_ids = [row.id for row in rows[:limit]]
+    previews = {parent_id: [] for parent_id in parent_ids}
+    if parent_ids and per_parent > 0:
+        result = await db.execute(
+            _version_query().filter(models.Comment.id.in_(_preview_ids(post_id, parent_ids, per_parent)))
+            .order_by(models.Comment.parent_id, models.Comment.id)
+        )
+        for row in result.all():
+            previews[row.parent_id].append(row)
+    return rows, previews
+
+async def get_replies(db: AsyncSession, comment: models.Comment, after: tuple = None, limit: int = 20):
+    """评论的直接回复（游标分页，先发表的在前，多查一行）"""
+    query = _comment_query().filter(
+        models.Comment.post_id == comment.post_id, models.Comment.parent_id == comment.id
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(REPLY_SORT_KEY, after, descending=False))
+    result = await db.execute(query.order_by(*keyset_order(REPLY_SORT_KEY, descending=False)).limit(limit + 1))
+    return result.scalars().all()
+
+async def get_comment_subtree(db: AsyncSession, comment: models.Comment, after: tuple = None, limit: int = 50):
+    """
+    评论下的所有回复（不含自己），按先序遍历顺序游标分页（多查一行）
+
+    path 落在 (path + "/", path + "0") 区间内的就是子孙，每一页只沿 path 索引读 limit + 1 行，
+    与子树大小无关；返回的 depth 可以用来缩进
+    """
+    query = _comment_query().filter(
+        models.Comment.path > comment.path + PATH_SEP,
+        models.Comment.path < _subtree_end(comment.path),
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(THREAD_SORT_KEY, after, descending=False))
+    result = await db.execute(query.order_by(*keyset_order(THREAD_SORT_KEY, descending=False)).limit(limit + 1))
+    return result.scalars().all()
+
+async def update_comment(db:AsyncSession,comment_id:int,comment:CommentUpdate):
+    db_comment = await get_comment(db, comment_id)
     if not db_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     db_comment.content = comment.content
-    db.commit()
-    db.refresh(db_comment)
-    return db_comment
+    await db.commit()
+    return await get_comment(db, comment_id)
+
+async def delete_comment(db:AsyncSession,comment_id:int):
+    """
+    删除评论和它的所有回复（path 区间，一条 DELETE ... RETURNING），父评论的 reply_count 减一，不提交
 
-def delete_comment(db:Session,comment_id:int):
-    db_comment = db.query(models.Comment).filter(models.Comment.id==comment_id).first()
+    Returns:
+        被删除的每条评论的 created_at（用于从热度分数中减掉）
+    """
+    db_comment = await get_comment(db, comment_id)
     if not db_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
-    db.delete(db_comment)
-    db.commit()
-    return {"message": "Comment deleted successfully"}
+    result = await db.execute(
+        delete(models.Comment).filter(
+            models.Comment.path >= db_comment.path,
+            models.Comment.path < _subtree_end(db_comment.path),
+        ).returning(models.Comment.created_at).execution_options(synchronize_session=False)
+    )
+    deleted = result.scalars().all()
+    if db_comment.parent_id is not None:
+        await _add_reply_count(db, db_comment.parent_id, -1)
+    return deleted
 
-def get_comment(db:Session,comment_id:int):
-    return db.query(models.Comment).filter(models.Comment.id==comment_id).first()
\ No newline at end of file
+async def get_comment(db:AsyncSession,comment_id:int):
+    result = await db.execute(
+        _comment_query().filter(models.Comment.id==comment_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
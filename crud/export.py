@@ -0,0 +1,54 @@
+# crud/export.py
+"""
+全量 / 增量导出（NDJSON 导出接口使用）
+
+每种数据一条查询，按 (时间列, id) 正序走索引读取，通过服务端游标（stream + yield_per）分批取行，
+内存占用只和批大小有关，与表的大小无关。只读取列值，不构造 ORM 对象、不加载关联。
+
+增量导出按时间列过滤（>= since）：文章和评论用 updated_at（任何修改都会刷新），
+点赞不会修改，用 created_at。删除的行不会出现在增量结果中。
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+
+from core.pagination import bind_value
+from models import Comment, Like, Post
+
+# 每种数据导出的列，以及 since 过滤 / 排序用的时间列
+EXPORTS = {
+    "posts": (
+        (Post.id, Post.title, Post.content, Post.author_id, Post.like_count, Post.created_at, Post.updated_at),
+        Post.updated_at,
+    ),
+    "comments": (
+        (Comment.id, Comment.post_id, Comment.user_id, Comment.parent_id, Comment.depth, Comment.content,
+         Comment.created_at, Comment.updated_at),
+        Comment.updated_at,
+    ),
+    "likes": (
+        (Like.id, Like.user_id, Like.post_id, Like.created_at),
+        Like.created_at,
+    ),
+}
+
+
+async def stream_export(
+    db: AsyncSession, kind: str, since: Optional[datetime] = None, batch_size: int = 1000
+) -> AsyncResult:
+    """
+    打开一种数据的导出查询，返回服务端游标上的结果（调用方用 .mappings().partitions() 分批读取）
+
+    Args:
+        kind: EXPORTS 中的一种（posts / comments / likes）
+        since: 只导出时间列 >= since 的行（不带时区的 UTC），为空表示全量
+        batch_size: 每次从游标取的行数
+    """
+    columns, time_column = EXPORTS[kind]
+    query = select(*columns)
+    if since is not None:
+        query = query.filter(time_column >= bind_value(time_column, since))
+    query = query.order_by(time_column, columns[0]).execution_options(yield_per=batch_size)
+    return await db.stream(query)
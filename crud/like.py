@@ -1,80 +1,204 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Integer, delete, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from core.counters import CounterBuffer
+from core.pagination import keyset_filter, keyset_order
+from crud import loaders
+from database import AsyncSessionLocal
 import models
-from typing import List, Optional
-
-
-def create_like(db: Session, user_id: int, post_id: int) -> models.Like:
-    """创建点赞记录"""
-    db_like = models.Like(
-        user_id=user_id,
-        post_id=post_id
-    )
-    db.add(db_like)
-    db.commit()
-    db.refresh(db_like)
-    return db_like
-
-
-def get_like(db: Session, user_id: int, post_id: int) -> Optional[models.Like]:
+from typing import Dict, List, Optional, Set
+
+# 游标分页的排序键（倒序，最新的在前）
+LIKE_SORT_KEY = (models.Like.created_at, models.Like.id)
+
+# Post.like_count 的写缓冲，LIKE_COUNT_WRITE_BEHIND 开启时生效（由 main.py 启动和停止）
+like_count_buffer = CounterBuffer(
+    models.Post,
+    "like_count",
+    AsyncSessionLocal,
+    enabled=settings.LIKE_COUNT_WRITE_BEHIND,
+    flush_interval=settings.LIKE_COUNT_FLUSH_INTERVAL,
+    flush_threshold=settings.LIKE_COUNT_FLUSH_THRESHOLD,
+)
+
+
+def _insert(db: AsyncSession):
+    """按方言选择支持 ON CONFLICT 的 insert（SQLite / PostgreSQL 都支持 DO NOTHING ... RETURNING）"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def create_like(db: AsyncSession, user_id: int, post_id: int) -> bool:
+    """
+    创建点赞记录（INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING）
+
+    从 posts 中 SELECT 出要插入的行，文章不存在时不插入（也不会触发外键错误）；
+    由唯一约束 uix_user_post 判断是否重复，不需要先查询，并发重复点赞也只会插入一行。
+    不提交，由调用方和计数更新放在同一个事务里提交。
+
+    Returns:
+        是否插入了新记录（False 表示已经点过赞或文章不存在）
+    """
+    stmt = _insert(db)(models.Like).from_select(
+        ["user_id", "post_id"],
+        select(literal(user_id, Integer), models.Post.id).filter(models.Post.id == post_id),
+    ).on_conflict_do_nothing(
+        index_elements=[models.Like.user_id, models.Like.post_id]
+    ).returning(models.Like.id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none() is not None
+
+
+async def get_like(db: AsyncSession, user_id: int, post_id: int) -> Optional[models.Like]:
     """查询点赞记录（检查是否已点赞）"""
-    return db.query(models.Like).filter(
+    result = await db.execute(select(models.Like).filter(
         models.Like.user_id == user_id,
         models.Like.post_id == post_id
-    ).first()
+    ))
+    return result.scalars().first()
 
 
-def delete_like(db: Session, user_id: int, post_id: int) -> bool:
-    """删除点赞记录"""
-    db_like = get_like(db, user_id, post_id)
-    if db_like:
-        db.delete(db_like)
-        db.commit()
-        return True
-    return False
+async def delete_like(db: AsyncSession, user_id: int, post_id: int):
+    """
+    删除点赞记录（DELETE ... RETURNING），不提交
+
+    Returns:
+        被删除记录的 (id, created_at)，没有点过赞时返回 None（点赞时间用于从热度分数中减掉这次点赞）
+    """
+    result = await db.execute(delete(models.Like).filter(
+        models.Like.user_id == user_id,
+        models.Like.post_id == post_id
+    ).returning(models.Like.id, models.Like.created_at))
+    return result.first()
 
 
-def get_post_likes(db: Session, post_id: int, skip: int = 0, limit: int = 100) -> List[models.Like]:
-    """获取文章的所有点赞记录"""
-    return db.query(models.Like).filter(
+async def get_post_likes(db: AsyncSession, post_id: int, after: tuple = None, limit: int = 100) -> List[models.Like]:
+    """获取文章的点赞记录（游标分页，多查一行用来判断是否还有下一页）"""
+    query = select(models.Like).options(
+        *loaders.LIKE_RESPONSE
+    ).filter(
         models.Like.post_id == post_id
-    ).order_by(
-        models.Like.created_at.desc()  # 最新的在前
-    ).offset(skip).limit(limit).all()
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(LIKE_SORT_KEY, after))
+    result = await db.execute(query.order_by(
+        *keyset_order(LIKE_SORT_KEY)  # 最新的在前
+    ).limit(limit + 1))
+    return result.scalars().all()
 
 
-def get_like_count(db: Session, post_id: int) -> int:
-    """统计文章的点赞数"""
-    return db.query(models.Like).filter(
+async def get_like_count(db: AsyncSession, post_id: int) -> int:
+    """统计文章的点赞数（COUNT 点赞表，用于核对 Post.like_count）"""
+    result = await db.execute(select(func.count(models.Like.id)).filter(
         models.Like.post_id == post_id
-    ).count()
+    ))
+    return result.scalar_one()
 
 
-def increment_post_like_count(db: Session, post_id: int):
-    """增加文章点赞数（原子操作）"""
-    db.query(models.Post).filter(
+async def get_post_like_count(db: AsyncSession, post_id: int) -> Optional[int]:
+    """
+    读取文章上冗余存储的点赞数，文章不存在时返回 None
+
+    开启写缓冲时加上尚未写回的增减量
+    """
+    result = await db.execute(select(models.Post.like_count).filter(
         models.Post.id == post_id
-    ).update({
-        models.Post.like_count: models.Post.like_count + 1
-    })
-    db.commit()
+    ))
+    count = result.scalar_one_or_none()
+    if count is not None and like_count_buffer.enabled:
+        count += like_count_buffer.pending(post_id, db)
+    return count
+
+
+async def get_post_like_counts(db: AsyncSession, post_ids: List[int]) -> Dict[int, int]:
+    """批量读取文章的点赞数，返回 {post_id: like_count}，不存在的文章不在结果中"""
+    result = await db.execute(select(models.Post.id, models.Post.like_count).filter(
+        models.Post.id.in_(post_ids)
+    ))
+    counts = dict(result.all())
+    if like_count_buffer.enabled:
+        for post_id in counts:
+            counts[post_id] += like_count_buffer.pending(post_id, db)
+    return counts
+
+
+async def get_liked_post_ids(db: AsyncSession, user_id: int, post_ids: List[int]) -> Set[int]:
+    """在给定的文章中，返回用户点过赞的文章 id"""
+    result = await db.execute(select(models.Like.post_id).filter(
+        models.Like.user_id == user_id,
+        models.Like.post_id.in_(post_ids)
+    ))
+    return set(result.scalars().all())
 
 
-def decrement_post_like_count(db: Session, post_id: int):
-    """减少文章点赞数（原子操作）"""
-    db.query(models.Post).filter(
+async def _add_post_like_count(db: AsyncSession, post_id: int, delta: int) -> Optional[int]:
+    if like_count_buffer.enabled:
+        # 写缓冲：事务提交后计入缓冲，由后台任务批量写回
+        like_count_buffer.add(db, post_id, delta)
+        return await get_post_like_count(db, post_id)
+    result = await db.execute(update(models.Post).filter(
         models.Post.id == post_id
-    ).update({
-        models.Post.like_count: models.Post.like_count - 1
-    })
-    db.commit()
+    ).values({
+        models.Post.like_count: models.Post.like_count + delta,
+        # 点赞不算修改文章，保持 updated_at 不变（否则 onupdate 会刷新它）
+        models.Post.updated_at: models.Post.updated_at,
+    }).returning(models.Post.like_count))
+    return result.scalar_one_or_none()
 
 
-def get_user_likes(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Like]:
-    """获取用户点赞的所有文章"""
-    return db.query(models.Like).filter(
-        models.Like.user_id == user_id
-    ).order_by(
-        models.Like.created_at.desc()
-    ).offset(skip).limit(limit).all()
+async def increment_post_like_count(db: AsyncSession, post_id: int) -> Optional[int]:
+    """
+    增加文章点赞数（原子操作，UPDATE ... RETURNING），不提交
+
+    开启 LIKE_COUNT_WRITE_BEHIND 时不直接 UPDATE，增量在事务提交后进入写缓冲
+
+    Returns:
+        更新后的点赞数，文章不存在时返回 None
+    """
+    return await _add_post_like_count(db, post_id, 1)
+
+
+async def decrement_post_like_count(db: AsyncSession, post_id: int) -> Optional[int]:
+    """减少文章点赞数（原子操作，UPDATE ... RETURNING），不提交"""
+    return await _add_post_like_count(db, post_id, -1)
 
+
+async def get_user_likes(db: AsyncSession, user_id: int, after: tuple = None, limit: int = 100) -> List[models.Like]:
+    """获取用户点赞的文章（游标分页，多查一行用来判断是否还有下一页）"""
+    query = select(models.Like).options(
+        *loaders.LIKE_RESPONSE
+    ).filter(
+        models.Like.user_id == user_id
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(LIKE_SORT_KEY, after))
+    result = await db.execute(query.order_by(
+        *keyset_order(LIKE_SORT_KEY)
+    ).limit(limit + 1))
+    return result.scalars().all()
+
+
+async def get_user_liked_posts(
+    db: AsyncSession, user_id: int, after: tuple = None, limit: int = 100, options: tuple = loaders.POST_RESPONSE
+):
+    """
+    获取用户点赞的文章本身（游标分页，多查一行用来判断是否还有下一页）
+
+    likes JOIN posts 一条查询取出整页文章，和 get_user_likes 相同的排序键和游标，
+    走 (user_id, created_at, id) 索引；返回 (Post, like_id, liked_at) 行，文章的作者和标签按 options 加载
+    """
+    query = select(
+        models.Post, models.Like.id.label("like_id"), models.Like.created_at.label("liked_at")
+    ).join(
+        models.Like, models.Like.post_id == models.Post.id
+    ).options(*options).filter(
+        models.Like.user_id == user_id
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(LIKE_SORT_KEY, after))
+    result = await db.execute(query.order_by(
+        *keyset_order(LIKE_SORT_KEY)
+    ).limit(limit + 1))
+    return result.all()
@@ -0,0 +1,36 @@
+# crud/loaders.py
+"""
+按响应结构声明关联加载策略
+
+每个 *_RESPONSE 对应一个 schemas 中的响应模型，列出序列化时会访问的关联：
+- 多对一（author / user）用 joinedload，和主查询一起 JOIN 出来，不增加查询
+- 一对多 / 多对多（tags / posts）用 selectinload，整页数据只追加一条 IN 查询
+
+这样无论一页有多少行，查询次数都是固定的，不会出现 1 + N 次懒加载。
+只做存在性或权限检查的读取不需要关联，传 options=() 即可。
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+import models
+
+# PostResponse: author + tags
+POST_RESPONSE = (
+    joinedload(models.Post.author),
+    selectinload(models.Post.tags),
+)
+
+# UserResponse: 不加载 posts 关联，recent_posts 由 crud.get_user_posts 单独按上限查询
+USER_RESPONSE = ()
+
+# TagResponse: 只有标签本身的列（文章数是冗余列 post_count）
+TAG_RESPONSE = ()
+
+# CommentResponse: user
+COMMENT_RESPONSE = (
+    joinedload(models.Comment.user),
+)
+
+# LikeResponse: user
+LIKE_RESPONSE = (
+    joinedload(models.Like.user),
+)
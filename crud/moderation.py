@@ -0,0 +1,10 @@
+# crud/moderation.py
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import SensitiveWord
+
+async def get_sensitive_words(db: AsyncSession) -> List[str]:
+    """读取数据库中的全部敏感词（只取 word 列，走 ix_sensitive_words_word 覆盖索引）"""
+    result = await db.execute(select(SensitiveWord.word))
+    return list(result.scalars().all())
@@ -1,37 +1,111 @@
 # crud/post.py
-from sqlalchemy.orm import Session
-from models import Post
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.pagination import keyset_filter, keyset_order
+from crud import loaders
+from crud.tag import change_post_counts, tag_suggest_index
+from models import Post, PostScore, User
 from schemas import PostCreate
 
-def create_post(db: Session, post: PostCreate, author_id: int):
+# 排序方式 -> 游标分页的排序键（倒序）
+POST_SORT_KEYS = {
+    "created_at": (Post.created_at, Post.id),
+    "like_count": (Post.like_count, Post.id),
+}
+
+async def create_post(db: AsyncSession, post: PostCreate, author_id: int, commit: bool = True):
+    """
+    创建文章
+
+    commit=False 时只 flush（拿到 id 和 created_at），不提交，返回没有加载关联的对象，
+    由调用方和同一事务中的其他写入一起提交
+    """
     db_post = Post(**post.model_dump(), author_id=author_id)
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
-    return db_post
+    if not commit:
+        await db.flush()
+        return db_post
+    await db.commit()
+    return await get_post(db, db_post.id)
+
+async def get_posts(
+    db: AsyncSession,
+    after: tuple = None,
+    limit: int = 10,
+    sort: str = "created_at",
+    author_id: int = None,
+    options: tuple = loaders.POST_RESPONSE,
+):
+    """
+    游标分页获取文章，按排序键倒序
+
+    after 为上一页最后一行的排序键，多查一行用来判断是否还有下一页；
+    只需要 PostSimple 时传 options=() 不加载关联
+    """
+    result = await db.execute(_page(select(Post).options(*options), after, limit, sort, author_id))
+    return result.scalars().all()
+
+def _page(query, after: tuple, limit: int, sort: str, author_id: int):
+    """在 query 上加作者过滤、游标条件、排序和 limit + 1"""
+    columns = POST_SORT_KEYS[sort]
+    if author_id is not None:
+        query = query.filter(Post.author_id == author_id)
+    if after is not None:
+        query = query.filter(keyset_filter(columns, after))
+    return query.order_by(*keyset_order(columns)).limit(limit + 1)
 
-def get_posts(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(Post).offset(skip).limit(limit).all()
+# ============= ETag 版本字段（不读取正文和关联） =============
+# 列名与 core.etag 中使用的对象属性一致
 
-def get_post(db: Session, post_id: int):
-    return db.query(Post).filter(Post.id == post_id).first()
+def _version_query(with_author: bool = True):
+    if not with_author:
+        return select(Post.id, Post.updated_at)
+    return select(
+        Post.id, Post.updated_at, User.updated_at.label("author_updated_at")
+    ).outerjoin(User, User.id == Post.author_id)
 
-def update_post(db: Session, post_id: int, post: PostCreate):
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+async def get_post_version(db: AsyncSession, post_id: int):
+    """单篇文章的版本字段，文章不存在时返回 None"""
+    result = await db.execute(_version_query().filter(Post.id == post_id))
+    return result.first()
+
+async def get_post_versions(
+    db: AsyncSession,
+    after: tuple = None,
+    limit: int = 10,
+    sort: str = "created_at",
+    author_id: int = None,
+    with_author: bool = True,
+):
+    """与 get_posts 同样的分页（多一行），只返回版本字段；with_author=False 时只有 id / updated_at（PostSimple）"""
+    result = await db.execute(_page(_version_query(with_author), after, limit, sort, author_id))
+    return result.all()
+
+async def get_post(db: AsyncSession, post_id: int, options: tuple = loaders.POST_RESPONSE):
+    """获取单篇文章，options 为空时只加载文章本身（用于存在性 / 权限检查）"""
+    result = await db.execute(
+        select(Post).options(*options).filter(Post.id == post_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def update_post(db: AsyncSession, post_id: int, post: PostCreate):
+    db_post = await get_post(db, post_id)
     if db_post:
         db_post.title = post.title
         db_post.content = post.content
-        db.commit()
-        db.refresh(db_post)
-        return db_post
+        await db.commit()
+        return await get_post(db, post_id)
 
-def delete_post(db: Session, post_id: int):
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+async def delete_post(db: AsyncSession, post_id: int):
+    db_post = await get_post(db, post_id)
     if db_post:
-        db.delete(db_post)
-        db.commit()
+        # 关联行随文章一起删除，标签的文章数同步减一，热度分数一并删除
+        counts = await change_post_counts(db, [tag.id for tag in db_post.tags], -1)
+        await db.execute(delete(PostScore).filter(PostScore.post_id == post_id))
+        await db.delete(db_post)
+        await db.commit()
+        tag_suggest_index.set_counts(counts)
         return db_post
 
-def get_user_posts(db: Session, user_id: int, skip: int = 0, limit: int = 10):
-    return db.query(Post).filter(Post.author_id == user_id).offset(skip).limit(limit).all()
-
+async def get_user_posts(db: AsyncSession, user_id: int, after: tuple = None, limit: int = 10, options: tuple = loaders.POST_RESPONSE):
+    return await get_posts(db, after=after, limit=limit, author_id=user_id, options=options)
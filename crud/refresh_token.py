@@ -0,0 +1,66 @@
+# crud/refresh_token.py
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth import REFRESH_TOKEN_EXPIRE_DAYS, generate_refresh_token, hash_refresh_token
+from models import RefreshToken, User
+
+
+def _new_refresh_token(user_id: int, subject: str) -> Tuple[str, RefreshToken]:
+    token, token_hash = generate_refresh_token()
+    db_token = RefreshToken(
+        token_hash=token_hash,
+        user_id=user_id,
+        subject=subject,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    return token, db_token
+
+async def create_refresh_token(db: AsyncSession, user_id: int, subject: str) -> str:
+    """签发刷新令牌，返回令牌明文（只在这里出现一次）"""
+    token, db_token = _new_refresh_token(user_id, subject)
+    db.add(db_token)
+    await db.commit()
+    return token
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Optional[Tuple[str, str]]:
+    """
+    用刷新令牌换一个新的刷新令牌（轮换），旧令牌立即作废
+
+    一条 UPDATE ... FROM users ... RETURNING 按 token_hash 唯一索引定位，同时完成校验
+    （未作废、未过期、用户仍然存在）、作废和取出 subject；并发使用同一个令牌时只有一个请求能成功
+
+    Returns:
+        (subject, 新令牌)；令牌无效、已过期或已作废时返回 None
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+            # 用户已删除时不再签发新令牌
+            RefreshToken.user_id == User.id,
+        ).values(revoked_at=now).returning(
+            RefreshToken.user_id, RefreshToken.subject
+        ).execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    new_token, db_token = _new_refresh_token(row.user_id, row.subject)
+    db.add(db_token)
+    await db.commit()
+    return row.subject, new_token
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """注销单个刷新令牌（退出登录）"""
+    result = await db.execute(
+        update(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token),
+            RefreshToken.revoked_at.is_(None),
+        ).values(revoked_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount > 0
@@ -0,0 +1,198 @@
+# crud/search.py
+"""
+文章全文搜索（索引结构见 models/search.py）
+
+文章（标题、正文）和评论分别建索引，查询时各自匹配，再按 post_id 合并：
+文章的分数 = 文章本身的分数 + 命中评论中最好的分数（没命中的一方记 0）。
+每个词都出现在文章中，或者都出现在同一条评论中，这篇文章才算命中。
+
+按相关度排序，分数越小越相关（SQLite bm25 本身就是越小越好，PostgreSQL 取 ts_rank_cd 的相反数），
+游标为上一页最后一行的 (分数, id)，与其他列表一样用 keyset 条件翻页。
+片段（snippet）在分页之后才生成，只对这一页的文章计算。
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, and_, case, cast, exists, func, literal_column, null, select, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.pagination import keyset_filter, keyset_order
+from crud import loaders
+from models import Comment, Post, post_tags
+from models.search import comment_search, comments_fts, post_search, posts_fts
+
+# bm25 的列权重：标题 > 正文；评论的分数再乘以 SQLITE_COMMENT_WEIGHT
+SQLITE_WEIGHTS = (10.0, 1.0)
+SQLITE_COMMENT_WEIGHT = 0.5
+SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS = "<mark>", "</mark>", "…"
+SNIPPET_TOKENS = 16
+POSTGRES_HEADLINE_OPTIONS = (
+    f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, FragmentDelimiter={SNIPPET_ELLIPSIS}, "
+    f"MaxFragments=1, MaxWords={SNIPPET_TOKENS}, MinWords=5"
+)
+# 转成 double precision：游标里的分数经过 JSON 往返后要和数据库里的值精确相等
+SCORE_TYPE = Float(precision=53)
+
+
+def _terms(query: str) -> List[Tuple[str, bool]]:
+    """按空白切词，返回 (词, 是否前缀匹配)；词末尾的 * 表示前缀匹配"""
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append((word, prefix))
+    return terms
+
+
+def fts5_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换成 FTS5 查询：每个词加引号作为短语，词之间是 AND
+
+    引号内不解析 FTS5 语法（AND / OR / NEAR / 列过滤 / 括号），任意输入都不会导致语法错误；
+    词末尾的 * 保留为前缀匹配。没有有效的词时返回 None
+    """
+    terms = ['"' + word.replace('"', '""') + '"' + ("*" if prefix else "") for word, prefix in _terms(query)]
+    return " ".join(terms) or None
+
+
+def tsquery(query: str) -> Optional[str]:
+    """
+    把用户输入转换成 PostgreSQL to_tsquery 的查询：每个词加单引号作为词素，词之间是 &
+
+    与 fts5_query 规则相同：引号内不解析 tsquery 语法（& | ! <-> 括号），
+    词末尾的 * 转换成 :* 前缀匹配。没有有效的词时返回 None
+    """
+    terms = [
+        "'" + word.replace("\\", "\\\\").replace("'", "''") + "'" + (":*" if prefix else "")
+        for word, prefix in _terms(query)
+    ]
+    return " & ".join(terms) or None
+
+
+def _sqlite_hits(query: str):
+    """文章和评论各自匹配，每个命中一行：post_id, post_score, comment_score, comment_id"""
+    posts, comments = literal_column("posts_fts"), literal_column("comments_fts")
+    post_hits = (
+        select(
+            posts_fts.c.rowid.label("post_id"),
+            func.bm25(posts, *SQLITE_WEIGHTS, type_=Float).label("post_score"),
+            null().label("comment_score"),
+            null().label("comment_id"),
+        )
+        .select_from(posts_fts)
+        .filter(posts.op("MATCH")(query))
+    )
+    comment_hits = (
+        select(
+            comments_fts.c.post_id,
+            null(),
+            func.bm25(comments, type_=Float) * SQLITE_COMMENT_WEIGHT,
+            comments_fts.c.rowid,
+        )
+        .select_from(comments_fts)
+        .filter(comments.op("MATCH")(query))
+    )
+    return union_all(post_hits, comment_hits)
+
+
+def _sqlite_snippet(query: str, page):
+    """文章本身命中时取标题 / 正文的片段，否则取命中评论的片段"""
+    posts, comments = literal_column("posts_fts"), literal_column("comments_fts")
+    post_snippet = (
+        select(func.snippet(posts, -1, SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, SNIPPET_TOKENS))
+        .select_from(posts_fts)
+        .filter(posts.op("MATCH")(query), posts_fts.c.rowid == page.c.post_id)
+        .scalar_subquery()
+    )
+    comment_snippet = (
+        select(func.snippet(comments, 0, SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, SNIPPET_TOKENS))
+        .select_from(comments_fts)
+        .filter(comments.op("MATCH")(query), comments_fts.c.rowid == page.c.comment_id)
+        .scalar_subquery()
+    )
+    return case((page.c.post_matched, post_snippet), else_=comment_snippet)
+
+
+def _postgres_hits(query: str):
+    tsq = func.to_tsquery("simple", query)
+    post_hits = (
+        select(
+            post_search.c.post_id,
+            cast(-func.ts_rank_cd(post_search.c.document, tsq), SCORE_TYPE).label("post_score"),
+            cast(null(), SCORE_TYPE).label("comment_score"),
+            cast(null(), Integer).label("comment_id"),
+        )
+        .filter(post_search.c.document.op("@@")(tsq))
+    )
+    # 评论的 document 加权 C，ts_rank_cd 默认权重下本身就比标题 / 正文低
+    comment_hits = (
+        select(
+            comment_search.c.post_id,
+            cast(null(), SCORE_TYPE),
+            cast(-func.ts_rank_cd(comment_search.c.document, tsq), SCORE_TYPE),
+            comment_search.c.comment_id,
+        )
+        .filter(comment_search.c.document.op("@@")(tsq))
+    )
+    return union_all(post_hits, comment_hits)
+
+
+def _postgres_snippet(query: str, page):
+    tsq = func.to_tsquery("simple", query)
+    comment_content = select(Comment.content).filter(Comment.id == page.c.comment_id).scalar_subquery()
+    return case(
+        (page.c.post_matched, func.ts_headline("simple", func.concat_ws(" ", Post.title, Post.content), tsq, POSTGRES_HEADLINE_OPTIONS)),
+        else_=func.ts_headline("simple", comment_content, tsq, POSTGRES_HEADLINE_OPTIONS),
+    )
+
+
+async def search_posts(
+    db: AsyncSession,
+    query: str,
+    after: tuple = None,
+    limit: int = 10,
+    tag_id: int = None,
+    author_id: int = None,
+    options: tuple = loaders.POST_RESPONSE,
+):
+    """
+    搜索文章的标题、正文和评论，按相关度排序（多查一行用来判断是否还有下一页）
+
+    Returns:
+        行列表，每行有 Post、score、snippet 三个字段；snippet 是命中位置附近的片段，
+        命中的词用 <mark></mark> 包围（原文没有转义，前端需要按纯文本处理后再高亮）
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        query, hits_for, snippet_for = tsquery(query), _postgres_hits, _postgres_snippet
+    else:
+        query, hits_for, snippet_for = fts5_query(query), _sqlite_hits, _sqlite_snippet
+    if query is None:
+        return []
+
+    # 按文章合并：文章分数 + 最好的评论分数；comment_id 是命中的评论之一，文章本身没命中时用来取片段
+    hits = hits_for(query).subquery("hits")
+    post_score = func.min(hits.c.post_score)
+    ranked = select(
+        hits.c.post_id,
+        type_coerce(func.coalesce(post_score, 0.0) + func.coalesce(func.min(hits.c.comment_score), 0.0), SCORE_TYPE).label("score"),
+        post_score.is_not(None).label("post_matched"),
+        func.min(hits.c.comment_id).label("comment_id"),
+    ).group_by(hits.c.post_id).subquery("ranked")
+    columns = (ranked.c.score, Post.id)
+    page = select(ranked).join(Post, Post.id == ranked.c.post_id)
+    if author_id is not None:
+        page = page.filter(Post.author_id == author_id)
+    if tag_id is not None:
+        page = page.filter(exists().where(and_(post_tags.c.post_id == Post.id, post_tags.c.tag_id == tag_id)))
+    if after is not None:
+        page = page.filter(keyset_filter(columns, after, descending=False))
+    page = page.order_by(*keyset_order(columns, descending=False)).limit(limit + 1).subquery("page")
+
+    stmt = (
+        select(Post, page.c.score, snippet_for(query, page).label("snippet"))
+        .join(page, Post.id == page.c.post_id)
+        .options(*options)
+        .order_by(*keyset_order((page.c.score, Post.id), descending=False))
+    )
+    result = await db.execute(stmt)
+    return result.all()
@@ -1,60 +1,146 @@
 # crud/tag.py
-from sqlalchemy.orm import Session
-from models import Tag, Post
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from core.pagination import keyset_filter, keyset_order
+from core.tag_suggest import TagSuggestIndex
+from crud import loaders
+from database import AsyncSessionLocal, utcnow
+from models import Tag, Post, post_tags
 from schemas import TagCreate
 
-def create_tag(db: Session, tag: TagCreate):
+# 排序方式 -> (游标分页的排序键, 是否倒序)
+TAG_SORT_KEYS = {
+    "created_at": ((Tag.created_at, Tag.id), False),  # 先创建的在前
+    "popular": ((Tag.post_count, Tag.id), True),       # 文章最多的在前
+}
+
+# 标签下文章的排序键（倒序，最新的在前），走 post_tags (tag_id, post_id) 索引
+TAG_POSTS_SORT_KEY = (post_tags.c.post_id,)
+
+async def _load_tag_suggest_rows():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Tag.id, Tag.name, Tag.post_count))
+        return result.all()
+
+# 标签自动补全索引（由 main.py 加载和启动定时重新加载），下面的写操作提交后同步修改
+tag_suggest_index = TagSuggestIndex(
+    _load_tag_suggest_rows,
+    top_k=settings.TAG_SUGGEST_LIMIT,
+    refresh_interval=settings.TAG_SUGGEST_REFRESH_INTERVAL,
+)
+
+def _tag_query():
+    return select(Tag).options(*loaders.TAG_RESPONSE)
+
+async def _get_post_with_tags(db: AsyncSession, post_id: int):
+    """返回值是 PostResponse，同时需要 tags 判断是否已关联"""
+    result = await db.execute(select(Post).options(*loaders.POST_RESPONSE).filter(Post.id == post_id))
+    return result.scalars().first()
+
+async def create_tag(db: AsyncSession, tag: TagCreate):
     """创建标签，如果已存在则返回已有标签"""
-    existing_tag = db.query(Tag).filter(Tag.name == tag.name).first()
+    existing_tag = await get_tag_by_name(db, tag.name)
     if existing_tag:
         return existing_tag
-    
+
     db_tag = Tag(**tag.model_dump())
     db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
-    return db_tag
+    await db.commit()
+    tag_suggest_index.put(db_tag.id, db_tag.name, 0)
+    return await get_tag(db, db_tag.id)
 
-def get_tag(db: Session, tag_id: int):
-    return db.query(Tag).filter(Tag.id == tag_id).first()
+async def get_tag(db: AsyncSession, tag_id: int):
+    result = await db.execute(_tag_query().filter(Tag.id == tag_id))
+    return result.scalars().first()
 
-def get_tag_by_name(db: Session, name: str):
-    return db.query(Tag).filter(Tag.name == name).first()
+async def get_tag_by_name(db: AsyncSession, name: str):
+    result = await db.execute(_tag_query().filter(Tag.name == name))
+    return result.scalars().first()
 
-def get_tags(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Tag).offset(skip).limit(limit).all()
+async def get_tags(db: AsyncSession, after: tuple = None, limit: int = 100, sort: str = "created_at"):
+    """游标分页获取标签，多查一行用来判断是否还有下一页"""
+    columns, descending = TAG_SORT_KEYS[sort]
+    query = _tag_query()
+    if after is not None:
+        query = query.filter(keyset_filter(columns, after, descending=descending))
+    result = await db.execute(query.order_by(*keyset_order(columns, descending=descending)).limit(limit + 1))
+    return result.scalars().all()
 
-def add_tag_to_post(db: Session, post_id: int, tag_id: int):
+async def get_tag_posts(db: AsyncSession, tag_id: int, after: tuple = None, limit: int = 10, options: tuple = loaders.POST_RESPONSE):
+    """游标分页获取带某个标签的文章（最新的在前），多查一行用来判断是否还有下一页"""
+    query = (
+        select(Post).options(*options)
+        .join(post_tags, post_tags.c.post_id == Post.id)
+        .filter(post_tags.c.tag_id == tag_id)
+    )
+    if after is not None:
+        query = query.filter(keyset_filter(TAG_POSTS_SORT_KEY, after))
+    result = await db.execute(query.order_by(*keyset_order(TAG_POSTS_SORT_KEY)).limit(limit + 1))
+    return result.scalars().all()
+
+async def change_post_counts(db: AsyncSession, tag_ids: list, delta: int) -> list:
+    """
+    调整标签的 post_count（增删文章和标签的关联时调用，不提交，和关联的修改在同一个事务里）
+
+    Returns:
+        更新后的 (tag_id, post_count)，提交后交给 tag_suggest_index.set_counts
+    """
+    if not tag_ids:
+        return []
+    result = await db.execute(
+        update(Tag).where(Tag.id.in_(tag_ids)).values(post_count=Tag.post_count + delta)
+        .returning(Tag.id, Tag.post_count)
+    )
+    return result.all()
+
+async def _commit_post_change(db: AsyncSession, post: Post):
+    """标签是文章内容的一部分：增删标签时刷新文章的 updated_at（ETag 依赖它）"""
+    post.updated_at = utcnow()
+    await db.commit()
+    await db.refresh(post, attribute_names=["updated_at"])
+
+async def add_tag_to_post(db: AsyncSession, post_id: int, tag_id: int):
     """给文章添加标签"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
-    
+    post = await _get_post_with_tags(db, post_id)
+    tag = await db.get(Tag, tag_id)
+
     if post and tag:
         if tag not in post.tags:
             post.tags.append(tag)
-            db.commit()
-            db.refresh(post)
+            counts = await change_post_counts(db, [tag_id], 1)
+            await _commit_post_change(db, post)
+            tag_suggest_index.set_counts(counts)
         return post
     return None
 
-def remove_tag_from_post(db: Session, post_id: int, tag_id: int):
+async def remove_tag_from_post(db: AsyncSession, post_id: int, tag_id: int):
     """从文章移除标签"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
-    
+    post = await _get_post_with_tags(db, post_id)
+    tag = await db.get(Tag, tag_id)
+
     if post and tag:
         if tag in post.tags:
             post.tags.remove(tag)
-            db.commit()
-            db.refresh(post)
+            counts = await change_post_counts(db, [tag_id], -1)
+            await _commit_post_change(db, post)
+            tag_suggest_index.set_counts(counts)
         return post
     return None
 
-def delete_tag(db: Session, tag_id: int):
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+async def delete_tag(db: AsyncSession, tag_id: int):
+    tag = await get_tag(db, tag_id)
     if tag:
-        db.delete(tag)
-        db.commit()
+        # 带这个标签的文章内容随之变化，刷新它们的 updated_at
+        await db.execute(
+            update(Post)
+            .where(Post.id.in_(select(post_tags.c.post_id).where(post_tags.c.tag_id == tag_id)))
+            .values(updated_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(delete(post_tags).where(post_tags.c.tag_id == tag_id))
+        await db.delete(tag)
+        await db.commit()
+        tag_suggest_index.discard(tag_id)
         return tag
     return None
-
@@ -0,0 +1,155 @@
+# crud/trending.py
+"""
+热门文章分数（前向衰减，原理见 models/trending.py）
+
+- add_post_score：发文 / 点赞 / 评论时加一个增量，取消时按原事件时间减回去，不提交，和事件本身在同一个事务里
+- get_trending_posts：按 (score, post_id) 倒序翻页，一条走索引的查询
+- rebase_post_scores：定时把基准时间移到当前，所有分数乘同一个系数，删除衰减到可以忽略的行
+"""
+import math
+import time
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Union
+
+from sqlalchemy import Float, delete, func, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.pagination import keyset_filter, keyset_order
+from core.periodic import PeriodicTask
+from crud import loaders
+from crud.like import _insert
+from database import AsyncSessionLocal, utcnow
+from models import Post, PostScore, TrendingAnchor
+
+# 衰减速率 λ（每秒），分数每过一个半衰期减半
+DECAY_RATE = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+# 游标分页的排序键（倒序，最热的在前），走 ix_post_scores_score_post_id
+TRENDING_SORT_KEY = (PostScore.score, PostScore.post_id)
+
+
+def epoch_seconds(at: Optional[datetime]) -> float:
+    """事件时间转成 Unix 时间戳；数据库里的时间是不带时区的 UTC，None 表示现在"""
+    if at is None:
+        return time.time()
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+def _anchor():
+    return select(TrendingAnchor.anchor).filter(TrendingAnchor.id == 1).scalar_subquery()
+
+
+def rebase_factor(old_anchor: float, new_anchor: float) -> float:
+    """基准时间从 old_anchor 移到 new_anchor 时分数要乘的系数（游标换算也用它，保证和库里的结果完全一致）"""
+    return math.exp(DECAY_RATE * (old_anchor - new_anchor))
+
+
+async def add_post_score(
+    db: AsyncSession, post_id: int, weight: float, at: Union[Optional[datetime], Sequence[datetime]] = None
+):
+    """
+    给文章加上一个在 at 时刻发生、权重为 weight 的事件（INSERT ... SELECT ... ON CONFLICT DO UPDATE），不提交
+
+    增量 weight * exp(λ * (at - anchor)) 在同一条语句里读取基准时间计算，
+    不会和并发的 rebase 错开（PostgreSQL 下 rebase 会锁表等待这类写入结束）。
+    取消点赞、删除评论时传负的权重和原事件的时间。文章不存在时什么都不做。
+    at 也可以是多个事件时间的列表（如删除一整棵评论子树），合并成一条语句。
+    """
+    if isinstance(at, (list, tuple)):
+        if not at:
+            return
+        # 以最晚的事件为基准合并：Σ exp(λ(t - anchor)) = exp(λ(base - anchor)) * Σ exp(λ(t - base))
+        epochs = [epoch_seconds(t) for t in at]
+        base = max(epochs)
+        weight *= math.fsum(math.exp(DECAY_RATE * (e - base)) for e in epochs)
+    else:
+        base = epoch_seconds(at)
+    delta = literal(weight, Float) * func.exp(
+        literal(DECAY_RATE, Float) * (literal(base, Float) - _anchor()), type_=Float
+    )
+    stmt = _insert(db)(PostScore).from_select(
+        ["post_id", "score"],
+        select(Post.id, delta).filter(Post.id == post_id),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PostScore.post_id],
+        set_={"score": PostScore.score + stmt.excluded.score},
+    )
+    await db.execute(stmt)
+
+
+async def get_trending_posts(
+    db: AsyncSession, after: tuple = None, limit: int = 10, options: tuple = loaders.POST_RESPONSE
+):
+    """
+    热门文章（游标分页，多查一行用来判断是否还有下一页）
+
+    返回 (Post, score, anchor) 行；after 为上一页最后一行的 (score, post_id)，
+    必须是相对当前基准时间的分数（基准时间变化后由调用方用 rebase_factor 换算）
+    """
+    query = select(Post, PostScore.score, _anchor().label("anchor")).join(
+        PostScore, PostScore.post_id == Post.id
+    ).options(*options)
+    if after is not None:
+        query = query.filter(keyset_filter(TRENDING_SORT_KEY, after))
+    result = await db.execute(query.order_by(*keyset_order(TRENDING_SORT_KEY)).limit(limit + 1))
+    return result.all()
+
+
+async def get_trending_anchor(db: AsyncSession) -> Optional[float]:
+    """当前的基准时间（Unix 时间戳）"""
+    result = await db.execute(select(TrendingAnchor.anchor).filter(TrendingAnchor.id == 1))
+    return result.scalar_one_or_none()
+
+
+async def rebase_post_scores(
+    db: AsyncSession,
+    now: Optional[float] = None,
+    min_interval: float = 0,
+    min_score: float = settings.TRENDING_MIN_SCORE,
+) -> Optional[dict]:
+    """
+    把基准时间移到 now，所有分数乘 rebase_factor(旧基准, now)，删除低于 min_score 的行，提交
+
+    排名不变，只是防止分数随时间无限增长；删掉的行是已经衰减到可以忽略的文章，之后再有事件会重新插入。
+    基准时间距今不到 min_interval 秒（比如另一个进程刚做过）时不执行，返回 None。
+    PostgreSQL 下先锁住 post_scores（SHARE ROW EXCLUSIVE），等正在进行的 add_post_score 提交，
+    期间新的写入排队，避免它们按旧基准计算的增量被乘上新系数。
+    """
+    now = time.time() if now is None else now
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE post_scores IN SHARE ROW EXCLUSIVE MODE"))
+    old = await get_trending_anchor(db)
+    if old is None:
+        db.add(TrendingAnchor(id=1, anchor=now))
+        await db.commit()
+        return None
+    if now - old < min_interval:
+        await db.rollback()
+        return None
+
+    # 按旧值比较再更新：并发的两次 rebase 只有一次生效
+    result = await db.execute(update(TrendingAnchor).filter(
+        TrendingAnchor.id == 1, TrendingAnchor.anchor == old
+    ).values(anchor=now, rebased_at=utcnow()))
+    if result.rowcount != 1:
+        await db.rollback()
+        return None
+
+    factor = rebase_factor(old, now)
+    rescaled = await db.execute(update(PostScore).values(score=PostScore.score * factor))
+    pruned = await db.execute(delete(PostScore).filter(PostScore.score < min_score))
+    await db.commit()
+    return {"anchor": now, "factor": factor, "rows": rescaled.rowcount, "pruned": pruned.rowcount}
+
+
+async def _rebase_job():
+    async with AsyncSessionLocal() as db:
+        # 多进程部署时每个进程都会执行，距上次不到半个周期的直接跳过
+        await rebase_post_scores(db, min_interval=settings.TRENDING_REBASE_INTERVAL / 2)
+
+# 定时 rebase（由 main.py 启动和停止）
+trending_rebase_task = PeriodicTask("trending rebase", _rebase_job, settings.TRENDING_REBASE_INTERVAL)
@@ -1,32 +1,90 @@
 # crud/user.py
-from sqlalchemy.orm import Session
-from auth import hash_password, verify_password
+from typing import Optional
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from auth import password_hasher
+from config import settings
+from crud import loaders
 from models import User
-from schemas import UserCreate
+from schemas import Principal, UserCreate
+from utils import TTLCache
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = hash_password(user.password)
+# 鉴权用的用户快照缓存，key 为用户名（token 的 sub）
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+_STALE_PRINCIPALS = "stale_principals"
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(username=user.username, email=user.email, hashed_password=hashed_password, role=user.role)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    await db.commit()
+    return await get_user(db, db_user.id)
+
+async def get_user(db: AsyncSession, user_id: int, options: tuple = loaders.USER_RESPONSE):
+    """获取用户，options 为空时只加载用户本身（用于存在性 / 权限检查）"""
+    result = await db.execute(select(User).options(*options).filter(User.id == user_id))
+    return result.scalars().first()
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user_by_username(db: AsyncSession, username: str, options: tuple = ()):
+    """按用户名查询（登录、鉴权），默认不加载关联"""
+    result = await db.execute(select(User).options(*options).filter(User.username == username))
+    return result.scalars().first()
 
-def get_user_by_username(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 10):
+    result = await db.execute(select(User).order_by(User.id).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def get_users(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_user_version(db: AsyncSession, user_id: int):
+    """用户的版本字段（id、updated_at），用于 ETag；用户不存在时返回 None"""
+    result = await db.execute(select(User.id, User.updated_at).filter(User.id == user_id))
+    return result.first()
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db=db, username=username)
-    if user and verify_password(password, user.hashed_password):
+async def get_user_versions(db: AsyncSession, skip: int = 0, limit: int = 10):
+    """与 get_users 同样的分页，只返回版本字段"""
+    result = await db.execute(select(User.id, User.updated_at).order_by(User.id).offset(skip).limit(limit))
+    return result.all()
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db=db, username=username)
+    if user and await password_hasher.verify(password, user.hashed_password):
         return user
     return None
 
+async def get_principal(db: AsyncSession, username: str) -> Optional[Principal]:
+    """按用户名获取当前用户快照，优先读缓存；用户不存在时返回 None（不缓存）"""
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await get_user_by_username(db=db, username=username)
+        if user is None:
+            return None
+        principal = Principal.model_validate(user)
+        principal_cache.set(username, principal)
+    return principal
+
+def invalidate_principal(username: str):
+    """使某个用户的快照缓存失效（修改用户时自动调用，批量 UPDATE 等绕过 ORM 的修改需要手动调用）"""
+    principal_cache.delete(username)
+
+# ============= 缓存失效 =============
+# 用户被修改 / 删除时先记在 session 上，事务提交后再失效：
+# 如果在 flush 时就失效，提交前的并发请求可能把旧数据重新读进缓存
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_principal_stale(mapper, connection, target):
+    usernames = {target.username, *inspect(target).attrs.username.history.deleted}
+    object_session(target).info.setdefault(_STALE_PRINCIPALS, set()).update(usernames)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_principals(session):
+    for username in session.info.pop(_STALE_PRINCIPALS, ()):
+        invalidate_principal(username)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_principals(session):
+    session.info.pop(_STALE_PRINCIPALS, None)
@@ -1,18 +1,246 @@
-from sqlalchemy import create_engine
+import math
+import threading
+import time
+
+from sqlalchemy import DateTime, create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.expression import FunctionElement
+
+from config import settings
+
+# 同步 URL -> 异步驱动
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """把同步驱动的数据库 URL 转换成对应的异步驱动 URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg"):
+        return url
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend: {backend}")
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# ============= 连接池统计 =============
+
+class PoolStats:
+    """
+    连接池统计：用于根据 worker 数量调整 pool_size / max_overflow
+
+    - checkouts: 累计借出次数
+    - checked_out / peak_checked_out: 当前 / 峰值借出中的连接数
+    - waits: 借连接时发生等待（超过 1ms）的次数
+    - total_wait_ms / max_wait_ms: 等待连接的累计 / 最长耗时
+    - timeouts: 等待超过 pool_timeout 的次数
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        wait_ms = seconds * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            if wait_ms >= 1:
+                self.waits += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+class _TimedPoolMixin:
+    """在借连接的位置计时，记录排队等待连接的时间"""
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+# ============= 引擎配置 =============
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///my_database.db"
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+def _engine_kwargs(url: str, poolclass) -> dict:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    kwargs = {"echo": settings.DB_ECHO, "connect_args": {}}
+
+    if not _is_memory_sqlite(parsed):
+        kwargs.update(
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            # SQLite 是本地文件，不存在断线，跳过 pre-ping 省一次往返
+            pool_pre_ping=settings.DB_POOL_PRE_PING and backend != "sqlite",
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if backend == "sqlite":
+        kwargs["connect_args"]["check_same_thread"] = False
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if parsed.get_driver_name() == "asyncpg":
+            kwargs["connect_args"]["server_settings"] = {"statement_timeout": timeout}
+        else:
+            kwargs["connect_args"]["options"] = f"-c statement_timeout={timeout}"
+    return kwargs
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新的 SQLite 连接建立时设置 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    # 热门文章的分数用到 exp()：没有编译数学函数（SQLITE_ENABLE_MATH_FUNCTIONS）的 SQLite 用 Python 实现补上
+    try:
+        cursor.execute("SELECT exp(0)")
+    except Exception:
+        dbapi_connection.create_function("exp", 1, math.exp, deterministic=True)
+    cursor.close()
+
+
+def _install_listeners(sync_engine, stats: PoolStats):
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    event.listen(sync_engine.pool, "connect", stats.on_connect)
+    event.listen(sync_engine.pool, "checkout", stats.on_checkout)
+    event.listen(sync_engine.pool, "checkin", stats.on_checkin)
+
+
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_kwargs(SQLALCHEMY_DATABASE_URL, TimedQueuePool))
+_install_listeners(engine, TimedQueuePool.stats)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎：API 路由使用，查询期间不会阻塞事件循环
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    **_engine_kwargs(ASYNC_SQLALCHEMY_DATABASE_URL, TimedAsyncAdaptedQueuePool),
+)
+_install_listeners(async_engine.sync_engine, TimedAsyncAdaptedQueuePool.stats)
+
+# expire_on_commit=False：提交后对象属性仍然可用，序列化时不会再触发隐式 IO
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+
+class utcnow(FunctionElement):
+    """
+    当前时间，用作 updated_at 的默认值 / 更新值
+
+    SQLite 的 CURRENT_TIMESTAMP 只精确到秒，同一秒内的两次修改 updated_at 相同，
+    这里改用精确到毫秒的 strftime；其他数据库的 CURRENT_TIMESTAMP 本身精确到微秒
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
 def get_db():
+    """同步 Session（迁移、脚本等离线任务使用）"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """异步 Session（API 路由使用）"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_pool_stats() -> dict:
+    """同步 / 异步引擎的连接池统计"""
+    return {
+        "backend": engine.dialect.name,
+        "sync": TimedQueuePool.stats.snapshot(engine.pool),
+        "async": TimedAsyncAdaptedQueuePool.stats.snapshot(async_engine.sync_engine.pool),
+    }
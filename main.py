@@ -1,14 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from database import engine
+from database import engine, AsyncSessionLocal
+from core.response_cache import response_cache
+from crud.like import like_count_buffer
+from crud.tag import tag_suggest_index
+from crud.trending import trending_rebase_task
+from services import ModerationService
 import models
 
 # 创建所有表
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Blog API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 加载敏感词表（词表文件 + sensitive_words 表）
+    async with AsyncSessionLocal() as db:
+        await ModerationService(db).reload()
+    # 加载标签自动补全索引
+    await tag_suggest_index.reload()
+    tag_suggest_index.start()
+    like_count_buffer.start()
+    # 定时换算热门文章分数的基准时间
+    trending_rebase_task.start()
+    yield
+    await trending_rebase_task.stop()
+    # 关闭前把缓冲中的点赞计数写回数据库
+    await like_count_buffer.stop()
+    await tag_suggest_index.stop()
+    await response_cache.close()
+
+app = FastAPI(title="Blog API", version="1.0.0", lifespan=lifespan)
 
 # 导入路由
-from api import comment_router, users_router, posts_router, auth_router, tags_router, likes_router
+from api import comment_router, users_router, posts_router, auth_router, tags_router, likes_router, metrics_router, moderation_router, export_router
 
 # 注册路由
 app.include_router(auth_router)
@@ -17,6 +41,9 @@ app.include_router(posts_router)
 app.include_router(tags_router)
 app.include_router(comment_router)
 app.include_router(likes_router)
+app.include_router(metrics_router)
+app.include_router(moderation_router)
+app.include_router(export_router)
 
 @app.get("/")
 async def read_root():
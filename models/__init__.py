@@ -4,6 +4,15 @@ from .post import Post
 from .tag import Tag, post_tags
 from .comment import Comment
 from .like import Like
+from .refresh_token import RefreshToken
+from .sensitive_word import SensitiveWord
+from .moderation import ModerationScan, ModerationFlag
+from .search import posts_fts, comments_fts, post_search, comment_search
+from .trending import PostScore, TrendingAnchor
 
-__all__ = ["Base", "User", "UserRole", "Post", "Tag", "post_tags", "Comment", "Like"]
+__all__ = [
+    "Base", "User", "UserRole", "Post", "Tag", "post_tags", "Comment", "Like",
+    "RefreshToken", "SensitiveWord", "ModerationScan", "ModerationFlag",
+    "posts_fts", "comments_fts", "post_search", "comment_search", "PostScore", "TrendingAnchor",
+]
 
@@ -1,6 +1,19 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, utcnow
+
+# 物化路径：从顶层评论到自己的 id，每段补零到固定宽度，用 / 连接，如 "0000000012/0000000345"。
+# 固定宽度保证按字符串排序就是树的先序遍历（同一层按 id，即发表顺序），
+# 某条评论的所有回复是 path 以 "自己的 path/" 开头的一段连续区间
+PATH_DIGITS = 10
+PATH_SEP = "/"
+# 按字节比较：PostgreSQL 默认的语言排序规则会忽略标点，"/" 和数字的先后顺序不可靠
+PATH_TYPE = String().with_variant(String(collation="C"), "postgresql")
+
+
+def comment_path(parent_path: str, comment_id: int) -> str:
+    segment = str(comment_id).zfill(PATH_DIGITS)
+    return f"{parent_path}{PATH_SEP}{segment}" if parent_path else segment
 
 
 class Comment(Base):
@@ -10,7 +23,30 @@ class Comment(Base):
     post_id = Column(Integer,ForeignKey("posts.id"),nullable=False)
     user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=utcnow(), onupdate=utcnow())
+
+    # 回复：parent_id 为空的是顶层评论；depth 从 0 开始；reply_count 是直接回复数（冗余列，增删回复时维护）。
+    # 删除评论时按 path 区间一条语句删掉整棵子树，外键在语句结束时检查，不需要 ON DELETE CASCADE
+    parent_id = Column(Integer, ForeignKey("comments.id"), nullable=True)
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    path = Column(PATH_TYPE, nullable=False, default="", server_default="")
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     post = relationship("Post", back_populates="comments")
-    user = relationship("User", back_populates="comments")
\ No newline at end of file
+    user = relationship("User", back_populates="comments")
+
+    @property
+    def user_updated_at(self):
+        """评论者的修改时间（ETag 的一部分，需要已加载 user）"""
+        return self.user.updated_at if self.user else None
+
+    __table_args__ = (
+        # 按 post_id 过滤后按 (created_at, id) 有序
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+        # 顶层评论（parent_id IS NULL）和某条评论的直接回复，按 id 翻页
+        Index("ix_comments_post_id_parent_id_id", "post_id", "parent_id", "id"),
+        # 子树：path 前缀区间，按 path 翻页即先序遍历
+        Index("ix_comments_path", "path"),
+        # 增量导出：updated_at >= since，按 (updated_at, id) 顺序读取
+        Index("ix_comments_updated_at_id", "updated_at", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -20,4 +20,9 @@ class Like(Base):
     # 唯一约束：一个用户只能给一篇文章点一次赞
     __table_args__ = (
         UniqueConstraint("user_id", "post_id", name="uix_user_post"),
+        # 游标分页：文章的点赞列表 / 用户的点赞列表，按 (created_at, id) 倒序
+        Index("ix_likes_post_id_created_at_id", "post_id", "created_at", "id"),
+        Index("ix_likes_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 增量导出：created_at >= since，按 (created_at, id) 顺序读取
+        Index("ix_likes_created_at_id", "created_at", "id"),
     )
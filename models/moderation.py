@@ -0,0 +1,43 @@
+# models/moderation.py
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from database import Base
+
+
+class ModerationScan(Base):
+    """
+    一次敏感词重新扫描任务（scripts/rescan_moderation.py）
+
+    last_post_id / last_comment_id 是检查点：这个 id 及之前的行已经扫描并写入结果，
+    中断后从检查点继续
+    """
+    __tablename__ = "moderation_scans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="running")  # running / completed
+    word_count = Column(Integer, nullable=False, default=0)
+    last_post_id = Column(Integer, nullable=False, default=0)
+    last_comment_id = Column(Integer, nullable=False, default=0)
+    scanned = Column(Integer, nullable=False, default=0)
+    flagged = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ModerationFlag(Base):
+    """扫描结果：命中敏感词的文章 / 评论"""
+    __tablename__ = "moderation_flags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(Integer, ForeignKey("moderation_scans.id"), nullable=False)
+    target_type = Column(String, nullable=False)  # post / comment
+    target_id = Column(Integer, nullable=False)
+    terms = Column(Text, nullable=False)  # 命中的敏感词，逗号分隔
+    created_at = Column(DateTime, default=func.now())
+
+    # 同一次扫描中每行最多一条结果。续跑不会重复写入：结果和检查点在同一个事务里提交，
+    # 续跑从检查点之后开始；这里的唯一约束只是兜底，重复写入会报错而不是被忽略
+    __table_args__ = (
+        UniqueConstraint("scan_id", "target_type", "target_id", name="uix_scan_target"),
+    )
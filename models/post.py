@@ -1,9 +1,9 @@
 # models/post.py
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, utcnow
 
 class Post(Base):
     __tablename__ = "posts"
@@ -12,10 +12,24 @@ class Post(Base):
     content = Column(String)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=utcnow(), onupdate=utcnow())
     like_count = Column(Integer, default=0)
     
     author = relationship("User", back_populates="posts")
     tags = relationship("Tag", secondary="post_tags", back_populates="posts")
     likes = relationship("Like", back_populates="post")
-    comments = relationship("Comment", back_populates="post")
\ No newline at end of file
+    comments = relationship("Comment", back_populates="post")
+
+    @property
+    def author_updated_at(self):
+        """作者的修改时间（ETag 的一部分，需要已加载 author）"""
+        return self.author.updated_at if self.author else None
+
+    # 游标分页的排序键索引：(created_at, id) / (like_count, id)，作者主页按 author_id 过滤后同样有序
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_like_count_id", "like_count", "id"),
+        Index("ix_posts_author_id_created_at_id", "author_id", "created_at", "id"),
+        # 增量导出：updated_at >= since，按 (updated_at, id) 顺序读取
+        Index("ix_posts_updated_at_id", "updated_at", "id"),
+    )
\ No newline at end of file
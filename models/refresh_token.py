@@ -0,0 +1,22 @@
+# models/refresh_token.py
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+from database import Base
+
+
+class RefreshToken(Base):
+    """
+    刷新令牌
+
+    只保存令牌的 SHA-256 哈希，数据库泄露也拿不到可用的令牌；
+    令牌本身是 32 字节随机数，不需要 bcrypt 这类慢哈希
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    subject = Column(String, nullable=False)  # 签发 access token 时的 sub（用户名）
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # 已使用（轮换）或已注销
+    created_at = Column(DateTime, default=func.now())
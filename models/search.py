@@ -0,0 +1,102 @@
+# models/search.py
+"""
+文章全文索引（标题、正文、评论）
+
+不是 ORM 模型：索引表是数据库特有的结构，由触发器维护，任何写入路径（API、脚本、批量导入）都会同步更新：
+- SQLite: FTS5 虚拟表 posts_fts（rowid = posts.id，title / content 两列）
+  和 comments_fts（rowid = comments.id，content 一列，post_id 不参与索引）
+- PostgreSQL: post_search 表（post_id, document tsvector，标题 / 正文加权 A / B）
+  和 comment_search 表（comment_id, post_id, document tsvector，加权 C），都有 GIN 索引
+
+评论按条索引：评论增删改只写这一条评论的索引行，代价与文章下的评论数无关；
+查询时把命中的评论按 post_id 合并到文章的排序中（见 crud/search.py）。
+只有 title / content 变化才重建文章的索引，点赞数等其他列的更新不触发。
+
+create_all 时自动创建（IF NOT EXISTS）；已有数据的库建表后需要运行
+python -m scripts.rebuild_search_index 回填。
+"""
+from sqlalchemy import DDL, Integer, String, column, event, table
+
+from database import Base
+
+# 查询用的轻量表结构（不在 metadata 中，create_all 不会把它当普通表创建）
+posts_fts = table("posts_fts", column("rowid", Integer), column("title", String), column("content", String))
+comments_fts = table("comments_fts", column("rowid", Integer), column("content", String), column("post_id", Integer))
+post_search = table("post_search", column("post_id", Integer), column("document"))
+comment_search = table("comment_search", column("comment_id", Integer), column("post_id", Integer), column("document"))
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, content, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5("
+    "content, post_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE posts_fts SET title = new.title, content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO comments_fts (rowid, content, post_id) VALUES (new.id, new.content, new.post_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_au AFTER UPDATE OF content ON comments BEGIN
+        UPDATE comments_fts SET content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comments_fts_ad AFTER DELETE ON comments BEGIN
+        DELETE FROM comments_fts WHERE rowid = old.id;
+    END""",
+]
+
+# 'simple' 配置：不做词干提取，不区分语言
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(p.content, '')), 'B')
+"""
+POSTGRES_COMMENT_DOCUMENT = "setweight(to_tsvector('simple', coalesce(c.content, '')), 'C')"
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS post_search (
+        post_id INTEGER PRIMARY KEY REFERENCES posts (id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_post_search_document ON post_search USING GIN (document)",
+    """CREATE TABLE IF NOT EXISTS comment_search (
+        comment_id INTEGER PRIMARY KEY REFERENCES comments (id) ON DELETE CASCADE,
+        post_id INTEGER NOT NULL,
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_comment_search_document ON comment_search USING GIN (document)",
+    f"""CREATE OR REPLACE FUNCTION post_search_refresh(pid INTEGER) RETURNS void AS $$
+        INSERT INTO post_search (post_id, document)
+        SELECT p.id, {POSTGRES_DOCUMENT} FROM posts p WHERE p.id = pid
+        ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document;
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION posts_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM post_search_refresh(NEW.id);
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    # 删除评论时索引行由外键 ON DELETE CASCADE 删除
+    """CREATE OR REPLACE FUNCTION comments_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO comment_search (comment_id, post_id, document)
+        VALUES (NEW.id, NEW.post_id, setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'C'))
+        ON CONFLICT (comment_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS posts_search_aiu ON posts",
+    """CREATE TRIGGER posts_search_aiu AFTER INSERT OR UPDATE OF title, content ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_search_trigger()""",
+    "DROP TRIGGER IF EXISTS comments_search_aiud ON comments",
+    "DROP TRIGGER IF EXISTS comments_search_aiu ON comments",
+    """CREATE TRIGGER comments_search_aiu AFTER INSERT OR UPDATE OF content ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_trigger()""",
+]
+
+for statement in SQLITE_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,13 @@
+# models/sensitive_word.py
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from database import Base
+
+
+class SensitiveWord(Base):
+    """敏感词（与 MODERATION_WORDS_FILE 中的词合并使用，修改后调用 /moderation/reload 生效）"""
+    __tablename__ = "sensitive_words"
+
+    id = Column(Integer, primary_key=True, index=True)
+    word = Column(String, unique=True, index=True, nullable=False)
+    created_at = Column(DateTime, default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -6,6 +6,8 @@ from database import Base
 post_tags = Table("post_tags", Base.metadata,
     Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # 主键 (post_id, tag_id) 只能按文章查标签，按标签查文章（Tag.posts）需要反向的索引
+    Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
 )
 
 class Tag(Base):
@@ -13,5 +15,15 @@ class Tag(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
+    # 带这个标签的文章数（冗余计数，由 crud 增删关联时同步更新），按热度排序不需要 GROUP BY
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
     
-    posts = relationship("Post", secondary=post_tags, back_populates="tags")
+    # 一个标签下可能有大量文章，不允许整个加载：分页查询用 crud.get_tag_posts
+    # passive_deletes: 删除标签时由 crud.delete_tag 直接删除关联行，不需要先加载文章
+    posts = relationship("Post", secondary=post_tags, back_populates="tags", lazy="raise", passive_deletes=True)
+
+    # 游标分页的排序键索引
+    __table_args__ = (
+        Index("ix_tags_created_at_id", "created_at", "id"),
+        Index("ix_tags_post_count_id", "post_count", "id"),
+    )
@@ -0,0 +1,50 @@
+# models/trending.py
+"""
+热门文章的分数表（前向衰减，forward decay）
+
+直接按"点赞 / 评论越新权重越高"排序需要对每篇文章实时计算衰减，无法走索引。这里换一种记法：
+事件在时间 t 发生时，给文章加 weight * exp(λ * (t - anchor))，anchor 是一个固定的基准时间，
+λ = ln2 / 半衰期。任意时刻 now 的真实热度 = score * exp(-λ * (now - anchor))，
+所有文章乘的是同一个系数，排名只取决于 score，不需要随时间逐行衰减：
+- 前 N 名就是 ORDER BY score DESC 的前 N 行，走 (score, post_id) 索引
+- 点赞 / 评论只在事件发生时原子地加一个增量（取消点赞、删除评论按原事件时间减回去）
+- 越晚的事件增量越大，定时把 anchor 移到当前时间、全部分数乘同一个系数（rebase），防止数值增长过大，
+  顺便删掉已经衰减到可以忽略的行
+
+anchor 保存在只有一行的 trending_anchor 表中（id = 1，Unix 时间戳，秒）。
+"""
+import time
+
+from sqlalchemy import Column, DDL, DateTime, Float, ForeignKey, Index, Integer, event
+
+from database import Base, utcnow
+
+
+class PostScore(Base):
+    """文章的热度分数（相对 trending_anchor 的基准时间）"""
+    __tablename__ = "post_scores"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, default=0)
+
+    # 热门列表按 (score, post_id) 倒序翻页
+    __table_args__ = (
+        Index("ix_post_scores_score_post_id", "score", "post_id"),
+    )
+
+
+class TrendingAnchor(Base):
+    """分数的基准时间（只有 id = 1 一行）"""
+    __tablename__ = "trending_anchor"
+
+    id = Column(Integer, primary_key=True)
+    anchor = Column(Float, nullable=False)  # Unix 时间戳（秒）
+    rebased_at = Column(DateTime, default=utcnow())
+
+
+# create_all 建表时插入基准行（迁移中单独插入）
+event.listen(
+    TrendingAnchor.__table__,
+    "after_create",
+    DDL(f"INSERT INTO trending_anchor (id, anchor) VALUES (1, {time.time():.3f})"),
+)
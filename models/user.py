@@ -3,7 +3,7 @@ from sqlalchemy import Boolean, DateTime, Integer, String, func, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.schema import Column
 
-from database import Base
+from database import Base, utcnow
 
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
@@ -19,6 +19,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     role = Column(Enum(UserRole), default=UserRole.READER)
     created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=utcnow(), onupdate=utcnow())
     avatar_url = Column(String, nullable=True)
     bio = Column(String, nullable=True)
     
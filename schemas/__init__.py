@@ -1,22 +1,29 @@
 # schemas/__init__.py
-from .user import UserSimple, UserBase, UserCreate, UserResponse
-from .post import PostBase, PostCreate, PostSimple, PostResponse
-from .tag import TagBase, TagCreate, TagSimple, TagResponse
-from .comment import CommentBase, CommentCreate, CommentUpdate, CommentResponse
-from .like import LikeResponse, LikeStats
+from .user import UserSimple, UserBase, UserCreate, UserListItem, Principal, UserResponse
+from .post import PostBase, PostCreate, PostSimple, PostResponse, PostSearchHit
+from .tag import TagBase, TagCreate, TagSimple, TagResponse, TagSuggestion
+from .comment import CommentBase, CommentCreate, CommentUpdate, CommentResponse, CommentThread
+from .like import LikeResponse, LikedPost, LikeStats, PostLikeStats
+from .pagination import Page
+from .token import TokenResponse, RefreshRequest
 
 # 解析前向引用
 UserResponse.model_rebuild()
 PostResponse.model_rebuild()
+PostSearchHit.model_rebuild()
 TagResponse.model_rebuild()
 CommentResponse.model_rebuild()
+CommentThread.model_rebuild()
 LikeResponse.model_rebuild()
+LikedPost.model_rebuild()
 
 __all__ = [
-    "UserSimple", "UserBase", "UserCreate", "UserResponse",
-    "PostBase", "PostCreate", "PostSimple", "PostResponse",
-    "TagBase", "TagCreate", "TagSimple", "TagResponse",
-    "CommentBase", "CommentCreate", "CommentUpdate", "CommentResponse",
-    "LikeResponse", "LikeStats",
+    "UserSimple", "UserBase", "UserCreate", "UserListItem", "Principal", "UserResponse",
+    "PostBase", "PostCreate", "PostSimple", "PostResponse", "PostSearchHit",
+    "TagBase", "TagCreate", "TagSimple", "TagResponse", "TagSuggestion",
+    "CommentBase", "CommentCreate", "CommentUpdate", "CommentResponse", "CommentThread",
+    "LikeResponse", "LikedPost", "LikeStats", "PostLikeStats",
+    "Page",
+    "TokenResponse", "RefreshRequest",
 ]
 
@@ -1,6 +1,6 @@
 # schemas/comment.py
 from pydantic import BaseModel
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 
 if TYPE_CHECKING:
@@ -10,7 +10,8 @@ class CommentBase(BaseModel):
     content: str
 
 class CommentCreate(CommentBase):
-    pass
+    """parent_id 为空表示顶层评论，否则是对这条评论的回复（必须属于同一篇文章）"""
+    parent_id: Optional[int] = None
 
 class CommentUpdate(BaseModel):
     content: str
@@ -19,7 +20,17 @@ class CommentResponse(CommentBase):
     id: int
     post_id: int
     user_id: int
+    parent_id: Optional[int] = None
+    depth: int = 0
+    reply_count: int = 0
     created_at: datetime
     updated_at: datetime
     user: Optional["UserSimple"] = None
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class CommentThread(BaseModel):
+    """顶层评论 + 前几条直接回复；replies_cursor 不为空时用 /comments/{id}/replies?cursor= 继续加载"""
+    comment: CommentResponse
+    replies: List[CommentResponse] = []
+    replies_cursor: Optional[str] = None
@@ -2,16 +2,26 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from schemas.user import UserSimple
-from schemas.post import PostSimple
+from schemas.post import PostSimple, PostResponse
 
 class LikeResponse(BaseModel):
     id: int
     user_id: int
     post_id: int
-    created_at: datetime.datetime
+    created_at: datetime
     user: UserSimple
     model_config = {"from_attributes": True}
 
-class LikeCount(BaseModel):
+class LikedPost(BaseModel):
+    """展开的点赞记录（/users/me/likes?expand=post）：点赞的 id、时间和完整的文章"""
+    like_id: int
+    liked_at: datetime
+    post: PostResponse
+
+class LikeStats(BaseModel):
     count: int
-    is_liked: bool
\ No newline at end of file
+    is_liked: bool
+
+class PostLikeStats(LikeStats):
+    """批量点赞统计中的一项"""
+    post_id: int
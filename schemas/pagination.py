@@ -0,0 +1,10 @@
+# schemas/pagination.py
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """游标分页的一页数据，next_cursor 为空表示没有下一页"""
+    items: List[T]
+    next_cursor: Optional[str] = None
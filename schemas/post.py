@@ -33,3 +33,8 @@ class PostResponse(PostBase):
     tags: List["TagSimple"] = []
     model_config = {"from_attributes": True}
 
+
+class PostSearchHit(BaseModel):
+    """搜索结果：文章 + 命中位置附近的片段（命中的词用 <mark></mark> 包围）"""
+    post: PostResponse
+    snippet: str
@@ -1,11 +1,7 @@
 # schemas/tag.py
 from pydantic import BaseModel
-from typing import List, TYPE_CHECKING
 from datetime import datetime
 
-if TYPE_CHECKING:
-    from schemas.post import PostSimple
-
 class TagBase(BaseModel):
     name: str
 
@@ -19,8 +15,13 @@ class TagSimple(BaseModel):
     model_config = {"from_attributes": True}
 
 class TagResponse(TagBase):
+    """标签信息，不内嵌文章（文章列表用 /tags/{id}/posts 分页获取）"""
     id: int
     created_at: datetime
-    posts: List["PostSimple"] = []
+    post_count: int = 0
     model_config = {"from_attributes": True}
 
+
+class TagSuggestion(TagSimple):
+    """标签自动补全的候选项"""
+    post_count: int
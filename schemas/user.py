@@ -1,8 +1,10 @@
 # schemas/user.py
 from pydantic import BaseModel
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
+from schemas.pagination import Page
+
 if TYPE_CHECKING:
     from schemas.post import PostSimple
 
@@ -24,12 +26,30 @@ class UserCreate(UserBase):
     password: str
     role: Optional[str] = "reader"
 
-class UserResponse(UserBase):
+class UserListItem(UserBase):
+    """用户列表中的轻量用户信息，不包含文章"""
     id: int
     is_active: bool
     role: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
     bio: Optional[str] = None
-    posts: List["PostSimple"] = []
     model_config = {"from_attributes": True}
 
+class Principal(UserListItem):
+    """
+    当前登录用户的快照（get_current_user 的返回值）
+
+    不是 ORM 对象，不绑定任何 session，可以安全地在请求之间缓存；
+    需要修改用户时按 id 重新查询
+    """
+    model_config = {"from_attributes": True, "frozen": True}
+
+class UserResponse(UserListItem):
+    """
+    用户详情，附带最近几篇文章的预览（有固定上限）
+    
+    完整的文章列表通过 /users/{id}/posts 分页获取，recent_posts.next_cursor 可以直接传给它
+    """
+    recent_posts: Page["PostSimple"]
+
@@ -0,0 +1,380 @@
+"""
+批量导入用户、标签、文章和点赞（从旧博客迁移）
+
+通过 API 导入时每行一次 bcrypt、一次提交；这里直接用 Core 批量插入（executemany），每 --batch-size 行一个事务：
+- 输入按行流式读取，支持 JSONL（.jsonl / .ndjson）和 CSV（.csv），都可以再加 .gz 压缩，不会整个读进内存
+- 密码直接使用已有的 bcrypt 哈希（hashed_password）；只有明文 password 时才在线程池里计算哈希
+- 用户名 / 标签名 / 旧文章 id 到新 id 的映射保存在内存中，文章的标签和点赞按名字解析，不逐行查询
+- 冗余数据在最后统一重算：标签的 post_count、文章的 like_count、热门文章分数（scripts.rebuild_trending）；
+  全文索引由数据库触发器随插入同步更新
+
+重复的用户（用户名或邮箱已存在）、重复的点赞会跳过；文章没有唯一键，同一个文件导入两次会产生重复文章。
+内容不经过敏感词检查，导入后可以运行 python -m scripts.rescan_moderation。
+服务运行中导入时，其他进程的标签自动补全索引和响应缓存要等下一次定时重新加载 / 过期才能看到新数据。
+
+输入字段（CSV 的列名相同，文章的 tags 用 | 分隔；时间为 ISO 8601，带时区的转换成 UTC，缺省为导入时间）：
+    users:  username, email, hashed_password 或 password, role（reader / author / admin）, bio, avatar_url, created_at
+    tags:   name, created_at
+    posts:  id（旧系统的文章 id，只用于点赞引用）, title, content, author（用户名）, tags, created_at, updated_at
+    likes:  user（用户名）, post（旧系统的文章 id，必须在本次导入的文章中）, created_at
+
+用法（在项目根目录执行）：
+    python -m scripts.bulk_import --users users.jsonl --posts posts.csv.gz --likes likes.jsonl
+    python -m scripts.bulk_import --tags tags.csv --posts posts.jsonl --batch-size 5000
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+import models
+from auth import hash_password
+from database import engine
+from scripts import rebuild_trending
+
+ROLES = {role.value for role in models.UserRole}
+
+
+# ============= 输入 =============
+
+def read_rows(path: str) -> Iterator[dict]:
+    """按行读取 JSONL / CSV（可以是 .gz），每行一个 dict"""
+    compressed = path.endswith(".gz")
+    name = path[:-3] if compressed else path
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if name.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def parse_time(value, default: datetime) -> datetime:
+    """ISO 8601 转成不带时区的 UTC（数据库中的存储方式），空值用 default"""
+    if not value:
+        return default
+    at = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+def parse_tags(value) -> List[str]:
+    if not value:
+        return []
+    names = value if isinstance(value, list) else str(value).split("|")
+    # 去掉空白和重复，保持原来的顺序
+    return list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+
+
+def _insert(conn):
+    """支持 ON CONFLICT 的 insert（PostgreSQL / SQLite）"""
+    return postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+
+
+# ============= 统计 =============
+
+class TableStats:
+    """每张表的读取 / 写入 / 跳过行数和耗时"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.read = 0
+        self.inserted = 0
+        self.skipped = Counter()
+        self.start = time.monotonic()
+        self.elapsed = 0.0
+
+    def skip(self, reason: str, count: int = 1):
+        self.skipped[reason] += count
+
+    def done(self):
+        self.elapsed = time.monotonic() - self.start
+
+    def report(self) -> str:
+        rate = self.inserted / self.elapsed if self.elapsed else 0
+        skipped = ", ".join(f"{reason}: {n}" for reason, n in self.skipped.items()) or "-"
+        return (f"{self.name:<10}{self.read:>10}{self.inserted:>10}{self.elapsed:>10.1f}{rate:>12,.0f}"
+                f"  skipped: {skipped}")
+
+
+# ============= 导入 =============
+
+class Importer:
+    """按 用户 -> 标签 -> 文章 -> 点赞 的顺序导入，名字到 id 的映射在各步之间共用"""
+
+    def __init__(self, batch_size: int, hash_workers: int):
+        self.batch_size = batch_size
+        self.hash_workers = hash_workers
+        self.user_ids: Dict[str, int] = {}
+        self.tag_ids: Dict[str, int] = {}
+        self.post_ids: Dict[str, int] = {}
+        self.imported_posts = 0
+        # 需要重算计数的标签 / 文章
+        self.touched_tags = set()
+        self.liked_posts = set()
+        self.stats: List[TableStats] = []
+
+    def _resolve_users(self, conn, usernames: Iterable[str]):
+        """把还不在映射里的用户名查出来（已有用户和本次导入的用户都可以引用）"""
+        missing = {name for name in usernames if name and name not in self.user_ids}
+        if missing:
+            rows = conn.execute(select(models.User.username, models.User.id).filter(models.User.username.in_(missing)))
+            self.user_ids.update(rows.tuples().all())
+
+    def _resolve_tags(self, conn, names: Iterable[str], now: datetime):
+        """不在映射里的标签名：先插入（已存在的跳过），再查出 id"""
+        missing = {name for name in names if name not in self.tag_ids}
+        if not missing:
+            return
+        conn.execute(
+            _insert(conn)(models.Tag).on_conflict_do_nothing(),
+            [{"name": name, "created_at": now, "post_count": 0} for name in sorted(missing)],
+        )
+        rows = conn.execute(select(models.Tag.name, models.Tag.id).filter(models.Tag.name.in_(missing)))
+        self.tag_ids.update(rows.tuples().all())
+
+    def _run(self, name: str, path: str, import_batch):
+        stats = TableStats(name)
+        self.stats.append(stats)
+        for batch in batched(read_rows(path), self.batch_size):
+            stats.read += len(batch)
+            with engine.begin() as conn:
+                import_batch(conn, batch, stats)
+            print(f"{name}: {stats.read} read, {stats.inserted} inserted, {time.monotonic() - stats.start:.1f}s", flush=True)
+        stats.done()
+
+    def import_users(self, path: str):
+        pool = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="bcrypt")
+
+        def import_batch(conn, batch, stats):
+            now = datetime.utcnow()
+            rows, plain = [], []
+            for row in batch:
+                role = row.get("role") or models.UserRole.READER.value
+                if not row.get("username") or not row.get("email"):
+                    stats.skip("missing username / email")
+                    continue
+                if role not in ROLES:
+                    stats.skip("invalid role")
+                    continue
+                if not row.get("hashed_password") and not row.get("password"):
+                    stats.skip("missing password")
+                    continue
+                created_at = parse_time(row.get("created_at"), now)
+                rows.append({
+                    "username": row["username"], "email": row["email"],
+                    "hashed_password": row.get("hashed_password") or None,
+                    "role": models.UserRole(role), "is_active": True,
+                    "bio": row.get("bio") or None, "avatar_url": row.get("avatar_url") or None,
+                    "created_at": created_at, "updated_at": created_at,
+                })
+                plain.append(row.get("password"))
+            # 只有明文密码的行才计算 bcrypt（计算时释放 GIL，线程池可以用满 CPU）
+            need_hash = [i for i, value in enumerate(rows) if value["hashed_password"] is None]
+            for i, hashed in zip(need_hash, pool.map(hash_password, [plain[i] for i in need_hash])):
+                rows[i]["hashed_password"] = hashed
+            if not rows:
+                return
+            result = conn.execute(
+                _insert(conn)(models.User).on_conflict_do_nothing().returning(models.User.username, models.User.id),
+                rows,
+            )
+            inserted = result.all()
+            self.user_ids.update(inserted)
+            stats.inserted += len(inserted)
+            stats.skip("duplicate", len(rows) - len(inserted))
+
+        try:
+            self._run("users", path, import_batch)
+        finally:
+            pool.shutdown()
+
+    def import_tags(self, path: str):
+        def import_batch(conn, batch, stats):
+            now = datetime.utcnow()
+            rows = {}
+            for row in batch:
+                name = (row.get("name") or "").strip()
+                if not name:
+                    stats.skip("missing name")
+                    continue
+                if name in self.tag_ids or name in rows:
+                    stats.skip("duplicate")
+                    continue
+                rows[name] = {"name": name, "created_at": parse_time(row.get("created_at"), now), "post_count": 0}
+            if not rows:
+                return
+            result = conn.execute(
+                _insert(conn)(models.Tag).on_conflict_do_nothing().returning(models.Tag.name, models.Tag.id),
+                list(rows.values()),
+            )
+            inserted = result.all()
+            self.tag_ids.update(inserted)
+            stats.inserted += len(inserted)
+            stats.skip("duplicate", len(rows) - len(inserted))
+            # 数据库里已有的同名标签
+            self._resolve_tags(conn, rows, now)
+
+        self._run("tags", path, import_batch)
+
+    def import_posts(self, path: str):
+        def import_batch(conn, batch, stats):
+            now = datetime.utcnow()
+            self._resolve_users(conn, (row.get("author") for row in batch))
+            rows, refs, tags = [], [], []
+            for row in batch:
+                author_id = self.user_ids.get(row.get("author"))
+                if author_id is None:
+                    stats.skip("unknown author")
+                    continue
+                if not row.get("title"):
+                    stats.skip("missing title")
+                    continue
+                created_at = parse_time(row.get("created_at"), now)
+                rows.append({
+                    "title": row["title"], "content": row.get("content") or "", "author_id": author_id,
+                    "like_count": 0, "created_at": created_at,
+                    "updated_at": parse_time(row.get("updated_at"), created_at),
+                })
+                refs.append(str(row["id"]) if row.get("id") not in (None, "") else None)
+                tags.append(parse_tags(row.get("tags")))
+            if not rows:
+                return
+            self._resolve_tags(conn, itertools.chain.from_iterable(tags), now)
+            # RETURNING 按参数顺序返回新 id，和旧 id / 标签一一对应
+            result = conn.execute(
+                insert(models.Post).returning(models.Post.id, sort_by_parameter_order=True), rows
+            )
+            post_ids = result.scalars().all()
+            links = []
+            for post_id, ref, names in zip(post_ids, refs, tags):
+                if ref is not None:
+                    self.post_ids[ref] = post_id
+                for name in names:
+                    tag_id = self.tag_ids[name]
+                    links.append({"post_id": post_id, "tag_id": tag_id})
+                    self.touched_tags.add(tag_id)
+            if links:
+                conn.execute(insert(models.post_tags), links)
+            self.imported_posts += len(post_ids)
+            stats.inserted += len(post_ids)
+
+        self._run("posts", path, import_batch)
+
+    def import_likes(self, path: str):
+        def import_batch(conn, batch, stats):
+            now = datetime.utcnow()
+            self._resolve_users(conn, (row.get("user") for row in batch))
+            rows = []
+            for row in batch:
+                user_id = self.user_ids.get(row.get("user"))
+                post_id = self.post_ids.get(str(row.get("post")))
+                if user_id is None:
+                    stats.skip("unknown user")
+                    continue
+                if post_id is None:
+                    stats.skip("unknown post")
+                    continue
+                rows.append({"user_id": user_id, "post_id": post_id, "created_at": parse_time(row.get("created_at"), now)})
+            if not rows:
+                return
+            result = conn.execute(
+                _insert(conn)(models.Like).on_conflict_do_nothing().returning(models.Like.post_id), rows
+            )
+            inserted = result.scalars().all()
+            self.liked_posts.update(inserted)
+            stats.inserted += len(inserted)
+            stats.skip("duplicate", len(rows) - len(inserted))
+
+        self._run("likes", path, import_batch)
+
+    # ============= 冗余数据 =============
+
+    def rebuild_counters(self):
+        """重算受影响的标签的 post_count 和文章的 like_count（按 id 分批，每批一条 UPDATE）"""
+        stats = TableStats("counters")
+        self.stats.append(stats)
+        tag_count = (
+            select(func.count()).select_from(models.post_tags)
+            .filter(models.post_tags.c.tag_id == models.Tag.id).scalar_subquery()
+        )
+        like_count = select(func.count(models.Like.id)).filter(models.Like.post_id == models.Post.id).scalar_subquery()
+        for model, values, ids in (
+            (models.Tag, {models.Tag.post_count: tag_count}, self.touched_tags),
+            # 计数变化不算修改文章，保持 updated_at 不变
+            (models.Post, {models.Post.like_count: like_count, models.Post.updated_at: models.Post.updated_at},
+             self.liked_posts),
+        ):
+            ids = sorted(ids)
+            for start in range(0, len(ids), self.batch_size):
+                chunk = ids[start:start + self.batch_size]
+                with engine.begin() as conn:
+                    conn.execute(update(model).filter(model.id.in_(chunk)).values(values))
+                stats.read += len(chunk)
+                stats.inserted += len(chunk)
+        stats.done()
+
+    def rebuild_trending(self):
+        stats = TableStats("trending")
+        self.stats.append(stats)
+        stats.read, stats.inserted = rebuild_trending.run(self.batch_size)
+        stats.done()
+
+    def report(self):
+        print(f"\n{'table':<10}{'read':>10}{'written':>10}{'seconds':>10}{'rows/s':>12}")
+        for stats in self.stats:
+            print(stats.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users")
+    parser.add_argument("--tags")
+    parser.add_argument("--posts")
+    parser.add_argument("--likes")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1,
+                        help="只有明文密码时计算 bcrypt 的线程数")
+    args = parser.parse_args()
+    if not any((args.users, args.tags, args.posts, args.likes)):
+        parser.error("nothing to import: pass at least one of --users / --tags / --posts / --likes")
+
+    importer = Importer(args.batch_size, args.hash_workers)
+    if args.users:
+        importer.import_users(args.users)
+    if args.tags:
+        importer.import_tags(args.tags)
+    if args.posts:
+        importer.import_posts(args.posts)
+    if args.likes:
+        importer.import_likes(args.likes)
+    importer.rebuild_counters()
+    if importer.imported_posts or importer.liked_posts:
+        importer.rebuild_trending()
+    importer.report()
+
+
+if __name__ == "__main__":
+    main()
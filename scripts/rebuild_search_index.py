@@ -0,0 +1,115 @@
+"""
+重建文章全文索引（索引结构见 models/search.py）
+
+平时索引由触发器维护，不需要运行这个脚本；以下情况需要重建：
+- 迁移创建索引之后回填已有数据
+- 触发器被禁用期间写入过数据，或者修改了索引的列、权重、分词方式
+
+先按 posts.id、再按 comments.id 分批处理，每批一个事务：先删掉这一段 id 的索引行，再重新生成。
+写事务都很短，API 可以照常读写（SQLite 需要 WAL 模式，见 SQLITE_JOURNAL_MODE）；
+重建过程中触发器继续工作，已经处理过的批次之后的写入也会反映到索引里。
+
+用法（在项目根目录执行）：
+    python -m scripts.rebuild_search_index
+    python -m scripts.rebuild_search_index --batch-size 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text
+
+import models
+from database import engine
+from models.search import POSTGRES_COMMENT_DOCUMENT, POSTGRES_DDL, POSTGRES_DOCUMENT, SQLITE_DDL
+
+# 每种索引：(名称, 按 id 分批的模型, 每批执行的语句, 最后清理残留行的语句)
+SQLITE_REBUILD = [
+    ("posts", models.Post, [
+        "DELETE FROM posts_fts WHERE rowid > :low AND rowid <= :high",
+        "INSERT INTO posts_fts (rowid, title, content) SELECT id, title, content FROM posts WHERE id > :low AND id <= :high",
+    ], [
+        "DELETE FROM posts_fts WHERE rowid > :low",
+        # 合并分批写入产生的 b-tree 段
+        "INSERT INTO posts_fts (posts_fts) VALUES ('optimize')",
+    ]),
+    ("comments", models.Comment, [
+        "DELETE FROM comments_fts WHERE rowid > :low AND rowid <= :high",
+        """INSERT INTO comments_fts (rowid, content, post_id)
+           SELECT id, content, post_id FROM comments WHERE id > :low AND id <= :high""",
+    ], [
+        "DELETE FROM comments_fts WHERE rowid > :low",
+        "INSERT INTO comments_fts (comments_fts) VALUES ('optimize')",
+    ]),
+]
+
+POSTGRES_REBUILD = [
+    ("posts", models.Post, [
+        "DELETE FROM post_search WHERE post_id > :low AND post_id <= :high",
+        f"""INSERT INTO post_search (post_id, document)
+            SELECT p.id, {POSTGRES_DOCUMENT} FROM posts p WHERE p.id > :low AND p.id <= :high""",
+    ], [
+        "DELETE FROM post_search WHERE post_id > :low",
+    ]),
+    ("comments", models.Comment, [
+        "DELETE FROM comment_search WHERE comment_id > :low AND comment_id <= :high",
+        f"""INSERT INTO comment_search (comment_id, post_id, document)
+            SELECT c.id, c.post_id, {POSTGRES_COMMENT_DOCUMENT} FROM comments c WHERE c.id > :low AND c.id <= :high""",
+    ], [
+        "DELETE FROM comment_search WHERE comment_id > :low",
+    ]),
+]
+
+
+def rebuild(name: str, model, rebuild_statements, cleanup_statements, batch_size: int):
+    """按 model.id 分批重建一种索引"""
+    with engine.begin() as conn:
+        total = conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+    done, low, start = 0, 0, time.monotonic()
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(model.id).filter(model.id > low).order_by(model.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            for statement in rebuild_statements:
+                conn.execute(text(statement), {"low": low, "high": ids[-1]})
+        done += len(ids)
+        low = ids[-1]
+        print(f"indexed {done}/{total} {name} (id <= {low}), {time.monotonic() - start:.1f}s", flush=True)
+
+    # 最后一批之后的 id 没有对应的行，删掉残留的索引行
+    with engine.begin() as conn:
+        for statement in cleanup_statements:
+            conn.execute(text(statement), {"low": low})
+    print(f"done: {done} {name} in {time.monotonic() - start:.1f}s")
+
+
+def run(batch_size: int):
+    if engine.dialect.name == "postgresql":
+        ddl, indexes = POSTGRES_DDL, POSTGRES_REBUILD
+    else:
+        ddl, indexes = SQLITE_DDL, SQLITE_REBUILD
+
+    # 索引结构不存在时先创建（语句都是幂等的）
+    with engine.begin() as conn:
+        for statement in ddl:
+            conn.execute(text(statement))
+    for name, model, rebuild_statements, cleanup_statements in indexes:
+        rebuild(name, model, rebuild_statements, cleanup_statements, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
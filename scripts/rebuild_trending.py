@@ -0,0 +1,101 @@
+"""
+重算热门文章分数（分数表结构见 models/trending.py）
+
+平时分数由发文 / 点赞 / 评论的写入路径增量维护，不需要运行这个脚本；以下情况需要重算：
+- 迁移创建分数表之后回填已有数据
+- 修改了 TRENDING_HALF_LIFE_HOURS 或各项权重
+- 绕过 API 直接写入过 posts / likes / comments
+
+按 posts.id 分批处理，每批一个事务：先删掉这一段 id 的分数，再从 posts / likes / comments 的时间重新计算，
+低于 TRENDING_MIN_SCORE 的不写入（和 rebase 时的清理一致）。删除语句先拿到写锁
+（PostgreSQL 显式锁表），同一批次内 API 的写入会排队等待，不会丢失增量。
+
+用法（在项目根目录执行）：
+    python -m scripts.rebuild_trending
+    python -m scripts.rebuild_trending --batch-size 2000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, insert, select, text
+
+import models
+from config import settings
+from crud.trending import DECAY_RATE, epoch_seconds
+from database import engine
+
+# 每类事件的 (模型, 权重)
+EVENTS = [
+    (models.Post, settings.TRENDING_POST_WEIGHT),
+    (models.Like, settings.TRENDING_LIKE_WEIGHT),
+    (models.Comment, settings.TRENDING_COMMENT_WEIGHT),
+]
+
+
+def rebuild_batch(conn, low: int, high: int) -> int:
+    """重算 (low, high] 这一段文章的分数，返回写入的行数"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("LOCK TABLE post_scores IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(delete(models.PostScore).filter(models.PostScore.post_id > low, models.PostScore.post_id <= high))
+    anchor = conn.execute(
+        select(models.TrendingAnchor.anchor).filter(models.TrendingAnchor.id == 1)
+    ).scalar_one()
+
+    scores = defaultdict(float)
+    for model, weight in EVENTS:
+        post_id = model.id if model is models.Post else model.post_id
+        rows = conn.execute(select(post_id, model.created_at).filter(post_id > low, post_id <= high))
+        for pid, created_at in rows:
+            if created_at is not None:
+                scores[pid] += weight * math.exp(DECAY_RATE * (epoch_seconds(created_at) - anchor))
+
+    values = [
+        {"post_id": pid, "score": score}
+        for pid, score in scores.items()
+        if score >= settings.TRENDING_MIN_SCORE
+    ]
+    if values:
+        conn.execute(insert(models.PostScore), values)
+    return len(values)
+
+
+def run(batch_size: int) -> tuple:
+    """重算全部文章的分数，返回 (文章数, 写入的分数行数)"""
+    with engine.begin() as conn:
+        total = conn.execute(select(func.count()).select_from(models.Post)).scalar_one()
+
+    done, written, low, start = 0, 0, 0, time.monotonic()
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(models.Post.id).filter(models.Post.id > low).order_by(models.Post.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            written += rebuild_batch(conn, low, ids[-1])
+        done += len(ids)
+        low = ids[-1]
+        print(f"scored {done}/{total} posts (id <= {low}), {written} above threshold, {time.monotonic() - start:.1f}s", flush=True)
+
+    # 最后一批之后的 id 没有对应的文章，删掉残留的分数
+    with engine.begin() as conn:
+        conn.execute(delete(models.PostScore).filter(models.PostScore.post_id > low))
+    print(f"done: {done} posts, {written} scores in {time.monotonic() - start:.1f}s")
+    return done, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
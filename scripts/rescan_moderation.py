@@ -0,0 +1,166 @@
+"""
+敏感词重新扫描任务
+
+敏感词表变化后，已经保存的文章和评论不会被重新检查（只在创建 / 更新时检查）。
+这个脚本按主键顺序扫描 posts.content 和 comments.content，把命中的 id 写入 moderation_flags 表：
+
+- 用服务端游标（stream_results）流式读取，每次取出 chunk_size 行，不会把整张表读进内存
+- 每块交给进程池匹配，同时在途的块数有上限（workers * 2），读得再快也不会堆积
+- 每块的结果和检查点（moderation_scans.last_post_id / last_comment_id）在同一个事务里提交，
+  中断后用 --resume 从检查点继续，不会重复也不会遗漏
+- 作为独立进程运行，写事务都很短，不会阻塞 API（SQLite 需要 WAL 模式，见 SQLITE_JOURNAL_MODE）
+
+用法（在项目根目录执行）：
+    python -m scripts.rescan_moderation                       # 开始新的扫描
+    python -m scripts.rescan_moderation --resume              # 从最近一次未完成的扫描继续
+    python -m scripts.rescan_moderation --workers 4 --chunk-size 2000
+
+续跑时使用当前的词表。
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, update
+
+import models
+from config import settings
+from database import engine
+from utils.content_moderation import DEFAULT_SENSITIVE_WORDS, SensitiveWordMatcher, load_words_file
+
+# (结果中的类型, 表, 检查点列)
+TARGETS = [
+    ("post", models.Post, "last_post_id"),
+    ("comment", models.Comment, "last_comment_id"),
+]
+
+# ============= 进程池 worker =============
+
+_matcher = None
+
+
+def _init_worker(words: list):
+    """每个 worker 进程只编译一次匹配器"""
+    global _matcher
+    _matcher = SensitiveWordMatcher(words)
+
+
+def _scan_chunk(rows: list) -> list:
+    """返回命中的 (id, 逗号分隔的敏感词)"""
+    flags = []
+    for row_id, content in rows:
+        terms = _matcher.find(content) if content else []
+        if terms:
+            flags.append((row_id, ",".join(terms)))
+    return flags
+
+
+# ============= 读写 =============
+
+def load_words() -> list:
+    """与应用使用相同的词表：词表文件（或内置词表） + sensitive_words 表"""
+    if settings.MODERATION_WORDS_FILE:
+        words = load_words_file(settings.MODERATION_WORDS_FILE)
+    else:
+        words = list(DEFAULT_SENSITIVE_WORDS)
+    with engine.connect() as conn:
+        words.extend(conn.execute(select(models.SensitiveWord.word)).scalars())
+    return words
+
+
+def stream_chunks(model, after_id: int, chunk_size: int):
+    """服务端游标按主键顺序读取 id > after_id 的行，每次产出 chunk_size 行"""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(
+            select(model.id, model.content).where(model.id > after_id).order_by(model.id)
+        )
+        for partition in result.partitions(chunk_size):
+            yield [tuple(row) for row in partition]
+
+
+def save_chunk(scan_id: int, target_type: str, checkpoint_column: str, last_id: int, count: int, flags: list):
+    """写入一块的结果并推进检查点（同一个事务）"""
+    scan = models.ModerationScan
+    with engine.begin() as conn:
+        if flags:
+            conn.execute(insert(models.ModerationFlag), [
+                {"scan_id": scan_id, "target_type": target_type, "target_id": row_id, "terms": terms}
+                for row_id, terms in flags
+            ])
+        conn.execute(update(scan).where(scan.id == scan_id).values({
+            checkpoint_column: last_id,
+            scan.scanned: scan.scanned + count,
+            scan.flagged: scan.flagged + len(flags),
+        }))
+
+
+def start_scan(resume: bool, word_count: int) -> models.ModerationScan:
+    scan = models.ModerationScan
+    with engine.begin() as conn:
+        if resume:
+            row = conn.execute(
+                select(scan).where(scan.status == "running").order_by(scan.id.desc()).limit(1)
+            ).first()
+            if row is None:
+                sys.exit("no unfinished scan to resume")
+            return row
+        scan_id = conn.execute(insert(scan).values(
+            status="running", word_count=word_count, last_post_id=0, last_comment_id=0, scanned=0, flagged=0
+        )).inserted_primary_key[0]
+        return conn.execute(select(scan).where(scan.id == scan_id)).first()
+
+
+def run(resume: bool, workers: int, chunk_size: int):
+    words = load_words()
+    scan = start_scan(resume, len(words))
+    print(f"scan #{scan.id}: {len(words)} words, resuming from post {scan.last_post_id} / comment {scan.last_comment_id}")
+
+    started = time.perf_counter()
+    scanned = flagged = 0
+    # spawn：worker 不继承父进程里打开的数据库连接
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(words,)) as pool:
+        for target_type, model, checkpoint_column in TARGETS:
+            pending = deque()
+
+            def save_oldest():
+                nonlocal scanned, flagged
+                last_id, count, future = pending.popleft()
+                flags = future.result()
+                save_chunk(scan.id, target_type, checkpoint_column, last_id, count, flags)
+                scanned += count
+                flagged += len(flags)
+
+            for chunk in stream_chunks(model, getattr(scan, checkpoint_column), chunk_size):
+                pending.append((chunk[-1][0], len(chunk), pool.submit(_scan_chunk, chunk)))
+                # 按提交顺序保存，检查点只会向前推进到连续完成的位置
+                if len(pending) >= workers * 2:
+                    save_oldest()
+            while pending:
+                save_oldest()
+            print(f"  {target_type}s done: scanned {scanned}, flagged {flagged}, {time.perf_counter() - started:.1f}s")
+
+    with engine.begin() as conn:
+        conn.execute(update(models.ModerationScan).where(models.ModerationScan.id == scan.id).values(
+            status="completed", finished_at=func.now()
+        ))
+    print(f"scan #{scan.id} completed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", action="store_true", help="从最近一次未完成的扫描继续")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.resume, args.workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
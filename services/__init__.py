@@ -1,6 +1,8 @@
 from .post_service import PostService
 from .comment_service import CommentService
 from .like_service import LikeService
+from .moderation_service import ModerationService
+from .export_service import ExportService
 
-__all__ = ["PostService", "CommentService", "LikeService"]
+__all__ = ["PostService", "CommentService", "LikeService", "ModerationService", "ExportService"]
 
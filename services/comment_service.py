@@ -1,10 +1,14 @@
-from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 import crud
 import models
 import schemas
+from config import settings
+from core.etag import comment_page_etag
+from core.pagination import decode_cursor, encode_cursor, make_page
+from core.response_cache import response_cache
 from services.post_service import PostService
 from utils import contains_sensitive_words
 
@@ -12,11 +16,11 @@ from utils import contains_sensitive_words
 class CommentService:
     """评论服务层 - 处理评论相关的业务逻辑"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.post_service = PostService(db)
     
-    def create_comment(
+    async def create_comment(
         self, 
         post_id: int, 
         comment_data: schemas.CommentCreate, 
@@ -27,28 +31,46 @@ class CommentService:
         
         业务逻辑：
         1. 检查文章是否存在
-        2. 敏感词检测
-        3. 创建评论
+        2. 回复时检查被回复的评论（存在、属于同一篇文章、层数未超过上限）
+        3. 敏感词检测
+        4. 创建评论，同一个事务里增加文章的热度分数
         """
         # 1. 检查文章是否存在（如果不存在会自动抛出 404）
-        self.post_service.get_post_with_validation(post_id)
+        await self.post_service.get_post_with_validation(post_id)
+        
+        # 2. 检查被回复的评论
+        parent = None
+        if comment_data.parent_id is not None:
+            parent = await self.get_comment_with_validation(comment_data.parent_id)
+            if parent.post_id != post_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Parent comment belongs to another post"
+                )
+            if parent.depth >= settings.COMMENT_MAX_DEPTH:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Reply depth limit reached"
+                )
         
-        # 2. 敏感词检测
+        # 3. 敏感词检测
         if contains_sensitive_words(comment_data.content):
             raise HTTPException(
                 status_code=400, 
                 detail="Comment contains sensitive words"
             )
         
-        # 3. 创建评论
-        new_comment = crud.create_comment(self.db, comment_data, post_id, user_id)
+        # 4. 创建评论（热度分数的更新随评论一起提交）
+        await crud.add_post_score(self.db, post_id, settings.TRENDING_COMMENT_WEIGHT)
+        new_comment = await crud.create_comment(self.db, comment_data, post_id, user_id, parent)
+        await response_cache.invalidate(f"comments:{post_id}")
         return new_comment
     
-    def update_comment(
+    async def update_comment(
         self, 
         comment_id: int, 
         comment_data: schemas.CommentUpdate, 
-        current_user: models.User
+        current_user: schemas.Principal
     ) -> models.Comment:
         """
         更新评论
@@ -60,7 +82,7 @@ class CommentService:
         4. 更新评论
         """
         # 1. 检查评论是否存在（如果不存在会自动抛出 404）
-        comment = self.get_comment_with_validation(comment_id)
+        comment = await self.get_comment_with_validation(comment_id)
         
         # 2. 权限检查
         if comment.user_id != current_user.id and current_user.role != "admin":
@@ -77,24 +99,25 @@ class CommentService:
             )
         
         # 4. 更新评论
-        updated_comment = crud.update_comment(self.db, comment_id, comment_data)
+        updated_comment = await crud.update_comment(self.db, comment_id, comment_data)
+        await response_cache.invalidate(f"comments:{comment.post_id}")
         return updated_comment
     
-    def delete_comment(
+    async def delete_comment(
         self, 
         comment_id: int, 
-        current_user: models.User
+        current_user: schemas.Principal
     ) -> dict:
         """
-        删除评论
+        删除评论（连同它的所有回复）
         
         业务逻辑：
         1. 检查评论是否存在
         2. 权限检查
-        3. 删除评论
+        3. 删除评论和回复，同一个事务里按每条评论的时间减掉它们的热度分数
         """
         # 1. 检查评论是否存在（如果不存在会自动抛出 404）
-        comment = self.get_comment_with_validation(comment_id)
+        comment = await self.get_comment_with_validation(comment_id)
         
         # 2. 权限检查
         if comment.user_id != current_user.id and current_user.role != "admin":
@@ -103,26 +126,101 @@ class CommentService:
                 detail="You don't have permission to delete this comment"
             )
         
-        # 3. 删除评论
-        return crud.delete_comment(self.db, comment_id)
+        # 3. 删除评论（热度分数的更新随删除一起提交）
+        deleted = await crud.delete_comment(self.db, comment_id)
+        await crud.add_post_score(self.db, comment.post_id, -settings.TRENDING_COMMENT_WEIGHT, deleted)
+        await self.db.commit()
+        await response_cache.invalidate(f"comments:{comment.post_id}")
+        return {"message": "Comment deleted successfully"}
     
-    def get_post_comments(self, post_id: int) -> List[models.Comment]:
+    async def get_post_comments(
+        self,
+        post_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        replies: int = 3,
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """
-        获取文章的所有评论
+        获取文章的顶层评论（游标分页，先发表的在前），每条带最多 replies 条直接回复的预览
         
         业务逻辑：
         1. 检查文章是否存在
-        2. 获取评论列表
+        2. 获取这一页的顶层评论
+        3. 一次查询取出它们的回复预览；还有更多回复时给出 replies_cursor，
+           用 GET /comments/{id}/replies?cursor=... 继续加载
+        
+        每页固定两条查询，与文章的评论总数无关。
+        经过响应缓存：这篇文章的评论增删改、文章被删除时失效；
+        带 If-None-Match 且这一页没有变化时返回 304（只查这一页的版本字段）
+        """
+        async def load():
+            after = decode_cursor(cursor, "comments", 1)
+            # 1. 检查文章是否存在
+            await self.post_service.get_post_with_validation(post_id)
+            
+            # 2. 获取顶层评论
+            rows = await crud.get_top_comments(self.db, post_id, after=after, limit=limit)
+            page = make_page(rows, limit, "comments", lambda c: (c.id,))
+            
+            # 3. 回复预览
+            previews = await crud.get_reply_previews(
+                self.db, post_id, [c.id for c in page["items"]], replies
+            )
+            page["items"] = [
+                {
+                    "comment": comment,
+                    "replies": previews[comment.id],
+                    "replies_cursor": self._replies_cursor(comment, previews[comment.id]),
+                }
+                for comment in page["items"]
+            ]
+            return page
+        
+        async def validate():
+            after = decode_cursor(cursor, "comments", 1)
+            if await crud.get_post_version(self.db, post_id) is None:
+                return None
+            rows, previews = await crud.get_comment_page_versions(
+                self.db, post_id, after=after, limit=limit, per_parent=replies
+            )
+            threads = [(row, previews[row.id]) for row in rows[:limit]]
+            return comment_page_etag(post_id, threads, len(rows) > limit)
+        
+        return await response_cache.fetch(
+            f"comments:{post_id}:{limit}:{replies}:{cursor}", [f"comments:{post_id}", f"post:{post_id}"],
+            load, schemas.Page[schemas.CommentThread],
+            etag=lambda page: comment_page_etag(
+                post_id, [(t["comment"], t["replies"]) for t in page["items"]], page["next_cursor"] is not None
+            ),
+            validate=validate, if_none_match=if_none_match, route="comments",
+        )
+    
+    async def get_comment_replies(self, comment_id: int, cursor: Optional[str] = None, limit: int = 20) -> dict:
+        """
+        获取评论的直接回复（游标分页，先发表的在前）
+        
+        cursor 可以是上一页的 next_cursor，也可以是顶层评论列表里的 replies_cursor
         """
-        # 1. 检查文章是否存在
-        self.post_service.get_post_with_validation(post_id)
+        after = decode_cursor(cursor, "replies", 1)
+        comment = await self.get_comment_with_validation(comment_id)
+        rows = await crud.get_replies(self.db, comment, after=after, limit=limit)
+        return make_page(rows, limit, "replies", lambda c: (c.id,))
+    
+    async def get_comment_thread(self, comment_id: int, cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """
+        获取评论下的整棵回复子树（不含自己），按先序遍历顺序游标分页
         
-        # 2. 获取评论
-        return crud.get_comments(self.db, post_id)
+        每一页只读 limit 条，与子树大小无关；前端按 depth 缩进即可还原树形
+        """
+        after = decode_cursor(cursor, "thread", 1)
+        comment = await self.get_comment_with_validation(comment_id)
+        rows = await crud.get_comment_subtree(self.db, comment, after=after, limit=limit)
+        return make_page(rows, limit, "thread", lambda c: (c.path,))
     
     # ============= 辅助方法 =============
     
-    def get_comment_with_validation(self, comment_id: int) -> models.Comment:
+    async def get_comment_with_validation(self, comment_id: int) -> models.Comment:
         """
         获取评论并验证是否存在
         
@@ -130,7 +228,14 @@ class CommentService:
         - update_comment 需要先验证评论存在
         - delete_comment 需要先验证评论存在
         """
-        comment = crud.get_comment(self.db, comment_id)
+        comment = await crud.get_comment(self.db, comment_id)
         if not comment:
             raise HTTPException(status_code=404, detail="Comment not found")
         return comment
+    
+    @staticmethod
+    def _replies_cursor(comment, previews) -> Optional[str]:
+        """预览之外还有回复时，从最后一条预览之后继续加载的游标"""
+        if previews and comment.reply_count > len(previews):
+            return encode_cursor("replies", (previews[-1].id,))
+        return None
@@ -0,0 +1,64 @@
+import json
+import zlib
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+import crud
+from config import settings
+from database import AsyncSessionLocal
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ExportService:
+    """数据导出服务层 - 把整张表流式写成 NDJSON（每行一个 JSON 对象）"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        # 导出持续整个响应期间，不能使用请求依赖注入的会话（依赖在响应开始发送前就会关闭），
+        # 在生成器里自己打开一个会话，响应结束或客户端断开时关闭
+        self.session_factory = session_factory
+
+    async def iter_ndjson(
+        self, kind: str, since: Optional[datetime] = None, compress: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        逐批生成 NDJSON 字节块
+
+        每批 EXPORT_BATCH_SIZE 行编码成一个块；compress 时整个输出是一个 gzip 流
+        （zlib 增量压缩，不缓存整个文件）
+        """
+        if since is not None and since.tzinfo is not None:
+            # 数据库里的时间是不带时区的 UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        async with self.session_factory() as db:
+            result = await crud.stream_export(db, kind, since, settings.EXPORT_BATCH_SIZE)
+            async for rows in result.mappings().partitions():
+                chunk = "".join(
+                    json.dumps(dict(row), ensure_ascii=False, default=_json_default) + "\n" for row in rows
+                ).encode()
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+        if compressor is not None:
+            yield compressor.flush()
+
+    def export(self, kind: str, since: Optional[datetime] = None, compress: bool = False) -> StreamingResponse:
+        """
+        导出响应：application/x-ndjson，compress 时为 .ndjson.gz 文件（application/gzip）
+
+        响应头发送后出错只能中断连接，客户端收到的最后一行不完整说明导出没有完成
+        """
+        filename = f"{kind}.ndjson" + (".gz" if compress else "")
+        return StreamingResponse(
+            self.iter_ndjson(kind, since, compress),
+            media_type="application/gzip" if compress else "application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
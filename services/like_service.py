@@ -1,91 +1,99 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import crud
 import models
+from config import settings
+from core.pagination import decode_cursor, make_page
+from core.response_cache import response_cache
 from services.post_service import PostService
 
 
 class LikeService:
     """点赞服务层 - 处理点赞相关的业务逻辑"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.post_service = PostService(db)
     
-    def like_post(self, post_id: int, user_id: int) -> dict:
+    async def like_post(self, post_id: int, user_id: int) -> dict:
         """
         点赞文章
         
-        业务逻辑：
-        1. 检查文章是否存在
-        2. 检查是否已经点过赞（防止重复）
-        3. 创建点赞记录
-        4. 更新文章的 like_count + 1（原子操作）
-        5. 返回最新的点赞统计
-        """
-        # 1. 检查文章是否存在
-        self.post_service.get_post_with_validation(post_id)
+        业务逻辑（一个事务，只提交一次）：
+        1. 插入点赞记录（文章不存在或已经点过赞时不插入）
+        2. 插入成功才把文章的 like_count + 1（原子操作），同时取回更新后的值，并增加文章的热度分数
+        3. 提交，返回最新的点赞统计
         
-        # 2. 检查是否已经点过赞
-        existing_like = crud.get_like(self.db, user_id, post_id)
-        if existing_like:
+        点赞记录、计数和热度分数一起提交，不会出现记录已保存而计数没更新的情况
+        """
+        # 1. 插入点赞记录
+        if not await crud.create_like(self.db, user_id, post_id):
+            # 没有插入：文章不存在（404）或已经点过赞（400），只有这条路径才多查一次
+            await self.post_service.get_post_with_validation(post_id)
             raise HTTPException(
                 status_code=400,
                 detail="You have already liked this post"
             )
         
-        # 3. 创建点赞记录
-        crud.create_like(self.db, user_id, post_id)
-        
-        # 4. 更新文章点赞数（原子操作，避免并发问题）
-        crud.increment_post_like_count(self.db, post_id)
+        # 2. 更新文章点赞数和热度分数
+        count = await crud.increment_post_like_count(self.db, post_id)
+        await crud.add_post_score(self.db, post_id, settings.TRENDING_LIKE_WEIGHT)
         
-        # 5. 返回最新的点赞统计
-        return self.get_like_stats(post_id, user_id)
+        # 3. 提交并返回（按点赞数排序的文章列表随之失效）
+        await self.db.commit()
+        await response_cache.invalidate("posts:like_count")
+        return {
+            "count": count,
+            "is_liked": True
+        }
     
-    def unlike_post(self, post_id: int, user_id: int) -> dict:
+    async def unlike_post(self, post_id: int, user_id: int) -> dict:
         """
         取消点赞
         
-        业务逻辑：
-        1. 检查点赞记录是否存在
-        2. 删除点赞记录
-        3. 更新文章的 like_count - 1
-        4. 返回最新的点赞统计
+        业务逻辑（一个事务，只提交一次）：
+        1. 删除点赞记录（没有点过赞时不删除）
+        2. 删除成功才把文章的 like_count - 1，同时取回更新后的值，并按点赞时间减掉这次点赞的热度分数
+        3. 提交，返回最新的点赞统计
         """
-        # 1. 检查点赞记录是否存在
-        existing_like = crud.get_like(self.db, user_id, post_id)
-        if not existing_like:
+        # 1. 删除点赞记录
+        deleted = await crud.delete_like(self.db, user_id, post_id)
+        if not deleted:
             raise HTTPException(
                 status_code=400,
                 detail="You have not liked this post"
             )
         
-        # 2. 删除点赞记录
-        crud.delete_like(self.db, user_id, post_id)
-        
-        # 3. 更新文章点赞数
-        crud.decrement_post_like_count(self.db, post_id)
+        # 2. 更新文章点赞数和热度分数
+        count = await crud.decrement_post_like_count(self.db, post_id)
+        await crud.add_post_score(self.db, post_id, -settings.TRENDING_LIKE_WEIGHT, deleted.created_at)
         
-        # 4. 返回最新的点赞统计
-        return self.get_like_stats(post_id, user_id)
+        # 3. 提交并返回（按点赞数排序的文章列表随之失效）
+        await self.db.commit()
+        await response_cache.invalidate("posts:like_count")
+        return {
+            "count": count,
+            "is_liked": False
+        }
     
-    def get_post_likes(self, post_id: int, skip: int = 0, limit: int = 100) -> List[models.Like]:
+    async def get_post_likes(self, post_id: int, cursor: Optional[str] = None, limit: int = 100) -> dict:
         """
-        获取文章的点赞列表
+        获取文章的点赞列表（游标分页）
         
         业务逻辑：
         1. 检查文章是否存在
         2. 获取点赞记录列表
         """
         # 1. 检查文章是否存在
-        self.post_service.get_post_with_validation(post_id)
+        await self.post_service.get_post_with_validation(post_id)
         
         # 2. 获取点赞列表
-        return crud.get_post_likes(self.db, post_id, skip, limit)
+        after = decode_cursor(cursor, "likes", 2)
+        likes = await crud.get_post_likes(self.db, post_id, after, limit)
+        return make_page(likes, limit, "likes", lambda like: (like.created_at, like.id))
     
-    def get_like_stats(self, post_id: int, user_id: int = None) -> dict:
+    async def get_like_stats(self, post_id: int, user_id: int = None) -> dict:
         """
         获取点赞统计信息
         
@@ -94,29 +102,67 @@ class LikeService:
         - is_liked: 当前用户是否点赞（如果提供了 user_id）
         
         业务逻辑：
-        1. 统计总点赞数
+        1. 读取文章上的 like_count（点赞 / 取消点赞时同一事务内维护，不需要 COUNT）
         2. 检查当前用户是否点赞
+        
+        文章不存在时返回 404
+        """
+        stats = await self.get_like_stats_batch([post_id], user_id)
+        if not stats:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return stats[0]
+    
+    async def get_like_stats_batch(self, post_ids: List[int], user_id: int = None) -> List[dict]:
         """
-        # 1. 统计总点赞数
-        count = crud.get_like_count(self.db, post_id)
+        批量获取点赞统计（渲染文章列表时一次取完，不需要每篇文章请求一次）
         
-        # 2. 检查当前用户是否点赞
-        is_liked = False
-        if user_id:
-            is_liked = crud.get_like(self.db, user_id, post_id) is not None
+        最多两条查询：
+        1. 按 id IN (...) 读取这些文章的 like_count
+        2. 提供了 user_id 时，按 (user_id, post_id IN (...)) 查出点过赞的文章
         
-        return {
-            "count": count,
-            "is_liked": is_liked
-        }
+        结果按 post_ids 的顺序返回（去重），不存在的文章不在结果中
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        
+        # 1. 读取点赞数
+        counts = await crud.get_post_like_counts(self.db, post_ids)
+        
+        # 2. 检查当前用户点赞了哪些文章
+        liked = set()
+        if user_id and counts:
+            liked = await crud.get_liked_post_ids(self.db, user_id, list(counts))
+        
+        return [
+            {
+                "post_id": post_id,
+                "count": counts[post_id],
+                "is_liked": post_id in liked
+            }
+            for post_id in post_ids
+            if post_id in counts
+        ]
     
-    def get_user_likes(self, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Like]:
+    async def get_user_likes(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = 100, expand: Optional[str] = None
+    ) -> dict:
         """
-        获取用户点赞的所有文章
+        获取用户点赞的文章（游标分页）
         
         业务逻辑：
         1. 检查用户是否存在（可选）
         2. 获取用户的点赞列表
+        
+        expand="post" 时返回点赞的文章本身（含作者和标签），JOIN 查询一次取出整页，
+        客户端不需要再逐篇请求 /posts/{id}；两种模式的游标相同，可以互相接着翻页
         """
-        return crud.get_user_likes(self.db, user_id, skip, limit)
+        after = decode_cursor(cursor, "likes", 2)
+        if expand == "post":
+            rows = await crud.get_user_liked_posts(self.db, user_id, after, limit)
+            page = make_page(rows, limit, "likes", lambda row: (row.liked_at, row.like_id))
+            page["items"] = [
+                {"like_id": row.like_id, "liked_at": row.liked_at, "post": row.Post} for row in page["items"]
+            ]
+            return page
+        likes = await crud.get_user_likes(self.db, user_id, after, limit)
+        return make_page(likes, limit, "likes", lambda like: (like.created_at, like.id))
 
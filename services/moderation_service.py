@@ -0,0 +1,46 @@
+import asyncio
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+from config import settings
+from utils.content_moderation import (
+    DEFAULT_SENSITIVE_WORDS,
+    load_words_file,
+    matcher_status,
+    set_sensitive_words,
+)
+
+
+class ModerationService:
+    """内容审核服务层 - 管理敏感词表"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_words(self) -> List[str]:
+        """
+        读取敏感词表
+
+        词表来源：
+        1. MODERATION_WORDS_FILE 指定的文件（没有配置时使用内置的默认词表）
+        2. 数据库 sensitive_words 表
+        两者合并使用
+        """
+        if settings.MODERATION_WORDS_FILE:
+            words = await asyncio.to_thread(load_words_file, settings.MODERATION_WORDS_FILE)
+        else:
+            words = list(DEFAULT_SENSITIVE_WORDS)
+        words.extend(await crud.get_sensitive_words(self.db))
+        return words
+
+    async def reload(self) -> dict:
+        """
+        重新加载敏感词表
+
+        编译放在线程里执行（几万个词时需要一些时间），编译完成后原子替换，
+        替换前的检查继续使用旧词表
+        """
+        words = await self.load_words()
+        await asyncio.to_thread(set_sensitive_words, words)
+        return matcher_status()
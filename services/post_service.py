@@ -1,18 +1,27 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import crud
 import schemas
 import models
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from config import settings
+from core.etag import make_etag, post_page_etag, post_version
+from core.pagination import decode_cursor, make_page
+from core.response_cache import response_cache
+from crud import loaders
+from crud.trending import rebase_factor
 from utils import contains_sensitive_words
 
+# 用户详情里内嵌的文章预览条数上限
+RECENT_POSTS_LIMIT = 5
+
 class PostService:
     """文章服务层 - 处理文章相关的业务逻辑"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create_post(self, post_data: schemas.PostCreate, author_id: int) -> models.Post:
+    async def create_post(self, post_data: schemas.PostCreate, author_id: int) -> models.Post:
         """
         创建文章
         
@@ -20,10 +29,10 @@ class PostService:
         1. 检查用户是否存在
         2. 检查用户权限（只有 author 和 admin 可以发文章）
         3. 敏感词检测
-        4. 创建文章
+        4. 创建文章，并以发布时间记入热度分数（文章和热度分数一起提交，只提交一次）
         """
         # 1. 检查用户是否存在
-        user = crud.get_user(self.db, author_id)
+        user = await crud.get_user(self.db, author_id, options=())
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -42,42 +51,76 @@ class PostService:
             )
         
         # 4. 创建文章
-        new_post = crud.create_post(self.db, post_data, author_id)
-        return new_post
+        new_post = await crud.create_post(self.db, post_data, author_id, commit=False)
+        await crud.add_post_score(self.db, new_post.id, settings.TRENDING_POST_WEIGHT, new_post.created_at)
+        await self.db.commit()
+        await response_cache.invalidate("posts")
+        return await crud.get_post(self.db, new_post.id)
     
-    def get_post(self, post_id: int) -> models.Post:
+    async def get_post(self, post_id: int, if_none_match: Optional[str] = None) -> Response:
         """
-        获取单篇文章（带验证）
+        获取单篇文章（带验证），预加载 PostResponse 需要的 author 和 tags
+        
+        经过响应缓存：文章修改 / 删除 / 增删标签、标签被删除时失效；
+        带 If-None-Match 且文章没有变化时返回 304（只查版本字段）
         """
-        return self.get_post_with_validation(post_id)
+        async def load():
+            return await self.get_post_with_validation(post_id, options=loaders.POST_RESPONSE)
+        
+        async def validate():
+            version = await crud.get_post_version(self.db, post_id)
+            return make_etag("post", post_version(version)) if version else None
+        
+        return await response_cache.fetch(
+            f"post:{post_id}", [f"post:{post_id}", "tags"], load, schemas.PostResponse,
+            etag=lambda post: make_etag("post", post_version(post)),
+            validate=validate, if_none_match=if_none_match, route="post",
+        )
     
-    def get_posts(
+    async def get_posts(
         self, 
-        skip: int = 0, 
+        cursor: Optional[str] = None, 
         limit: int = 10,
-        author_id: Optional[int] = None
-    ) -> List[models.Post]:
+        sort: str = "created_at",
+        author_id: Optional[int] = None,
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """
-        获取文章列表
+        获取文章列表（游标分页）
         
         参数：
-        - skip: 跳过多少条
+        - cursor: 上一页返回的 next_cursor，为空表示第一页
         - limit: 返回多少条
-        - author_id: 可选，按作者筛选
+        - sort: 排序方式，created_at（最新）或 like_count（最多点赞）
+        - author_id: 可选，按作者筛选（在 SQL 中过滤）
+        
+        经过响应缓存：任何文章写入时失效，按点赞数排序的列表在点赞 / 取消点赞时也失效；
+        带 If-None-Match 且这一页没有变化时返回 304（只查这一页的版本字段）
         """
-        posts = crud.get_posts(self.db, skip, limit)
+        kind = f"posts:{sort}"
         
-        # 如果指定了作者，进行筛选
-        if author_id:
-            posts = [p for p in posts if p.author_id == author_id]
+        async def load():
+            after = decode_cursor(cursor, kind, 2)
+            posts = await crud.get_posts(self.db, after=after, limit=limit, sort=sort, author_id=author_id)
+            return make_page(posts, limit, kind, lambda p: (getattr(p, sort), p.id))
         
-        return posts
+        async def validate():
+            after = decode_cursor(cursor, kind, 2)
+            rows = await crud.get_post_versions(self.db, after=after, limit=limit, sort=sort, author_id=author_id)
+            return post_page_etag(rows[:limit], len(rows) > limit)
+        
+        depends = ["posts", "tags"] + (["posts:like_count"] if sort == "like_count" else [])
+        return await response_cache.fetch(
+            f"{kind}:{author_id}:{limit}:{cursor}", depends, load, schemas.Page[schemas.PostResponse],
+            etag=lambda page: post_page_etag(page["items"], page["next_cursor"] is not None),
+            validate=validate, if_none_match=if_none_match, route="posts",
+        )
     
-    def update_post(
+    async def update_post(
         self, 
         post_id: int, 
         post_data: schemas.PostCreate, 
-        current_user: models.User
+        current_user: schemas.Principal
     ) -> models.Post:
         """
         更新文章
@@ -89,7 +132,7 @@ class PostService:
         4. 更新文章
         """
         # 1. 检查文章是否存在
-        post = self.get_post_with_validation(post_id)
+        post = await self.get_post_with_validation(post_id)
         
         # 2. 权限检查
         if post.author_id != current_user.id and current_user.role != "admin":
@@ -106,13 +149,14 @@ class PostService:
             )
         
         # 4. 更新文章
-        updated_post = crud.update_post(self.db, post_id, post_data)
+        updated_post = await crud.update_post(self.db, post_id, post_data)
+        await response_cache.invalidate(f"post:{post_id}", "posts")
         return updated_post
     
-    def delete_post(
+    async def delete_post(
         self, 
         post_id: int, 
-        current_user: models.User
+        current_user: schemas.Principal
     ) -> models.Post:
         """
         删除文章
@@ -123,7 +167,7 @@ class PostService:
         3. 删除文章
         """
         # 1. 检查文章是否存在
-        post = self.get_post_with_validation(post_id)
+        post = await self.get_post_with_validation(post_id)
         
         # 2. 权限检查
         if post.author_id != current_user.id and current_user.role != "admin":
@@ -133,29 +177,78 @@ class PostService:
             )
         
         # 3. 删除文章
-        deleted_post = crud.delete_post(self.db, post_id)
+        deleted_post = await crud.delete_post(self.db, post_id)
+        await response_cache.invalidate(f"post:{post_id}", "posts", "tags:counts")
         return deleted_post
     
-    def get_user_posts(self, user_id: int) -> List[models.Post]:
+    async def get_user_posts(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = 10, if_none_match: Optional[str] = None
+    ) -> Response:
         """
-        获取某个用户的所有文章
+        获取某个用户的文章（游标分页，最新的在前）
         """
         # 检查用户是否存在
-        user = crud.get_user(self.db, user_id)
+        user = await crud.get_user(self.db, user_id, options=())
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        return crud.get_user_posts(self.db, user_id)
+        return await self.get_posts(cursor, limit, author_id=user_id, if_none_match=if_none_match)
+
+    async def get_recent_posts(self, user_id: int, limit: int = RECENT_POSTS_LIMIT) -> dict:
+        """
+        用户详情里的文章预览：最多 limit 篇，最新的在前
+        
+        PostSimple 不需要 author / tags，不加载关联；返回的 next_cursor
+        与 /users/{id}/posts 的游标类型相同，可以直接接着翻页
+        """
+        posts = await crud.get_user_posts(self.db, user_id, limit=limit, options=())
+        return make_page(posts, limit, "posts:created_at", lambda p: (p.created_at, p.id))
 
-    def update_post_like_count(self, post_id: int, count: int):
-        post = self.get_post_with_validation(post_id)
+    async def search_posts(
+        self,
+        q: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        tag_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+    ) -> dict:
+        """
+        全文搜索文章标题、正文和评论（游标分页，最相关的在前）
+
+        不经过响应缓存：查询词组合太多，命中率很低
+        """
+        after = decode_cursor(cursor, "search", 2)
+        rows = await crud.search_posts(self.db, q, after=after, limit=limit, tag_id=tag_id, author_id=author_id)
+        page = make_page(rows, limit, "search", lambda row: (row.score, row.Post.id))
+        page["items"] = [{"post": row.Post, "snippet": row.snippet} for row in page["items"]]
+        return page
+
+    async def get_trending_posts(self, cursor: Optional[str] = None, limit: int = 10) -> dict:
+        """
+        热门文章（游标分页，最热的在前）：发文、点赞、评论按 TRENDING_HALF_LIFE_HOURS 半衰期衰减后的分数
+
+        分数表由写入路径增量维护，这里只是一条按索引顺序读取的查询，不经过响应缓存。
+        游标记录分数所基于的基准时间；两页之间发生过 rebase 时，先把游标里的分数换算到新的基准
+        """
+        after = decode_cursor(cursor, "trending", 3)
+        rows = await crud.get_trending_posts(self.db, after=after[:2] if after else None, limit=limit)
+        if after and rows and rows[0].anchor != after[2]:
+            score, post_id, anchor = after
+            after = (score * rebase_factor(anchor, rows[0].anchor), post_id)
+            rows = await crud.get_trending_posts(self.db, after=after, limit=limit)
+        page = make_page(rows, limit, "trending", lambda row: (row.score, row.Post.id, row.anchor))
+        page["items"] = [row.Post for row in page["items"]]
+        return page
+
+    async def update_post_like_count(self, post_id: int, count: int):
+        post = await self.get_post_with_validation(post_id)
         post.like_count += count
-        self.db.commit()
+        await self.db.commit()
         return post
     
     # ============= 辅助方法 =============
     
-    def get_post_with_validation(self, post_id: int) -> models.Post:
+    async def get_post_with_validation(self, post_id: int, options: tuple = ()) -> models.Post:
         """
         获取文章并验证是否存在
         
@@ -163,8 +256,10 @@ class PostService:
         - update_post 需要先验证文章存在
         - delete_post 需要先验证文章存在
         - 给文章添加评论时需要验证文章存在
+        
+        默认只加载文章本身；需要返回 PostResponse 时传入 loaders.POST_RESPONSE
         """
-        post = crud.get_post(self.db, post_id)
+        post = await crud.get_post(self.db, post_id, options=options)
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
         return post
\ No newline at end of file
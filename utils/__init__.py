@@ -1,4 +1,5 @@
 from .content_moderation import contains_sensitive_words
+from .cache import TTLCache
 
-__all__ = ["contains_sensitive_words"]
+__all__ = ["contains_sensitive_words", "TTLCache"]
 
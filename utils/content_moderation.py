@@ -2,38 +2,110 @@
 内容审核工具模块
 """
 import re
+import threading
+import time
+from typing import Iterable, List, Optional
+
+# 默认敏感词列表（示例），没有配置词表文件时使用
+DEFAULT_SENSITIVE_WORDS = [
+    "porn", "fuck", "shit", "bitch",
+    "cunt", "damn", "cock", "pussy"
+]
+
+
+def _trie_pattern(node: dict) -> str:
+    """把前缀树转换成正则，公共前缀只匹配一次：["cat", "car"] -> ca(?:r|t)"""
+    end = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not end:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if end else pattern
+
+
+class SensitiveWordMatcher:
+    """
+    编译好的敏感词匹配器
+
+    所有敏感词合并成一个按前缀树组织的正则，只编译一次，检查时对内容扫描一遍：
+    - 词表有几万个词时，公共前缀只比较一次，不会退化成逐词搜索
+    - 忽略大小写匹配，不需要生成内容的小写副本
+    - 保持原来的单词边界规则：\\b 词 \\b，"assess" 不会被误判为包含 "ass"
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words = sorted({word.strip().lower() for word in words if word.strip()})
+        trie: dict = {}
+        for word in self.words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        body = _trie_pattern(trie) or "(?!)"  # 空词表：永远不匹配
+        self._pattern = re.compile(r"\b" + body + r"\b", re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def contains(self, content: str) -> bool:
+        """是否包含敏感词（找到第一个就返回）"""
+        return self._pattern.search(content) is not None
+
+    def find(self, content: str) -> List[str]:
+        """返回内容中出现的敏感词（小写、去重、按首次出现的顺序）"""
+        return list(dict.fromkeys(match.group().lower() for match in self._pattern.finditer(content)))
+
+
+def load_words_file(path: str) -> List[str]:
+    """从文件读取敏感词：每行一个，忽略空行和 # 开头的注释"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+# 当前使用的匹配器；重新加载时先编译好新的匹配器，再整体替换引用，
+# 正在进行的检查继续使用旧的匹配器，不会看到编译到一半的状态
+_matcher = SensitiveWordMatcher(DEFAULT_SENSITIVE_WORDS)
+_loaded_at = time.time()
+_reload_lock = threading.Lock()
+
+
+def get_matcher() -> SensitiveWordMatcher:
+    return _matcher
+
+
+def set_sensitive_words(words: Iterable[str]) -> SensitiveWordMatcher:
+    """编译新的词表并原子替换当前匹配器（词表很大时编译较慢，异步代码中应放到线程里调用）"""
+    global _matcher, _loaded_at
+    matcher = SensitiveWordMatcher(words)
+    with _reload_lock:
+        _matcher = matcher
+        _loaded_at = time.time()
+    return matcher
+
+
+def matcher_status() -> dict:
+    return {"words": len(_matcher), "loaded_at": _loaded_at}
 
 
 def contains_sensitive_words(content: str) -> bool:
     """
     检查内容是否包含敏感词
-    
+
     使用单词边界检测，避免误判：
     - "assess" 不会被误判为包含 "ass"
     - "classical" 不会被误判
-    
+
     Args:
         content: 要检查的内容
-        
+
     Returns:
         bool: 如果包含敏感词返回 True，否则返回 False
     """
-    # 敏感词列表（示例）
-    # 实际项目中可以从配置文件或数据库读取
-    sensitive_words = [
-        "porn", "fuck", "shit", "bitch", 
-        "cunt", "damn", "cock", "pussy"
-    ]
-    
-    # 转换为小写进行检测
-    content_lower = content.lower()
-    
-    # 使用单词边界 \b 进行精确匹配
-    for word in sensitive_words:
-        # \b 确保是独立单词，不是其他单词的一部分
-        pattern = r'\b' + re.escape(word) + r'\b'
-        if re.search(pattern, content_lower):
-            return True
-    
-    return False
+    return _matcher.contains(content)
+
 
+def find_sensitive_words(content: str, matcher: Optional[SensitiveWordMatcher] = None) -> List[str]:
+    """返回内容中命中的敏感词，没有命中时返回空列表"""
+    return (matcher or _matcher).find(content)